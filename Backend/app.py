@@ -1,14 +1,32 @@
+import time
+
+_IMPORT_START = time.perf_counter()  # startup timings (see _stage) start here
+
+import base64
+import hmac
+import math
 import os
-from flask import Flask, jsonify
+import threading
+import traceback
+from contextlib import contextmanager
+from functools import wraps
+from flask import Flask, Response, g, has_request_context, jsonify, request
 from flask_cors import CORS
-from model.data_loader import load_current_ncaa_data, load_current_nba_data, make_ncaa_playstyle_df, make_nba_playstyle_df
-from model.knn_comps import build_knn_model, find_similar_players
+from model.data_loader import load_current_ncaa_playstyle, load_current_nba_playstyle
+from model.data_loader import NCAA_PLAYSTYLE_SOURCES, NBA_PLAYSTYLE_SOURCES, compact_frame, frame_memory
+from model.knn_comps import CompsIndex, CompsTable, data_fingerprint, pool_features, prospect_features
+from model import feature_store
 from model.knn_comps import FEATURE_COLS
 import numpy as np
 import pandas as pd
-from model.archetypes import train_nba_archetypes, assign_ncaa_to_archetype, top_nba_examples, ARCHETYPE_NAMES
-from model.view_predictions import get_player_projections
-from headshots import get_nba_headshot, get_ncaa_headshot
+from model.archetypes import load_nba_archetypes, assign_ncaa_to_archetype, assign_ncaa_to_archetypes, top_nba_examples, ARCHETYPE_NAMES
+from model.view_predictions import get_player_projections, get_projections_frame, get_model_projections, get_model_projections_frame, predictions_version
+from model.player_index import build_player_index, lookup_player
+from model.name_search import NameSearchIndex
+from model.nba_history import HistoryStore, parse_seasons
+import headshot_store
+import metrics
+from http_cache import cached
 
 def _round1(x):
     return round(float(x), 1) if x is not None else None
@@ -60,9 +78,10 @@ def compute_draftability_score(stats: dict, archetype_conf: float) -> float:
     score += 3.0 * bpg
     score += 0.25 * mpg
     score -= 2.5 * tov
-    score += 20.0 * float(archetype_conf)  # archetype certainty boost
+    score += 20.0 * np.asarray(archetype_conf, dtype="float64")  # archetype certainty boost
 
-    return _clamp(score, 0.0, 100.0)
+    # np.clip so this also scores whole columns (see _build_player_summaries)
+    return np.clip(score, 0.0, 100.0)
 
 def career_outcomes_from_projections(proj: dict):
     """
@@ -118,120 +137,707 @@ _cors_origins = ["http://localhost:5173", "http://127.0.0.1:5173"]
 if os.environ.get("FRONTEND_ORIGIN"):
     _cors_origins.append(os.environ["FRONTEND_ORIGIN"].rstrip("/"))
 CORS(app, origins=_cors_origins, supports_credentials=True)
+metrics.install(app)
 
-# Load + engineer data once
-df_current = load_current_ncaa_data()
-df_nba = load_current_nba_data()
+# -------- Startup --------
+# PROSCOUT_STARTUP=eager (default): importing app.py builds everything.
+# PROSCOUT_STARTUP=background: importing only loads the data, so /players and
+# /healthz answer right away; archetypes, the comps pool/tables and the summaries
+# are built by start_model_build() on a background thread. Routes that need them
+# wait up to MODELS_WAIT_SECONDS, then answer 503 with Retry-After.
+STARTUP_MODE = os.environ.get("PROSCOUT_STARTUP", "eager")
+MODELS_WAIT_SECONDS = float(os.environ.get("PROSCOUT_MODELS_WAIT", "30"))
 
-df_current = make_ncaa_playstyle_df(df_current)
-df_nba = make_nba_playstyle_df(df_nba)
+startup_times: dict[str, float] = {"imports": round(time.perf_counter() - _IMPORT_START, 3)}
 
-K_ARCHETYPES = 8
-kmeans_archetypes, df_nba_labeled, _centroids_df = train_nba_archetypes(df_nba, k=K_ARCHETYPES, min_mp=1500)
+
+@contextmanager
+def _stage(name):
+    """Add the time spent in this block to startup_times[name] (seconds)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        startup_times[name] = round(startup_times.get(name, 0.0) + time.perf_counter() - start, 3)
 
 
-# Normalize player name column for lookup
-df_current["player_name"] = df_current["player_name"].astype(str).str.strip().str.lower()
-df_nba["Player"] = df_nba["Player"].astype(str).str.strip()
+def _log_startup():
+    stages = ", ".join(f"{name} {secs:.2f}s" for name, secs in startup_times.items())
+    print(f"Startup ({STARTUP_MODE}): {len(serving.df)} prospects, {len(df_nba)} NBA players; {stages}; "
+          f"total {time.perf_counter() - _IMPORT_START:.2f}s", flush=True)
 
 
-# filter
-df_current = df_current[df_current["Min_per"] > 60]
-df_current = df_current[df_current["GP"] > 10]
-df_current = df_current[df_current['pts'] > 10.0]
+# -------- Serving state --------
+# Only the columns some route, the summaries or the draftability model read.
+# float32 only for stats that are rounded before they're returned; anything
+# returned verbatim (/archetype stats, /comps rows) keeps its dtype.
+NCAA_SERVING_COLS = [
+    "player_name", "team", "conf", "yr", "year", "ht", "GP", "Min_per", "mp",
+    "pts", "treb", "ast", "stl", "blk", "twoPA", "TPA", "twoP_per", "TP_per", "FT_per",
+    "ORtg", "bpm", *FEATURE_COLS,
+]
+NCAA_FLOAT32_COLS = ["mp", "pts", "treb", "ast", "stl", "blk", "twoP_per", "TP_per", "FT_per", "ORtg", "bpm"]
+NBA_SERVING_COLS = ["Player", "Team", "Pos", "Age", "G", "MP", "PTS", "AST", "TRB", "usg"]
+
 POWER4 = {"B10", "B12", "SEC", "ACC"}
 
-df_current["conf"] = df_current["conf"].astype(str).str.strip()
-df_current = df_current[df_current["conf"].isin(POWER4)].copy()
+# Materialized top-k comps for every prospect (rows aligned with ServingState.df):
+# comps_table backs /player and the summaries, role_comps_table backs /comps.
+COMPS_TABLE_K = 10
+
+
+class ServingState:
+    """
+    Everything served from trank_data.csv: the filtered prospects frame and what is
+    built from it (comps tables, search index, summaries, listing orders).
+    Handlers get it once per request from _serving(); refresh_ncaa_data() builds a
+    new one and swaps it in with one assignment, so requests already running finish
+    on the state they started with.
+    """
+
+    def __init__(self, df: pd.DataFrame, features, source_key: str):
+        self.df = df
+        self.features = features  # FeatureMatrix of the unfiltered playstyle frame (ids = its index)
+        self.source_key = source_key
+        # name/slug -> row position, so lookups don't scan df
+        self.player_index = build_player_index(df["player_name"])
+        # per-row content hashes: which prospects a refresh changed
+        self.row_hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+        self.version = data_fingerprint(self.row_hashes)
+
+        # model stage (see _build_models / refresh_ncaa_data)
+        self.comps_table: CompsTable | None = None
+        self.role_comps_table: CompsTable | None = None
+        self.search_index: NameSearchIndex | None = None
+
+        # built on first use, rebuilt when the predictions change (see _get_summaries / _get_listing)
+        self.summaries: tuple[str, list[dict]] | None = None  # (predictions_version(), summaries)
+        self.listing: dict | None = None
+
+    def find_player(self, name):
+        """(row position, row) of df for a plain name or slug, or (None, None)."""
+        pos = lookup_player(self.player_index, name)
+        return (None, None) if pos is None else (pos, self.df.iloc[pos])
+
+
+def _ncaa_source_key() -> str:
+    return feature_store.source_key(NCAA_PLAYSTYLE_SOURCES, FEATURE_COLS)
+
+
+def load_serving_state() -> ServingState:
+    """Data stage of the prospects side: load + engineer, feature matrix, filter, compact."""
+    source_key = _ncaa_source_key()
+    # from on-disk snapshots when the CSVs haven't changed
+    df = load_current_ncaa_playstyle()
+
+    # L2-normalized float32 comps matrix, memory-mapped from CACHE_DIR/features (shared by workers)
+    features = feature_store.load("ncaa_playstyle", source_key, lambda: prospect_features(df))
+
+    # Normalize player name column for lookup
+    df["player_name"] = df["player_name"].astype(str).str.strip().str.lower()
+
+    # filter
+    df = df[df["Min_per"] > 60]
+    df = df[df["GP"] > 10]
+    df = df[df['pts'] > 10.0]
+
+    df["conf"] = df["conf"].astype(str).str.strip()
+    df = df[df["conf"].isin(POWER4)].copy()
+
+    df = compact_frame(df, NCAA_SERVING_COLS, categorical=["team", "conf", "yr"], float32=NCAA_FLOAT32_COLS)
+    return ServingState(df, features, source_key)
+
+
+def _serving() -> ServingState:
+    """The ServingState of this request: whichever was current when it started (see data_version)."""
+    if not has_request_context():
+        return serving
+    if "serving" not in g:
+        g.serving = serving
+    return g.serving
+
+
+def _matching_rows(hashes: np.ndarray, previous_hashes: np.ndarray) -> np.ndarray:
+    """Per row, the position of a row with the same content hash in previous_hashes (-1 = none)."""
+    if not len(previous_hashes):
+        return np.full(len(hashes), -1, dtype=np.int64)
+    order = np.argsort(previous_hashes, kind="stable")
+    pos = order[np.minimum(np.searchsorted(previous_hashes, hashes, sorter=order), len(order) - 1)]
+    return np.where(previous_hashes[pos] == hashes, pos, -1)
+
+
+# ---- data stage: frames + feature matrices (pandas / numpy only) ----
+with _stage("data"):
+    serving = load_serving_state()
+
+    df_nba = load_current_nba_playstyle()
+    nba_features = feature_store.load(
+        "nba_pool", feature_store.source_key(NBA_PLAYSTYLE_SOURCES, FEATURE_COLS),
+        lambda: pool_features(df_nba),
+    )
+    df_nba["Player"] = df_nba["Player"].astype(str).str.strip()
+
+    # Every NBA player-season since 2009, for ?season= comps (season partitions load lazily)
+    history_store = HistoryStore()
+
+
+# ---- model stage: archetypes, comps pool + tables, search index ----
+K_ARCHETYPES = 8
+kmeans_archetypes = df_nba_labeled = _centroids_df = None
+
+# NBA comps pool, built once; filtered queries don't refit anything
+comps_index: CompsIndex | None = None
+_nba_search_entries: list[dict] = []
+frames_version: str | None = None
+
+_models_ready = threading.Event()
+_models_lock = threading.Lock()
+_model_build_lock = threading.Lock()
+_model_build_thread: threading.Thread | None = None
+_model_build_error: str | None = None
+
+
+def _build_comps_tables(st: ServingState, previous: ServingState | None = None, reuse=None):
+    """
+    Comps tables of st. With a previous state (and reuse from _matching_rows),
+    rows identical to one of its rows copy their comps from it.
+    """
+    features = st.features.take(st.df.index)
+    if previous is not None and previous.comps_table is not None and previous.comps_table.index is comps_index:
+        st.comps_table = previous.comps_table.updated(st.df, features, reuse)
+        st.role_comps_table = previous.role_comps_table.updated(st.df, features, reuse)
+    else:
+        st.comps_table = CompsTable(comps_index, st.df, k=COMPS_TABLE_K, features=features)
+        st.role_comps_table = CompsTable(
+            comps_index, st.df, k=COMPS_TABLE_K, features=features,
+            usg_band=CompsIndex.USG_BAND, min_mp=CompsIndex.MIN_MP, min_pool=CompsIndex.MIN_POOL,
+        )
+
+
+def _season_arg():
+    """Seasons selected by ?season= (a year, a range like 2015-2019, or "all"); None when absent."""
+    raw = request.args.get("season")
+    if raw in (None, ""):
+        return None
+    return parse_seasons(raw, history_store.seasons())
+
+
+def _build_search_index(st: ServingState) -> NameSearchIndex:
+    """Typeahead index over prospects (kind "ncaa") and the NBA comps pool (kind "nba")."""
+    ncaa = [
+        {"kind": "ncaa", "id": _slug_id(n), "name": n.title(), "team": str(t)}
+        for n, t in zip(st.df["player_name"], st.df["team"])
+    ]
+    return NameSearchIndex(ncaa + _nba_search_entries)
+
+
+def build_models():
+    """Model stage: archetypes, comps pool + tables, search index, data version (once per process)."""
+    with _models_lock:
+        if not _models_ready.is_set():
+            _build_models()
+
+
+def _build_models():
+    global kmeans_archetypes, df_nba_labeled, _centroids_df, df_nba, comps_index, _nba_search_entries, frames_version
+    with _stage("archetypes"):
+        # Saved centroids (Backend/artifacts); KMeans only runs via `python -m model.archetypes train`
+        kmeans_archetypes, labeled, _centroids_df = load_nba_archetypes(df_nba, k=K_ARCHETYPES, min_mp=1500)
+        df_nba_labeled = compact_frame(labeled, [*NBA_SERVING_COLS, "cluster", "dist_to_centroid"],
+                                       categorical=["Team", "Pos"])
+    with _stage("comps"):
+        df_nba = compact_frame(df_nba, NBA_SERVING_COLS, categorical=["Team", "Pos"])
+        comps_index = CompsIndex(df_nba, features=nba_features, display_cols=NBA_SERVING_COLS)
+        _nba_search_entries = [
+            {"kind": "nba", "id": _slug_id(n), "name": n, "team": str(t)}
+            for n, t in zip(comps_index.df["Player"].astype(str), comps_index.df["Team"])
+        ]
+        _build_comps_tables(serving)
+    with _stage("search"):
+        serving.search_index = _build_search_index(serving)
+    frames_version = _frames_version()
+    _models_ready.set()
+
+
+# -------- HTTP caching (ETag / 304 / precompressed bodies, see http_cache.py) --------
+def _frames_version() -> str:
+    return data_fingerprint(
+        pd.util.hash_pandas_object(df_nba, index=False).to_numpy(),
+        kmeans_archetypes.cluster_centers_,
+    )
+
+
+def data_version() -> str:
+    """
+    Changes whenever anything the JSON endpoints are built from changes. Every cached
+    body must be keyed on the same inputs: summaries are rebuilt when predictions_version()
+    moves and the draftability artifact is reloaded when its mtime does.
+    """
+    st = _serving()
+    if not _models_ready.is_set() or st.comps_table is None:
+        # only prospects-frame routes answer before the model stage is done
+        return data_fingerprint("data", st.version, repr(predictions_version()))
+    return data_fingerprint(
+        frames_version,
+        st.version,
+        st.comps_table.fingerprint,
+        st.role_comps_table.fingerprint,
+        repr(predictions_version()),
+        history_store.version(),
+        repr(headshot_store.get_store().generation()),
+    )
+
+
+def _build_models_in_background():
+    global _model_build_error
+    try:
+        warm_up()
+        _log_startup()
+    except Exception:
+        _model_build_error = traceback.format_exc()
+        print(f"Model build failed:\n{_model_build_error}", flush=True)
+
+
+def start_model_build():
+    """Start the model stage (then warm_up) on a background thread, once per process."""
+    global _model_build_thread
+    with _model_build_lock:
+        if _model_build_thread is None and not _models_ready.is_set():
+            _model_build_thread = threading.Thread(
+                target=_build_models_in_background, name="model-build", daemon=True,
+            )
+            _model_build_thread.start()
+
+
+def _models_unavailable():
+    """None once the model stage is done; otherwise (after waiting MODELS_WAIT_SECONDS) a 503 response."""
+    if _models_ready.is_set():
+        return None
+    start_model_build()
+    if _model_build_error is None and _models_ready.wait(MODELS_WAIT_SECONDS):
+        return None
+    status = "warming up" if _model_build_error is None else "model build failed"
+    return jsonify({"status": status}), 503, {"Retry-After": "5"}
+
+
+def needs_models(view=None, when=None):
+    """Route decorator: wait for the model stage (see _models_unavailable), only if when() is true."""
+    if view is None:
+        return lambda v: needs_models(v, when)
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if when is None or when():
+            unavailable = _models_unavailable()
+            if unavailable:
+                return unavailable
+        return view(*args, **kwargs)
+    return wrapper
+
+
+if STARTUP_MODE != "background":
+    build_models()
 
-print(df_current.shape)
-# Build KNN ON NBA once
-knn, scaler, df_nba_clean = build_knn_model(df_nba)
 
 @app.route("/")
 def home():
     return "NBA Scouting KNN API Running"
 
+# -------- Bulk card summaries (/players/summary) --------
+# Built once per ServingState, in one vectorized pass over its prospects, so the
+# Players page doesn't have to call /player once per name. After a refresh only
+# new or changed prospects are scored (see _build_player_summaries).
+_summaries_lock = threading.Lock()
+
+
+def _num_col(df, col):
+    if col not in df.columns:
+        return pd.Series(np.nan, index=df.index, dtype="float64")
+    return pd.to_numeric(df[col], errors="coerce")
+
+
+def _pct_col(df, col):
+    """Column version of _to_pct: accepts 0-1 or 0-100 and returns 0-100."""
+    val = _num_col(df, col).fillna(0.0)
+    return val.where(val > 1.0, val * 100.0)
+
+
+def _str_col(df, candidates, default=""):
+    """Column version of _pick: first non-null value across candidate columns."""
+    out = pd.Series(np.nan, index=df.index, dtype=object)
+    for c in candidates:
+        if c in df.columns:
+            out = out.combine_first(df[c].astype(object))
+    return out.where(out.notna(), default).astype(str)
+
+
+def _round1_list(s):
+    return [None if pd.isna(v) else _round1(v) for v in s]
+
+
+def _summary_rows(df) -> np.ndarray:
+    """Row positions of df that get a summary."""
+    feats = df[FEATURE_COLS].apply(pd.to_numeric, errors="coerce")
+    # same rule as /player: no archetype/comps without a full feature vector
+    return np.flatnonzero(feats.notna().all(axis=1).to_numpy())
+
+
+def _build_player_summaries(st: ServingState, version: str, previous: ServingState | None = None) -> list[dict]:
+    """
+    Summaries of st for predictions `version`. Rows identical to a row of `previous`
+    (scored with the same predictions) reuse its summary; only the others are scored.
+    """
+    row_pos = _summary_rows(st.df)
+    if previous is None or previous.summaries is None or previous.summaries[0] != version:
+        return _score_summaries(st, row_pos)
+
+    known = dict(zip(previous.row_hashes[_summary_rows(previous.df)].tolist(), previous.summaries[1]))
+    hashes = st.row_hashes[row_pos].tolist()
+    fresh = iter(_score_summaries(st, row_pos[[h not in known for h in hashes]]))
+    return [known[h] if h in known else next(fresh) for h in hashes]
+
+
+def _score_summaries(st: ServingState, row_pos: np.ndarray) -> list[dict]:
+    df = st.df.iloc[row_pos]
+    if df.empty:
+        return []
+
+    # --- Archetypes + top comp for every prospect at once ---
+    _, archetype_names, archetype_confs = assign_ncaa_to_archetypes(df, kmeans_archetypes)
+    top_idx = st.comps_table.neighbors[row_pos, 0]
+    top_comps = np.where(top_idx >= 0, comps_index.df["Player"].astype(str).to_numpy()[top_idx], "")
+
+    # --- Card stats (same definitions as /player) ---
+    two_pa = _num_col(df, "twoPA").fillna(0.0)
+    tpa = _num_col(df, "TPA").fillna(0.0)
+    two_pct = _pct_col(df, "twoP_per")
+    three_pct = _pct_col(df, "TP_per")
+    attempts = two_pa + tpa
+    fg_pct = ((two_pct * two_pa + three_pct * tpa) / attempts.where(attempts > 0)).astype("float64")
+
+    stat_cols = {
+        "ppg": _num_col(df, "pts"),
+        "rpg": _num_col(df, "treb"),
+        "apg": _num_col(df, "ast"),
+        "spg": _num_col(df, "stl"),
+        "bpg": _num_col(df, "blk"),
+        "fgPct": fg_pct,
+        "threePct": three_pct,
+        "ftPct": _pct_col(df, "FT_per"),
+        "mpg": _num_col(df, "Min_per") * 40 * .01,
+    }
+
+    # --- Draftability: model predictions when available, placeholder score otherwise ---
+    proj = get_projections_frame(df["player_name"])
+    model_scores = pd.to_numeric(proj["draftability_score"], errors="coerce").to_numpy()
+    unlisted = np.isnan(model_scores)
+    if unlisted.any():
+        # players missing from the predictions CSV: score with the saved model if there is one
+        scored = get_model_projections_frame(df[unlisted])
+        if scored is not None:
+            model_scores[unlisted] = scored["draftability_score"].to_numpy(dtype="float64")
+    fallback_scores = compute_draftability_score(
+        {k: v.fillna(0.0).to_numpy() for k, v in stat_cols.items()}, archetype_confs
+    )
+    draft_scores = np.where(np.isnan(model_scores), fallback_scores, model_scores)
+
+    rounded = {k: _round1_list(v) for k, v in stat_cols.items()}
+    names = df["player_name"].astype(str).tolist()
+    schools = _str_col(df, ["School", "school", "Team", "team"]).tolist()
+    years = _str_col(df, ["Year", "year", "Class", "class"]).tolist()
+    positions = _str_col(df, ["Pos", "pos", "Position", "position"]).tolist()
+
+    summaries = []
+    for i, name in enumerate(names):
+        summaries.append({
+            "id": _slug_id(name),
+            "name": name.title(),
+            "school": schools[i],
+            "year": years[i],
+            "position": positions[i],
+            "archetype": archetype_names[i],
+            "archetypeConfidence": round(float(archetype_confs[i]) * 100, 1),
+            "nbaComp": str(top_comps[i]),
+            "stats": {**{k: rounded[k][i] for k in rounded}, "topg": None},
+            "draftabilityScore": round(float(draft_scores[i]), 1),
+        })
+    return summaries
+
+
+def _get_summaries(st: ServingState, previous: ServingState | None = None) -> list[dict]:
+    """st's summaries, (re)built when missing or scored with other predictions than the current ones."""
+    version = repr(predictions_version())
+    scored = st.summaries
+    if scored is None or scored[0] != version:
+        with _summaries_lock:  # one rebuild; concurrent callers wait for it
+            scored = st.summaries
+            if scored is None or scored[0] != version:
+                scored = st.summaries = (version, _build_player_summaries(st, version, previous))
+    return scored[1]
+
+
+def _with_headshots(summaries: list[dict]) -> list[dict]:
+    # headshots come from the store at response time, so prefetched ones show up without a rebuild
+    urls = headshot_store.ncaa_headshots((s["name"].lower(), s["school"]) for s in summaries)
+    return [{**s, "headshotUrl": url} for s, url in zip(summaries, urls)]
+
+
+@app.route("/players/summary")
+@needs_models
+@cached(data_version)
+def list_player_summaries():
+    return jsonify(_with_headshots(_get_summaries(_serving())))
+
+
+# -------- Player listing queries (/players?sort=...&conf=...&limit=...) --------
+# Params: sort (draftability|name|archetypeConfidence|ppg|rpg|apg), order (asc|desc),
+# conf / classYear / archetype (comma-separated), minScore / maxScore,
+# fields (comma-separated summary fields), limit, cursor (nextCursor of the previous page).
+# Filter columns and every sort order are computed once over the summaries;
+# the filtered order for a (filters, sort) combination is cached (per
+# ServingState), so a page is a slice of a precomputed array.
+LISTING_SORTS = {
+    "draftability": lambda s: s["draftabilityScore"],
+    "name": lambda s: s["name"],
+    "archetypeConfidence": lambda s: s["archetypeConfidence"],
+    "ppg": lambda s: s["stats"]["ppg"],
+    "rpg": lambda s: s["stats"]["rpg"],
+    "apg": lambda s: s["stats"]["apg"],
+}
+LISTING_FIELDS = {
+    "id", "name", "headshotUrl", "school", "year", "position", "archetype",
+    "archetypeConfidence", "nbaComp", "stats", "draftabilityScore",
+}
+LISTING_DEFAULT_LIMIT = 50
+LISTING_MAX_LIMIT = 200
+# Any of these switches /players to the paged listing; others (e.g. a cache-buster) don't
+LISTING_PARAMS = frozenset({
+    "sort", "order", "fields", "limit", "cursor",
+    "conf", "classYear", "archetype", "minScore", "maxScore",
+})
+
+
+def _listing_requested() -> bool:
+    return not LISTING_PARAMS.isdisjoint(request.args)
+
+_listing_lock = threading.Lock()
+
+
+def _build_player_listing(st: ServingState, summaries: list[dict]) -> dict:
+    df = st.df.iloc[_summary_rows(st.df)]
+    names = np.array([s["name"] for s in summaries], dtype=object)
+    name_rank = np.argsort(np.argsort(names, kind="stable"), kind="stable")
+
+    orders = {}
+    for key, get in LISTING_SORTS.items():
+        if key == "name":
+            orders[(key, "asc")] = np.argsort(name_rank, kind="stable")
+            orders[(key, "desc")] = orders[(key, "asc")][::-1].copy()
+            continue
+        vals = np.array([get(s) for s in summaries], dtype="float64")
+        vals = np.where(np.isnan(vals), -np.inf, vals)  # missing values sort last (desc)
+        # ties broken by name so pages are stable
+        orders[(key, "asc")] = np.lexsort((name_rank, vals))
+        orders[(key, "desc")] = np.lexsort((name_rank, -vals))
+
+    return {
+        "summaries": summaries,
+        "conf": df["conf"].astype(str).str.lower().to_numpy(),
+        # class year (Fr/So/Jr/Sr); the summary's "year" field is the season
+        "class_year": _str_col(df, ["yr", "Class", "class"]).str.lower().to_numpy(),
+        "archetype": np.array([s["archetype"].lower() for s in summaries], dtype=object),
+        "score": np.array([s["draftabilityScore"] for s in summaries], dtype="float64"),
+        "orders": orders,
+        "positions": {},  # (filters, sort, order) -> filtered summary positions, in order
+    }
+
+
+def _get_listing(st: ServingState, previous: ServingState | None = None) -> dict:
+    summaries = _get_summaries(st, previous)
+    if st.listing is None or st.listing["summaries"] is not summaries:
+        with _listing_lock:
+            if st.listing is None or st.listing["summaries"] is not summaries:
+                st.listing = _build_player_listing(st, summaries)
+    return st.listing
+
+
+def _csv_arg(name) -> tuple:
+    raw = request.args.get(name, "")
+    return tuple(sorted({v.strip().lower() for v in raw.split(",") if v.strip()}))
+
+
+def _float_arg(name):
+    raw = request.args.get(name)
+    if raw in (None, ""):
+        return None
+    try:
+        value = float(raw)
+    except ValueError:
+        value = None
+    if value is None or not math.isfinite(value):
+        raise ValueError(f"{name} must be a number")
+    return value
+
+
+def _listing_positions(listing, filters, sort, order) -> np.ndarray:
+    key = (filters, sort, order)
+    cache = listing["positions"]  # per listing, so a rebuilt listing never sees stale positions
+    positions = cache.get(key)
+    if positions is None:
+        conf, class_year, archetype, min_score, max_score = filters
+        mask = np.ones(len(listing["summaries"]), dtype=bool)
+        if conf:
+            mask &= np.isin(listing["conf"], conf)
+        if class_year:
+            mask &= np.isin(listing["class_year"], class_year)
+        if archetype:
+            mask &= np.isin(listing["archetype"], archetype)
+        if min_score is not None:
+            mask &= listing["score"] >= min_score
+        if max_score is not None:
+            mask &= listing["score"] <= max_score
+        ordered = listing["orders"][(sort, order)]
+        positions = ordered[mask[ordered]]
+        with _listing_lock:
+            if len(cache) >= 256:
+                cache.clear()
+            cache[key] = positions
+    return positions
+
+
+def _encode_cursor(offset: int, signature: str) -> str:
+    return base64.urlsafe_b64encode(f"{offset}:{signature}".encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str, signature: str) -> int:
+    """Offset of a nextCursor issued for this query; ValueError if it's malformed, negative or foreign."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+    except (ValueError, UnicodeDecodeError):
+        raw = ""
+    offset, _, sig = raw.partition(":")
+    if sig != signature or not (offset.isascii() and offset.isdigit()):
+        raise ValueError("cursor is not a nextCursor of this query")
+    return int(offset)
+
+
 @app.route("/players")
+@needs_models(when=_listing_requested)  # the bare name list needs only the prospects frame
+@cached(data_version)
 def list_players():
-    players = df_current["player_name"].tolist()
-    return jsonify(players)
+    st = _serving()
+    # No listing parameters: the original bare list of names
+    if not _listing_requested():
+        players = st.df["player_name"].tolist()
+        return jsonify(players)
+
+    try:
+        # every ValueError below carries a fixed, user-facing message
+        sort = request.args.get("sort", "draftability")
+        if sort not in LISTING_SORTS:
+            raise ValueError(f"sort must be one of: {', '.join(sorted(LISTING_SORTS))}")
+        order = request.args.get("order", "asc" if sort == "name" else "desc").lower()
+        if order not in ("asc", "desc"):
+            raise ValueError("order must be asc or desc")
+        fields = [f for f in request.args.get("fields", "").split(",") if f.strip()]
+        if not set(fields) <= LISTING_FIELDS:
+            raise ValueError(f"fields must be a comma-separated subset of: {', '.join(sorted(LISTING_FIELDS))}")
+        raw_limit = request.args.get("limit", str(LISTING_DEFAULT_LIMIT))
+        if not (raw_limit.isascii() and raw_limit.isdigit()) or int(raw_limit) < 1:
+            raise ValueError("limit must be a positive integer")
+        limit = min(int(raw_limit), LISTING_MAX_LIMIT)
+        filters = (
+            _csv_arg("conf"), _csv_arg("classYear"), _csv_arg("archetype"),
+            _float_arg("minScore"), _float_arg("maxScore"),
+        )
+        signature = data_fingerprint(repr((filters, sort, order)))[:12]
+        cursor = request.args.get("cursor")
+        offset = _decode_cursor(cursor, signature) if cursor else 0
+    except ValueError as e:
+        return jsonify({"error": f"Invalid query: {e}"}), 400
+
+    listing = _get_listing(st)
+    positions = _listing_positions(listing, filters, sort, order)
+    page = [listing["summaries"][i] for i in positions[offset:offset + limit]]
+    if not fields or "headshotUrl" in fields:
+        page = _with_headshots(page)
+    if fields:
+        page = [{k: s[k] for k in ["id", *fields] if k in s} for s in page]
+
+    next_offset = offset + limit
+    return jsonify({
+        "items": page,
+        "total": int(len(positions)),
+        "nextCursor": _encode_cursor(next_offset, signature) if next_offset < len(positions) else None,
+    })
+
+@app.route("/search")
+@needs_models
+@cached(data_version)
+def search_players():
+    q = request.args.get("q", "")
+    kind = request.args.get("kind") or None
+    try:
+        limit = max(1, min(int(request.args.get("limit", 10)), 50))
+    except ValueError:
+        return jsonify({"error": "Invalid query: limit must be an integer"}), 400
+    return jsonify(_serving().search_index.search(q, limit=limit, kind=kind))
+
 
 @app.route("/comps/<player_name>")
+@needs_models
+@cached(data_version)
 def get_comps(player_name):
-    import numpy as np
-    import pandas as pd
-
     # normalize input
     player_name = player_name.strip().lower()
 
-    player_match = df_current[df_current["player_name"] == player_name]
-    if player_match.empty:
+    st = _serving()
+    row_pos, player_row = st.find_player(player_name)
+    if player_row is None:
         return jsonify({"error": "Player not found"}), 404
 
-    player_row = player_match.iloc[0]
-
-    # -------- Debug (keep for now) --------
-    print("QUERY:", player_name, "MATCHED:", player_row["player_name"])
-
-    x = pd.to_numeric(player_row[FEATURE_COLS], errors="coerce")
-
-    print("\n--- DEBUG NCAA VECTOR ---")
-    print("MATCHED:", player_row["player_name"])
-    print("NaNs:", int(x.isna().sum()), "out of", len(x))
-    print("min/max:", float(np.nanmin(x)), float(np.nanmax(x)))
-    print("first 8:", x.head(8).to_dict())
-
-    sig = tuple(np.round(x.fillna(-999).to_numpy(), 6))
-    print("signature hash:", hash(sig))
-    # -------------------------------------
+    try:
+        seasons = _season_arg()
+    except ValueError as e:
+        return jsonify({"error": f"Invalid query: {e}"}), 400
 
     # -------- Post-filter NBA pool by role --------
-    USG_BAND = 5.0   # +/- 5 usage points (0-100 scale)
-    MIN_MP = 2000     # minimum total minutes in season
-
-    target_usg = float(player_row["usg"])
-
-    nba_pool = df_nba_clean[
-        (pd.to_numeric(df_nba_clean["MP"], errors="coerce") >= MIN_MP) &
-        (pd.to_numeric(df_nba_clean["usg"], errors="coerce").between(target_usg - USG_BAND, target_usg + USG_BAND))
-    ].copy()
-
-    # Fallbacks if too strict
-    if len(nba_pool) < 50:
-        nba_pool = df_nba_clean[pd.to_numeric(df_nba_clean["MP"], errors="coerce") >= MIN_MP].copy()
-    if len(nba_pool) < 50:
-        nba_pool = df_nba_clean.copy()
-
-    # Build KNN on the filtered pool (fast; only a few hundred rows)
-    knn_pool, scaler_pool, nba_pool_clean = build_knn_model(nba_pool)
-
-    # Now return NBA comps from that pool
-    comps = find_similar_players(
-        player_row,
-        nba_pool_clean,
-        knn_pool,
-        scaler_pool,
-        k=5
+    # usage band + minutes floor, widened when fewer than MIN_POOL players match
+    pos_filter = request.args.get("pos") or None
+    team_filter = request.args.get("team") or None
+    role_filters = dict(
+        target_usg=float(player_row["usg"]),
+        usg_band=CompsIndex.USG_BAND,
+        min_mp=CompsIndex.MIN_MP,
+        pos=pos_filter,
+        team=team_filter,
+        min_pool=CompsIndex.MIN_POOL,
     )
+    if seasons is not None:
+        comps = history_store.query(player_row, seasons, k=5, **role_filters)
+    elif pos_filter is None and team_filter is None:
+        comps = st.role_comps_table.comps(row_pos, k=5)
+    else:
+        comps = comps_index.query(player_row, k=5, **role_filters)
     # --------------------------------------------
 
-    cols = [c for c in ["Player", "Team", "Pos", "PTS", "AST", "TRB", "MP", "similarity_score"] if c in comps.columns]
+    cols = [c for c in ["Player", "Team", "Pos", "PTS", "AST", "TRB", "MP", "Season", "similarity_score"] if c in comps.columns]
     result = comps[cols].to_dict(orient="records")
 
     return jsonify(result)
 
 
 @app.get("/archetype/<player_name>")
+@needs_models
+@cached(data_version)
 def get_archetype(player_name):
     name_key = player_name.strip().lower()
 
-    row = df_current[df_current["player_name"] == name_key]
-    if row.empty:
+    st = _serving()
+    _, player_row = st.find_player(name_key)
+    if player_row is None:
         return jsonify({"error": f"Player not found: {player_name}"}), 404
 
-    player_row = row.iloc[0]
-
     cluster_id, archetype_name, confidence, _ = assign_ncaa_to_archetype(
         player_row, kmeans_archetypes
     )
@@ -244,7 +850,7 @@ def get_archetype(player_name):
     ]
 
     # Only keep stats that actually exist
-    stat_cols = [c for c in stat_cols if c in df_current.columns]
+    stat_cols = [c for c in stat_cols if c in st.df.columns]
 
     stats_payload = {
         col: float(player_row[col])
@@ -260,16 +866,19 @@ def get_archetype(player_name):
     })
 
 @app.get("/player/<player_name>")
+@needs_models
+@cached(data_version)
 def get_player(player_name):
-    # Accept slug (marcus-williams) or name (marcus williams)
-    name_key = player_name.strip().lower().replace("-", " ")
-
-    # NCAA lookup uses df_current["player_name"] (already normalized in your app)
-    match = df_current[df_current["player_name"] == name_key]
-    if match.empty:
+    # Accept slug (marcus-williams) or name (marcus williams); the index holds both
+    st = _serving()
+    row_pos, row = st.find_player(player_name)
+    if row is None:
         return jsonify({"error": f"Player not found: {player_name}"}), 404
-
-    row = match.iloc[0]
+    name_key = row["player_name"]
+    try:
+        seasons = _season_arg()
+    except ValueError as e:
+        return jsonify({"error": f"Invalid query: {e}"}), 400
 
     x_feat = pd.to_numeric(row[FEATURE_COLS], errors="coerce")
     if x_feat.isna().any():
@@ -320,9 +929,11 @@ def get_player(player_name):
         "mpg": _round1(mpg),
     }
 
-    # --- NBA comps (reuse your existing comps logic/pool) ---
-    # Keep it simple: just use the already-built df_nba_clean + knn + scaler
-    comps_df = find_similar_players(row, df_nba_clean, knn, scaler, k=5)
+    # --- NBA comps (precomputed for the whole pool, see _build_comps_tables; ?season= searches history) ---
+    if seasons is None:
+        comps_df = st.comps_table.comps(row_pos, k=5)
+    else:
+        comps_df = history_store.query(row, seasons, k=5)
 
     comps = []
     for _, r in comps_df.iterrows():
@@ -332,7 +943,7 @@ def get_player(player_name):
             "team": str(r.get("Team", "")),
             "position": str(r.get("Pos", "")),
             "matchScore": round(float(r.get("similarity_score", 0.0) * 100), 0),
-            "headshotUrl": get_nba_headshot(nba_name),  # you can fill later if you add a mapping table
+            "headshotUrl": headshot_store.nba_headshot(nba_name),
             "similarities": [],
             "differences": [],
             "stats": {
@@ -341,11 +952,13 @@ def get_player(player_name):
                 "apg": _round1(_to_float(r.get("AST"))),
             }
         })
+        if seasons is not None:
+            comps[-1]["season"] = int(r["Season"])
 
     primary_comp = comps[0]["name"] if len(comps) > 0 else ""
 
     # --- Draftability + outcomes: use model predictions (draftability.py + view_predictions) when available ---
-    proj = get_player_projections(name_key)
+    proj = get_player_projections(name_key) or get_model_projections(row)
     if proj:
         draft_score = proj["draftability_score"]
         career_projections = {
@@ -367,7 +980,7 @@ def get_player(player_name):
     player_payload = {
         "id": _slug_id(name),
         "name": name.title(),
-        "headshotUrl": get_ncaa_headshot(name, school=school),
+        "headshotUrl": headshot_store.ncaa_headshot(name, school=school),
         "school": school,
         "year": str(_pick(row, ["Year", "year", "Class", "class"], default="")),
         "position": str(_pick(row, ["Pos", "pos", "Position", "position"], default="")),
@@ -388,5 +1001,203 @@ def get_player(player_name):
 
     return jsonify(player_payload)
 
+# -------- Warm-up / readiness --------
+# gunicorn.conf.py calls warm_up() in the master before forking, so the lazily built
+# structures below are shared copy-on-write by every worker instead of rebuilt per process.
+# With PROSCOUT_STARTUP=background each worker runs it on its model-build thread instead.
+_warmed_up = False
+
+
+def warm_up():
+    """Build everything requests would otherwise build lazily on first use."""
+    global _warmed_up
+    if not _models_ready.is_set():
+        build_models()
+    _get_listing(serving)  # summaries + listing orders
+    get_projections_frame([])  # predictions snapshot
+    get_model_projections_frame(serving.df.iloc[:0])  # draftability artifact, if trained
+    history_store.seasons()  # parse the history exports into season partitions once
+    data_version()
+    _warmed_up = True
+
+
+@app.get("/metrics")
+def prometheus_metrics():
+    return Response(metrics.render_all(), mimetype="text/plain; version=0.0.4")
+
+
+@app.get("/debug/memory")
+@needs_models
+def debug_memory():
+    """Bytes per serving frame and per column, plus the comps matrices (mapped ones are shared)."""
+    st = _serving()
+    frames = {
+        "serving.df": st.df,
+        "df_nba": df_nba,
+        "df_nba_labeled": df_nba_labeled,
+        "comps_index.df": comps_index.df,
+    }
+    arrays = {
+        "serving.features.X": st.features.X,
+        "nba_features.X": nba_features.X,
+        "comps_table.neighbors": st.comps_table.neighbors,
+        "comps_table.scores": st.comps_table.scores,
+        "role_comps_table.neighbors": st.role_comps_table.neighbors,
+        "role_comps_table.scores": st.role_comps_table.scores,
+    }
+    report = {name: frame_memory(df) for name, df in frames.items()}
+    return jsonify({
+        "frames": report,
+        "arrays": {
+            name: {"shape": list(a.shape), "dtype": str(a.dtype), "bytes": int(a.nbytes),
+                   "mapped": isinstance(a, np.memmap)}
+            for name, a in arrays.items()
+        },
+        "history": history_store.stats(),
+        "totalFrameBytes": sum(r["bytes"] for r in report.values()),
+    })
+
+
+@app.get("/healthz")
+def healthz():
+    """Up as soon as the data stage is done (prospects are servable); says how far the rest is."""
+    return jsonify({
+        "status": "ok",
+        "players": len(serving.df),
+        "modelsReady": _models_ready.is_set(),
+        "modelBuildFailed": _model_build_error is not None,
+        "warmedUp": _warmed_up,
+        "startupSeconds": startup_times,
+    })
+
+
+@app.get("/readyz")
+def readyz():
+    if not _warmed_up:
+        return jsonify({"status": "warming up"}), 503
+    return jsonify({"status": "ready", "players": len(serving.df), "nbaPool": len(comps_index.df)})
+
+
+# -------- Hot refresh of trank_data.csv --------
+# A new trank_data.csv is served without a restart: refresh_ncaa_data() loads it
+# into a new ServingState next to the current one and swaps it in. Prospects whose
+# served row is unchanged keep their comps and summary; only new or changed ones
+# are queried against the NBA pool, assigned an archetype and scored. The NBA side
+# (pool, archetypes, history) is not reloaded.
+# Each process refreshes itself: PROSCOUT_WATCH_SECONDS > 0 polls the source files
+# from a thread in every worker; POST /admin/refresh (Authorization: Bearer
+# $PROSCOUT_ADMIN_TOKEN) refreshes the worker that serves it.
+WATCH_SECONDS = float(os.environ.get("PROSCOUT_WATCH_SECONDS", "0"))
+ADMIN_TOKEN = os.environ.get("PROSCOUT_ADMIN_TOKEN", "")
+_refresh_lock = threading.Lock()
+_watch_thread: threading.Thread | None = None
+_prefetch_started = False
+
+
+def refresh_ncaa_data(force=False) -> dict:
+    """Reload trank_data.csv if it changed (or force) and swap in the new ServingState."""
+    global serving
+    with _refresh_lock:
+        old = serving
+        if not force and _ncaa_source_key() == old.source_key:
+            return {"refreshed": False, "players": len(old.df)}
+
+        start = time.perf_counter()
+        build_models()  # the NBA side the new state is built against
+        new = load_serving_state()
+        reuse = _matching_rows(new.row_hashes, old.row_hashes)
+        _build_comps_tables(new, previous=old, reuse=reuse)
+        new.search_index = _build_search_index(new)
+        _get_listing(new, previous=old)  # summaries (new / changed rows only) + listing orders
+        serving = new  # the swap: requests holding `old` finish on it
+
+    recomputed = reuse < 0
+    fresh = new.df.iloc[np.flatnonzero(recomputed)]
+    changed = int(fresh["player_name"].isin(old.df["player_name"]).sum())
+    report = {
+        "refreshed": True,
+        "players": len(new.df),
+        "reused": int((~recomputed).sum()),
+        "changed": changed,
+        "added": len(fresh) - changed,
+        "removed": int((~old.df["player_name"].isin(new.df["player_name"])).sum()),
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+    print("Refreshed trank_data.csv: {players} players ({reused} reused, {changed} changed, "
+          "{added} added, {removed} removed) in {seconds:.2f}s".format(**report), flush=True)
+    if len(fresh):
+        headshot_store.start_prefetch(
+            zip(fresh["player_name"], _str_col(fresh, ["School", "school", "Team", "team"])), [],
+        )
+    return report
+
+
+def _watch_ncaa_sources():
+    pending = failed = None
+    while True:
+        time.sleep(WATCH_SECONDS)
+        try:
+            key = _ncaa_source_key()
+        except OSError:
+            continue  # a source file is being replaced
+        if key == serving.source_key or key == failed:
+            pending = None
+        elif key != pending:
+            pending = key  # changed: refresh once it has stayed the same for a whole interval
+        else:
+            pending = None
+            try:
+                refresh_ncaa_data()
+            except Exception:
+                failed = key  # keep serving the current state; retried when the files change again
+                print(f"trank_data.csv refresh failed:\n{traceback.format_exc()}", flush=True)
+
+
+def start_watcher():
+    """Poll the trank_data.csv sources every WATCH_SECONDS on a daemon thread (once per process)."""
+    global _watch_thread
+    if WATCH_SECONDS > 0 and _watch_thread is None:
+        _watch_thread = threading.Thread(target=_watch_ncaa_sources, name="ncaa-watch", daemon=True)
+        _watch_thread.start()
+
+
+def start_headshot_prefetch():
+    """
+    Resolve headshots in the background (handlers only read headshot_store), once per
+    process. Never at import: under gunicorn the master would fork while the thread
+    holds locks, so post_fork calls this in the workers.
+    """
+    global _prefetch_started
+    if not _prefetch_started:
+        _prefetch_started = True
+        # NBA names in comps pool order, without waiting for comps_index
+        headshot_store.start_prefetch(
+            zip(serving.df["player_name"], _str_col(serving.df, ["School", "school", "Team", "team"])),
+            df_nba["Player"].astype(str).to_numpy()[nba_features.ids],
+        )
+
+
+@app.post("/admin/refresh")
+def admin_refresh():
+    """refresh_ncaa_data() in this process now; ?force=1 rebuilds even if the files didn't change."""
+    if not ADMIN_TOKEN:
+        return jsonify({"error": "Refresh endpoint disabled (set PROSCOUT_ADMIN_TOKEN)"}), 404
+    if not hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {ADMIN_TOKEN}"):
+        return jsonify({"error": "Unauthorized"}), 401
+    try:
+        return jsonify(refresh_ncaa_data(force=request.args.get("force") == "1"))
+    except Exception as e:
+        return jsonify({"error": f"Refresh failed: {e}"}), 500
+
+
+_log_startup()
+
 if __name__ == "__main__":
-    app.run(debug=True)
\ No newline at end of file
+    # Dev server. The reloader imports (and loads every dataset) twice, so it's opt-in.
+    if STARTUP_MODE == "background":
+        start_model_build()
+    else:
+        warm_up()
+    start_watcher()
+    start_headshot_prefetch()
+    app.run(debug=True, use_reloader=os.environ.get("FLASK_RELOADER") == "1")
\ No newline at end of file
@@ -0,0 +1,432 @@
+"""
+Stage-by-stage benchmarks for the ProScout backend.
+
+The committed baseline (bench/baselines/baseline.json) was recorded on the
+10x synthetic tree, so the gate runs against that data:
+
+    cd Backend
+    python -m bench.synth --out /tmp/proscout-x10 --scale 10
+    export PROSCOUT_DATA_DIR=/tmp/proscout-x10 PROSCOUT_CACHE_DIR=/tmp/proscout-x10/.cache
+    python -m bench.run                      # time every stage, compare with the baseline
+    python -m bench.run --save               # time every stage and write the baseline
+    python -m bench.run --only comps flask   # stages whose name contains "comps" or "flask"
+    python -m bench.run --no-gate            # time only (any data, no baseline needed)
+
+Each stage is timed `repeat` times (after one warm-up call) and reported as
+median / min in milliseconds. A stage regresses when its median is more than
+--threshold times the baseline median AND slower by at least --min-delta-ms
+(so sub-millisecond noise can't fail the run). Any regression -> exit code 1,
+and so does a gated run without a baseline or against one recorded on other
+data (the input files' sizes are stored with it). Stages whose inputs are
+missing (e.g. the 2009-2021 NCAA file for draftability training, or an
+untrained draftability artifact) are reported as skipped. Other scales
+(bench/synth.py --scale) need a --baseline of their own.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+# Benchmarks must not hit the network or start background threads
+os.environ.setdefault("HEADSHOT_PREFETCH", "0")
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "baseline.json")
+
+# Inputs whose sizes identify the data a baseline was recorded on
+DATA_FILES = (
+    "trank_data.csv", "2025_advanced.csv", "2025_per_game.csv", "2025_shooting.csv",
+    "NBA_Stats_2009_2026.csv", "NBA_Advanced_2009_2026.csv",
+)
+
+
+class Skip(Exception):
+    """Raised by a stage's setup when its inputs aren't available."""
+
+
+# =========================
+# Stages
+# =========================
+# Each stage: (name, setup, repeat). setup() does the untimed preparation and
+# returns the zero-argument callable that gets timed.
+
+def _loaders():
+    from model import data_loader
+
+    def ncaa_parse():
+        path = os.path.join(data_loader.DATA_DIR, "trank_data.csv")
+        header = os.path.join(data_loader.DATA_DIR, "pstatheaders.xlsx")
+        return lambda: data_loader._parse_current_ncaa_data(path, header)
+
+    def nba_parse():
+        paths = [os.path.join(data_loader.DATA_DIR, f)
+                 for f in ("2025_advanced.csv", "2025_per_game.csv", "2025_shooting.csv")]
+        return lambda: data_loader._parse_current_nba_data(*paths)
+
+    return [
+        ("load_current_ncaa_data[parse]", ncaa_parse, 5),
+        ("load_current_ncaa_data[snapshot]", lambda: data_loader.load_current_ncaa_data, 10),
+        ("load_current_nba_data[parse]", nba_parse, 5),
+        ("load_current_nba_data[snapshot]", lambda: data_loader.load_current_nba_data, 10),
+    ]
+
+
+def _features():
+    from model import data_loader
+
+    def ncaa():
+        df = data_loader.load_current_ncaa_data()
+        return lambda: data_loader.make_ncaa_playstyle_df(df)
+
+    def nba():
+        df = data_loader.load_current_nba_data()
+        return lambda: data_loader.make_nba_playstyle_df(df)
+
+    return [
+        ("make_ncaa_playstyle_df", ncaa, 5),
+        ("make_nba_playstyle_df", nba, 5),
+    ]
+
+
+# Per-row stages (one call per prospect) use this many prospects; batch stages use all
+SAMPLE_PROSPECTS = 200
+# Reference pool size for the nearest-neighbor index stages (~350x the 2025 NBA pool)
+ANN_POOL_ROWS = 200_000
+
+
+def _frames():
+    """(NCAA prospects with full feature vectors, NBA pool)."""
+    from model import data_loader
+
+    df_ncaa = data_loader.load_current_ncaa_playstyle()
+    df_ncaa = df_ncaa.dropna(subset=_feature_cols()).reset_index(drop=True)
+    return df_ncaa, data_loader.load_current_nba_playstyle()
+
+
+def _sample_rows(df):
+    return [row for _, row in df.head(SAMPLE_PROSPECTS).iterrows()]
+
+
+def _feature_cols():
+    from model.knn_comps import FEATURE_COLS
+    return FEATURE_COLS
+
+
+def _comps():
+    from model.knn_comps import CompsIndex, CompsTable, build_knn_model, find_similar_players
+
+    def knn_build():
+        _, df_nba = _frames()
+        return lambda: build_knn_model(df_nba)
+
+    def knn_query_all():
+        df_ncaa, df_nba = _frames()
+        knn, scaler, df_clean = build_knn_model(df_nba)
+        rows = _sample_rows(df_ncaa)
+        return lambda: [find_similar_players(r, df_clean, knn, scaler, k=5) for r in rows]
+
+    def index_build():
+        _, df_nba = _frames()
+        return lambda: CompsIndex(df_nba)
+
+    def index_query_all():
+        df_ncaa, df_nba = _frames()
+        index = CompsIndex(df_nba)
+        rows = _sample_rows(df_ncaa)
+        return lambda: [index.query(r, k=5) for r in rows]
+
+    def table_build():
+        df_ncaa, df_nba = _frames()
+        index = CompsIndex(df_nba)
+        return lambda: CompsTable(index, df_ncaa, k=10)
+
+    def ann_pool():
+        # NBA feature rows resampled + jittered to ANN_POOL_ROWS, prospect feature vectors as queries
+        import numpy as np
+        from model.knn_comps import _feature_matrix, _l2_normalize
+
+        df_ncaa, df_nba = _frames()
+        X = CompsIndex(df_nba).X
+        rng = np.random.default_rng(0)
+        pool = X[rng.integers(0, len(X), ANN_POOL_ROWS)] * rng.normal(1.0, 0.08, (ANN_POOL_ROWS, X.shape[1]))
+        return _l2_normalize(pool), _l2_normalize(_feature_matrix(df_ncaa))[:SAMPLE_PROSPECTS]
+
+    def ann_build(kind):
+        def setup():
+            from model.ann_index import make_index
+            pool, _ = ann_pool()
+            return lambda: make_index(pool, kind)
+        return setup
+
+    def ann_search(kind):
+        def setup():
+            from model.ann_index import make_index
+            pool, queries = ann_pool()
+            index = make_index(pool, kind)
+            return lambda: [index.search(q, 10) for q in queries]
+        return setup
+
+    return [
+        ("build_knn_model", knn_build, 10),
+        (f"find_similar_players[{SAMPLE_PROSPECTS} prospects]", knn_query_all, 3),
+        ("CompsIndex[build]", index_build, 10),
+        (f"CompsIndex.query[{SAMPLE_PROSPECTS} prospects]", index_query_all, 3),
+        ("CompsTable[build k=10, all prospects]", table_build, 5),
+        (f"ann_index[ivf build, {ANN_POOL_ROWS // 1000}k rows]", ann_build("ivf"), 3),
+        (f"ann_index[ivf top-10 x{SAMPLE_PROSPECTS}, {ANN_POOL_ROWS // 1000}k rows]", ann_search("ivf"), 5),
+        (f"ann_index[exact top-10 x{SAMPLE_PROSPECTS}, {ANN_POOL_ROWS // 1000}k rows]", ann_search("exact"), 3),
+    ]
+
+
+def _archetypes():
+    from model import archetypes
+
+    def train():
+        _, df_nba = _frames()
+        return lambda: archetypes.train_nba_archetypes(df_nba, k=8, min_mp=1500)
+
+    def load():
+        _, df_nba = _frames()
+        return lambda: archetypes.load_nba_archetypes(df_nba, k=8, min_mp=1500)
+
+    def assign_each():
+        df_ncaa, df_nba = _frames()
+        model, _, _ = archetypes.load_nba_archetypes(df_nba, k=8, min_mp=1500)
+        rows = _sample_rows(df_ncaa)
+        return lambda: [archetypes.assign_ncaa_to_archetype(r, model) for r in rows]
+
+    def assign_batch():
+        df_ncaa, df_nba = _frames()
+        model, _, _ = archetypes.load_nba_archetypes(df_nba, k=8, min_mp=1500)
+        return lambda: archetypes.assign_ncaa_to_archetypes(df_ncaa, model)
+
+    return [
+        ("train_nba_archetypes", train, 2),
+        ("load_nba_archetypes[artifact]", load, 10),
+        (f"assign_ncaa_to_archetype[{SAMPLE_PROSPECTS} prospects]", assign_each, 5),
+        ("assign_ncaa_to_archetypes[all prospects]", assign_batch, 10),
+    ]
+
+
+def _draftability():
+    def train():
+        from model import draftability
+
+        try:
+            from model import data_loader
+            df_ncaa = data_loader.load_past_ncaa_data()
+        except FileNotFoundError as e:
+            raise Skip(f"missing training data: {os.path.basename(e.filename or '')}")
+        nba_merged = draftability.load_nba_history()
+        df_current = draftability.load_current_players()
+        return lambda: draftability.train(df_ncaa, nba_merged, df_current)
+
+    def score():
+        from model import draftability
+
+        artifact = draftability.load_artifact()
+        if artifact is None:
+            raise Skip("no draftability artifact (run `python -m model.draftability train`)")
+        df_current = draftability.load_current_players()
+        return lambda: draftability.score_players(df_current, artifact)
+
+    return [
+        ("draftability.train", train, 1),
+        ("draftability.score_players", score, 5),
+    ]
+
+
+def _flask():
+    def client():
+        import app
+        import http_cache
+
+        return app, app.app.test_client(), http_cache
+
+    def startup():
+        # import cost of the API (everything module-level in app.py), one run only
+        def run():
+            import importlib
+            sys.modules.pop("app", None)
+            importlib.import_module("app")
+        return run
+
+    def route(path_for):
+        def setup():
+            app, c, http_cache = client()
+            paths = path_for(app)
+
+            def run():
+                http_cache._cache.clear()  # time the handler, not the response cache
+                for p in paths:
+                    resp = c.get(p)
+                    assert resp.status_code == 200, (p, resp.status_code)
+            return run
+        return setup
+
+    def cached_route():
+        app, c, _ = client()
+        paths = [f"/player/{_slug(n)}" for n in app.serving.df["player_name"][:25]]
+        for p in paths:
+            c.get(p)
+        return lambda: [c.get(p) for p in paths]
+
+    names = lambda app: [_slug(n) for n in app.serving.df["player_name"][:25]]  # noqa: E731
+
+    return [
+        ("flask[app import]", startup, 1),
+        ("GET /players/summary", route(lambda app: ["/players/summary"]), 5),
+        ("GET /players?sort=ppg&limit=50", route(lambda app: ["/players?sort=ppg&limit=50"]), 10),
+        ("GET /player/<name> x25", route(lambda app: [f"/player/{n}" for n in names(app)]), 5),
+        ("GET /comps/<name> x25", route(lambda app: [f"/comps/{n}" for n in names(app)]), 5),
+        ("GET /archetype/<name> x25", route(lambda app: [f"/archetype/{n}" for n in names(app)]), 5),
+        ("GET /search?q= x25", route(lambda app: [f"/search?q={n[:4]}" for n in names(app)]), 5),
+        ("GET /player/<name> x25 [response cache]", cached_route, 10),
+    ]
+
+
+def _slug(name):
+    return str(name).strip().lower().replace(" ", "-")
+
+
+STAGE_GROUPS = [_loaders, _features, _comps, _archetypes, _draftability, _flask]
+
+
+# =========================
+# Runner
+# =========================
+
+def time_stage(setup, repeat):
+    fn = setup()
+    fn()  # warm-up (imports, lazy caches, first-touch allocations)
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000.0)
+    return {"median_ms": statistics.median(samples), "min_ms": min(samples), "runs": repeat}
+
+
+def run_stages(only=None):
+    results = {}
+    for group in STAGE_GROUPS:
+        for name, setup, repeat in group():
+            if only and not any(o.lower() in name.lower() for o in only):
+                continue
+            try:
+                results[name] = time_stage(setup, repeat)
+            except Skip as e:
+                results[name] = {"skipped": str(e)}
+            print(_format_row(name, results[name]), flush=True)
+    return results
+
+
+def _format_row(name, result, baseline=None, status=""):
+    if "skipped" in result:
+        return f"  {name:<44} skipped: {result['skipped']}"
+    row = f"  {name:<44} {result['median_ms']:>10.2f} ms  (min {result['min_ms']:.2f})"
+    if baseline and "median_ms" in baseline:
+        ratio = result["median_ms"] / baseline["median_ms"] if baseline["median_ms"] else float("inf")
+        row += f"  baseline {baseline['median_ms']:.2f} ms  x{ratio:.2f} {status}"
+    return row
+
+
+def data_signature() -> dict:
+    """Byte size of every DATA_FILES input (None = missing) in PROSCOUT_DATA_DIR."""
+    from model import data_loader
+
+    paths = {name: os.path.join(data_loader.DATA_DIR, name) for name in DATA_FILES}
+    return {name: os.path.getsize(p) if os.path.exists(p) else None for name, p in paths.items()}
+
+
+def compare(results, baseline, threshold, min_delta_ms):
+    """Names of stages slower than threshold x baseline (and by at least min_delta_ms)."""
+    regressions = []
+    print("\nComparison with baseline:")
+    for name, result in results.items():
+        base = baseline.get("stages", {}).get(name)
+        if "skipped" in result or not base or "median_ms" not in base:
+            continue
+        slower = result["median_ms"] - base["median_ms"]
+        regressed = result["median_ms"] > base["median_ms"] * threshold and slower >= min_delta_ms
+        if regressed:
+            regressions.append(name)
+        print(_format_row(name, result, base, "REGRESSION" if regressed else ""))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark ProScout backend stages.")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON path")
+    parser.add_argument("--save", action="store_true", help="write results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="fail when median > threshold x baseline median (default 1.25)")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0,
+                        help="ignore regressions smaller than this many ms (default 5)")
+    parser.add_argument("--only", nargs="*", help="run only stages whose name contains one of these")
+    parser.add_argument("--output", help="also write this run's results to a JSON file")
+    parser.add_argument("--no-gate", action="store_true", help="only time the stages; no baseline comparison")
+    args = parser.parse_args(argv)
+
+    print("Benchmarking ProScout stages (median of N runs after one warm-up):")
+    results = run_stages(args.only)
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "data": data_signature(),
+        "stages": results,
+    }
+
+    if args.output:
+        _write_json(args.output, report)
+
+    if args.save:
+        if args.only and os.path.exists(args.baseline):
+            # partial run: update just these stages in the existing baseline
+            with open(args.baseline) as f:
+                merged = json.load(f)
+            merged["stages"].update(results)
+            report = {**merged, **{k: v for k, v in report.items() if k != "stages"}}
+        _write_json(args.baseline, report)
+        print(f"\nSaved baseline -> {args.baseline}")
+        return 0
+
+    if args.no_gate:
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline}; run with --save to create one (or --no-gate).")
+        return 1
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline.get("data") != report["data"]:
+        print(f"\nBaseline {args.baseline} was recorded on other data than PROSCOUT_DATA_DIR "
+              "(see its \"data\" sizes); generate the matching tree or pass another --baseline.")
+        return 1
+    regressions = compare(results, baseline, args.threshold, args.min_delta_ms)
+    if regressions:
+        print(f"\n{len(regressions)} stage(s) regressed past x{args.threshold}: {', '.join(regressions)}")
+        return 1
+    print("\nNo regressions.")
+    return 0
+
+
+def _write_json(path, report):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,251 @@
+"""
+Synthetic ProScout data at 10x-100x scale, for benchmarks and load tests.
+
+    cd Backend
+    python -m bench.synth --out /tmp/proscout-x20 --scale 20
+    PROSCOUT_DATA_DIR=/tmp/proscout-x20 PROSCOUT_CACHE_DIR=/tmp/proscout-x20/.cache \
+        python -m bench.run --baseline /tmp/proscout-x20/baseline.json --save
+
+Writes lookalikes of every file data_loader.py / draftability.py read:
+trank_data.csv, 2025_{advanced,per_game,shooting}.csv, NBA_{Stats,Advanced}_2009_2026.csv,
+plus copies of pstatheaders.xlsx and DraftedPlayers2009-2021.xlsx.
+
+Rows are bootstrapped from the real files (header lines, column order and number
+formatting are kept) and every stat is jittered multiplicatively, so
+distributions, correlations within a row and the files' quirks all look like the
+real thing. Each synthetic player gets a unique name and Basketball-Reference-style
+id; NBA players keep all their seasons, and the same clone appears in every file
+that is joined on (Player-additional, Season).
+"""
+
+import argparse
+import csv
+import os
+import re
+import shutil
+import sys
+
+import numpy as np
+import pandas as pd
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REAL_DATA_DIR = os.path.join(BACKEND_DIR, "data")
+
+NUMBER = re.compile(r"^-?(\d+\.?\d*|\.\d+)$")
+
+# Columns copied verbatim (ids, ranks, seasons, categorical codes)
+TRANK_FIXED = {"team", "conf", "yr", "ht", "num", "year", "pid", "type", "Rec Rank", "pick", "role"}
+NBA_FIXED = {"Rk", "Player", "Age", "Team", "Pos", "Awards", "Player-additional", "Season"}
+
+NBA_CURRENT_FILES = ("2025_advanced.csv", "2025_per_game.csv", "2025_shooting.csv")
+NBA_HISTORY_FILES = ("NBA_Stats_2009_2026.csv", "NBA_Advanced_2009_2026.csv")
+COPIED_FILES = ("pstatheaders.xlsx", "DraftedPlayers2009-2021.xlsx")
+
+
+def _read_csv(path, header_lines):
+    # utf-8-sig so a BOM (NBA history exports) stays on the header, not in a field
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        rows = list(csv.reader(f))
+    with open(path, "rb") as f:
+        bom = f.read(3) == b"\xef\xbb\xbf"
+    return rows[:header_lines], rows[header_lines:], bom
+
+
+def _write_csv(path, header, rows, bom=False):
+    with open(path, "w", newline="", encoding="utf-8-sig" if bom else "utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerows(header)
+        writer.writerows(rows)
+
+
+def _parse_column(values: np.ndarray):
+    """Numeric mask, float values, decimals (-1 = integer) and leading-dot flags of one source column."""
+    text = pd.Series(values, dtype=object)
+    numeric = text.str.match(NUMBER).to_numpy(dtype=bool)
+    v = np.zeros(len(values))
+    v[numeric] = values[numeric].astype(str).astype(np.float64)
+    point = text.str.find(".").to_numpy()
+    decimals = np.where(point < 0, -1, text.str.len().to_numpy() - point - 1)
+    bare = text.str.match(r"-?\.").to_numpy(dtype=bool)
+    return numeric, v, decimals, bare
+
+
+def _jitter_rows(rows, src, fixed_idx, rng, sigma) -> list[list[str]]:
+    """
+    rows[src] (with repeats) with every non-fixed numeric field scaled by ~N(1, sigma),
+    keeping each field's written format ("3036", ".585", "-0.627717"). Ragged rows keep
+    their length.
+    """
+    width = max(len(r) for r in rows)
+    source = np.array([r + [""] * (width - len(r)) for r in rows], dtype=object)
+    grid = source[src]
+    lengths = np.array([len(r) for r in rows])[src]
+    for j in range(width):
+        if j in fixed_idx:
+            continue
+        numeric, v, decimals, bare = _parse_column(source[:, j])
+        if not numeric.any():
+            continue
+        out_idx = np.flatnonzero(numeric[src])
+        from_idx = src[out_idx]
+        old = v[from_idx]
+        new = old * rng.normal(1.0, sigma, size=len(out_idx))
+        fraction = (old >= 0.0) & (old <= 1.0)
+        new[fraction] = np.clip(new[fraction], 0.0, 1.0)  # fractions stay fractions
+        col = grid[:, j]
+        for d in np.unique(decimals[from_idx]):
+            sel = decimals[from_idx] == d
+            if d < 0:
+                col[out_idx[sel]] = np.rint(new[sel]).astype(np.int64).astype(str)
+            else:
+                col[out_idx[sel]] = np.char.mod(f"%.{d}f", new[sel])
+        strip = out_idx[bare[from_idx]]
+        if len(strip):
+            col[strip] = pd.Series(col[strip], dtype=object).str.replace("0.", ".", n=1, regex=False).to_numpy()
+    return [list(row[:n]) for row, n in zip(grid, lengths)]
+
+
+class _Names:
+    """Unique "First Last" names (+ bbref-style ids) recombined from the real pools."""
+
+    def __init__(self, real_names, rng):
+        firsts, lasts = set(), set()
+        for name in real_names:
+            parts = str(name).split()
+            if len(parts) >= 2:
+                firsts.add(parts[0])
+                lasts.add(" ".join(parts[1:]))
+        self.firsts, self.lasts = sorted(firsts), sorted(lasts)
+        self.rng = rng
+        self.used: set[str] = set()
+
+    def next(self) -> str:
+        for _ in range(20):
+            first, last = self.rng.integers(0, (len(self.firsts), len(self.lasts)))
+            name = f"{self.firsts[first]} {self.lasts[last]}"
+            if name not in self.used:
+                break
+        else:
+            name = f"{name} {len(self.used)}"  # pool exhausted: disambiguate
+        self.used.add(name)
+        return name
+
+    @staticmethod
+    def bbref_id(name: str, n: int) -> str:
+        first, _, last = name.lower().partition(" ")
+        letters = lambda s: re.sub(r"[^a-z]", "", s)
+        return f"{letters(last)[:5]}{letters(first)[:2]}{n:05d}"
+
+
+def make_trank(out_dir, rows_out, rng, sigma):
+    columns = [c.strip() for c in pd.read_excel(os.path.join(REAL_DATA_DIR, "pstatheaders.xlsx"), nrows=0).columns]
+    _, rows, _ = _read_csv(os.path.join(REAL_DATA_DIR, "trank_data.csv"), 0)
+    fixed = {i for i, c in enumerate(columns) if c in TRANK_FIXED}
+    pid_idx = columns.index("pid")
+    names = _Names((r[0] for r in rows), rng)
+
+    out = _jitter_rows(rows, rng.integers(0, len(rows), size=rows_out), fixed, rng, sigma)
+    for n, row in enumerate(out):
+        row[0] = names.next()
+        if pid_idx < len(row):
+            row[pid_idx] = str(100000 + n)
+
+    _write_csv(os.path.join(out_dir, "trank_data.csv"), [], out)
+    return len(out)
+
+
+def _nba_clone_files(out_dir, files, header_lines, scale, players_out, rng, sigma):
+    """
+    Clone whole players (every row with their Player-additional id) across joined files.
+    players_out defaults to scale x the real number of players.
+    """
+    tables = {}
+    for fname in files:
+        header, rows, bom = _read_csv(os.path.join(REAL_DATA_DIR, fname), header_lines[fname])
+        cols = header[-1]
+        id_idx = cols.index("Player-additional") if "Player-additional" in cols else len(cols) - 1
+        by_id: dict[str, list] = {}
+        for r in rows:
+            if len(r) > id_idx and r[id_idx]:
+                by_id.setdefault(r[id_idx], []).append(r)
+        fixed = {i for i, c in enumerate(cols) if c.strip() in NBA_FIXED}
+        fixed.add(id_idx)
+        tables[fname] = (header, by_id, bom, fixed, cols.index("Player"), id_idx)
+
+    # players present in the first file drive the sample (others join to it)
+    real_ids = sorted(tables[files[0]][1])
+    first_rows = tables[files[0]][1]
+    names = _Names((first_rows[i][0][tables[files[0]][4]] for i in real_ids), rng)
+    players_out = players_out or int(len(real_ids) * scale)
+    clones = [(real_ids[src], names.next()) for src in rng.integers(0, len(real_ids), size=players_out)]
+
+    counts = {}
+    for fname, (header, by_id, bom, fixed, name_idx, id_idx) in tables.items():
+        rows, start = [], {}
+        for real_id, player_rows in by_id.items():
+            start[real_id] = (len(rows), len(player_rows))
+            rows.extend(player_rows)
+        src, owner = [], []
+        for n, (real_id, _) in enumerate(clones):
+            first, count = start.get(real_id, (0, 0))
+            src.extend(range(first, first + count))
+            owner.extend([n] * count)
+        out = _jitter_rows(rows, np.array(src, dtype=np.int64), fixed, rng, sigma)
+        for row, n in zip(out, owner):
+            name = clones[n][1]
+            row[name_idx], row[id_idx] = name, _Names.bbref_id(name, n)
+        # Rk is recomputed so it stays a 1..N rank where the source had one
+        rk = header[-1].index("Rk") if "Rk" in header[-1] else None
+        if rk is not None:
+            for i, row in enumerate(out, start=1):
+                if row[rk]:
+                    row[rk] = str(i)
+        _write_csv(os.path.join(out_dir, fname), header, out, bom=bom)
+        counts[fname] = len(out)
+    return counts
+
+
+def generate(out_dir, scale=10.0, ncaa_rows=None, nba_players=None, history_players=None,
+             sigma=0.08, seed=0):
+    rng = np.random.default_rng(seed)
+    os.makedirs(out_dir, exist_ok=True)
+
+    real_ncaa = sum(1 for _ in open(os.path.join(REAL_DATA_DIR, "trank_data.csv")))
+    counts = {"trank_data.csv": make_trank(out_dir, ncaa_rows or int(real_ncaa * scale), rng, sigma)}
+
+    counts.update(_nba_clone_files(
+        out_dir, NBA_CURRENT_FILES,
+        {"2025_advanced.csv": 1, "2025_per_game.csv": 1, "2025_shooting.csv": 2},
+        scale, nba_players, rng, sigma,
+    ))
+    counts.update(_nba_clone_files(
+        out_dir, NBA_HISTORY_FILES, {f: 1 for f in NBA_HISTORY_FILES},
+        scale, history_players, rng, sigma,
+    ))
+
+    for fname in COPIED_FILES:
+        shutil.copy(os.path.join(REAL_DATA_DIR, fname), os.path.join(out_dir, fname))
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic ProScout data files.")
+    parser.add_argument("--out", required=True, help="output directory (use as PROSCOUT_DATA_DIR)")
+    parser.add_argument("--scale", type=float, default=10.0, help="size multiplier vs the bundled data")
+    parser.add_argument("--ncaa-rows", type=int, help="trank_data.csv rows (overrides --scale)")
+    parser.add_argument("--nba-players", type=int, help="players in the 2025_*.csv files (overrides --scale)")
+    parser.add_argument("--history-players", type=int, help="players in NBA_*_2009_2026.csv (overrides --scale)")
+    parser.add_argument("--sigma", type=float, default=0.08, help="relative jitter applied to stats")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    counts = generate(args.out, args.scale, args.ncaa_rows, args.nba_players,
+                      args.history_players, args.sigma, args.seed)
+    for fname, n in counts.items():
+        print(f"  {fname:<32} {n:>9,} rows")
+    print(f"Wrote {args.out} -- run with PROSCOUT_DATA_DIR={args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+"""
+Production server config: `gunicorn -c gunicorn.conf.py app:app`
+
+The app is imported once in the master (preload_app): CSV snapshots, feature
+matrices, comps tables, archetypes and the warmed-up summaries are built there,
+then workers are forked and share that memory copy-on-write.
+
+With PROSCOUT_STARTUP=background only the data is loaded before forking; each
+worker builds the models on its own thread (see app.start_model_build), so it
+serves /healthz and /players sooner at the cost of one model copy per worker.
+"""
+import gc
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+
+# WEB_CONCURRENCY is what Render (and Heroku-style hosts) set for worker count
+workers = int(os.environ.get("WEB_CONCURRENCY", min(2 * multiprocessing.cpu_count() + 1, 4)))
+threads = int(os.environ.get("GUNICORN_THREADS", "4"))
+worker_class = "gthread" if threads > 1 else "sync"
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "60"))
+
+preload_app = True
+
+# The cyclic GC writes to every tracked object it visits, which would un-share the
+# preloaded pages in each worker. Keep it off while loading, freeze what the master
+# built before forking, and re-enable it in the workers.
+gc.disable()
+
+
+def when_ready(server):
+    import app  # already imported by preload_app
+
+    if app.STARTUP_MODE != "background":
+        app.warm_up()
+    gc.collect()
+    gc.freeze()
+    server.log.info("Data loaded (%s startup); forking %s workers", app.STARTUP_MODE, workers)
+
+
+def post_fork(server, worker):
+    gc.enable()
+    import app
+
+    # threads don't survive fork: start them in the worker
+    if app.STARTUP_MODE == "background":
+        app.start_model_build()
+    app.start_watcher()  # PROSCOUT_WATCH_SECONDS: hot refresh of trank_data.csv
+    # workers take turns under a file lock; only the first one goes to the network
+    app.start_headshot_prefetch()
@@ -0,0 +1,206 @@
+"""
+Disk-backed headshot cache (SQLite) so request handlers never wait on ESPN / nba_api.
+- Resolved URLs are kept for FOUND_TTL, misses for MISSING_TTL (negative caching).
+- start_prefetch() resolves every player on a background thread after startup;
+  handlers only read the store and fall back to the placeholder on a miss.
+- Prefetches hold a file lock next to the store, so forked workers take turns:
+  the first one resolves everything, the others only find fresh rows.
+"""
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows dev server: a single process, nothing to coordinate
+    fcntl = None
+
+import headshots
+import metrics
+from model import data_loader
+
+STORE_PATH = os.environ.get("HEADSHOT_STORE_PATH", os.path.join(data_loader.CACHE_DIR, "headshots.sqlite3"))
+
+FOUND_TTL = 30 * 24 * 3600    # seconds a resolved URL stays valid
+MISSING_TTL = 12 * 3600       # seconds before a miss (or failed lookup) is retried
+
+# Set HEADSHOT_PREFETCH=0 to skip the background job (e.g. offline)
+PREFETCH_ENABLED = os.environ.get("HEADSHOT_PREFETCH", "1") != "0"
+
+NCAA = "ncaa"
+NBA = "nba"
+
+
+def ncaa_key(player_name: str, school: str = "") -> str:
+    return f"{headshots._normalize_name(player_name)}|{headshots._normalize_name(school)}"
+
+
+def nba_key(player_name: str) -> str:
+    return headshots._normalize_name(player_name)
+
+
+class HeadshotStore:
+    """One SQLite file; a connection per thread (and per process, for forked workers)."""
+
+    GENERATION_TTL = 1.0  # seconds generation() may be stale
+
+    def __init__(self, path: str = STORE_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._generation = (0.0, None)  # (checked_at, value)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._conn() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS headshots (
+                    kind TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    url TEXT,              -- NULL = looked up, nothing found
+                    expires_at REAL NOT NULL,
+                    PRIMARY KEY (kind, key)
+                )
+            """)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def get(self, kind: str, key: str) -> tuple[bool, str | None]:
+        """(fresh entry exists, url). url is None for a cached miss."""
+        row = self._conn().execute(
+            "SELECT url, expires_at FROM headshots WHERE kind = ? AND key = ?", (kind, key)
+        ).fetchone()
+        if row is None or row[1] < time.time():
+            return False, None
+        return True, row[0]
+
+    def get_many(self, kind: str) -> dict[str, str]:
+        """Every fresh, found URL of one kind (key -> url)."""
+        rows = self._conn().execute(
+            "SELECT key, url FROM headshots WHERE kind = ? AND url IS NOT NULL AND expires_at >= ?",
+            (kind, time.time()),
+        ).fetchall()
+        return dict(rows)
+
+    def generation(self) -> tuple:
+        """Changes whenever a found URL is written (by any process); used in HTTP ETags."""
+        checked_at, value = self._generation
+        now = time.monotonic()
+        if value is None or now - checked_at >= self.GENERATION_TTL:
+            value = self._conn().execute(
+                "SELECT COUNT(*), MAX(expires_at) FROM headshots WHERE url IS NOT NULL"
+            ).fetchone()
+            self._generation = (now, value)
+        return value
+
+    def put(self, kind: str, key: str, url: str | None):
+        ttl = FOUND_TTL if url else MISSING_TTL
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO headshots (kind, key, url, expires_at) VALUES (?, ?, ?, ?)",
+                (kind, key, url, time.time() + ttl),
+            )
+
+
+_store: HeadshotStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> HeadshotStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = HeadshotStore()
+    return _store
+
+
+# =========================
+# Read path (request handlers)
+# =========================
+
+def ncaa_headshot(player_name: str, school: str = "") -> str:
+    """Stored NCAA headshot, or the placeholder (never touches the network)."""
+    _, url = get_store().get(NCAA, ncaa_key(player_name, school))
+    metrics.CACHE.inc("headshot", "hit" if url else "miss")
+    return url or headshots.placeholder_headshot(player_name or "?", "NCAA")
+
+
+def nba_headshot(player_name: str) -> str:
+    """Stored NBA headshot, or the placeholder (never touches the network)."""
+    _, url = get_store().get(NBA, nba_key(player_name))
+    metrics.CACHE.inc("headshot", "hit" if url else "miss")
+    return url or headshots.placeholder_headshot(player_name or "?", "NBA")
+
+
+def ncaa_headshots(players) -> list[str]:
+    """ncaa_headshot for many (name, school) pairs with one query."""
+    players = list(players)
+    found = get_store().get_many(NCAA)
+    urls = [found.get(ncaa_key(name, school)) for name, school in players]
+    hits = sum(1 for url in urls if url)
+    metrics.CACHE.inc("headshot", "hit", amount=hits)
+    metrics.CACHE.inc("headshot", "miss", amount=len(urls) - hits)
+    return [
+        url or headshots.placeholder_headshot(name or "?", "NCAA")
+        for url, (name, _) in zip(urls, players)
+    ]
+
+
+# =========================
+# Prefetch (background)
+# =========================
+
+def prefetch(ncaa_players, nba_names, store: HeadshotStore | None = None):
+    """Resolve every (name, school) NCAA pair and NBA name that isn't freshly cached."""
+    store = store or get_store()
+
+    for name in dict.fromkeys(nba_names):
+        key = nba_key(name)
+        if key and not store.get(NBA, key)[0]:
+            store.put(NBA, key, headshots.resolve_nba_headshot(name))
+
+    for name, school in dict.fromkeys(ncaa_players):
+        key = ncaa_key(name, school)
+        if key and not store.get(NCAA, key)[0]:
+            store.put(NCAA, key, headshots.resolve_ncaa_headshot(name, school=school))
+
+
+@contextmanager
+def _prefetch_lock(path: str = STORE_PATH):
+    """Exclusive across processes (flock); waits for another process's prefetch to finish."""
+    if fcntl is None:
+        yield
+        return
+    with open(f"{path}.prefetch.lock", "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def start_prefetch(ncaa_players, nba_names) -> threading.Thread | None:
+    """
+    Run prefetch() on a daemon thread; returns the thread (None when disabled).
+    Call it from the serving process, not a gunicorn master that is about to fork.
+    """
+    if not PREFETCH_ENABLED:
+        return None
+
+    def run():
+        try:
+            ncaa_players_, nba_names_ = list(ncaa_players), list(nba_names)
+            with _prefetch_lock(get_store().path):
+                prefetch(ncaa_players_, nba_names_)
+        except Exception as e:  # never take the server down over headshots
+            print("headshot prefetch failed:", e)
+
+    thread = threading.Thread(target=run, name="headshot-prefetch", daemon=True)
+    thread.start()
+    return thread
@@ -3,26 +3,38 @@ Resolve NBA and NCAA player headshot URLs.
 - NBA: Uses nba_api to get person ID, then cdn.nba.com
 - NCAA: ESPN CDN - fetches from ESPN API (roster by team) when school is known
 """
+import importlib.util
 import json
+import os
 import re
+import threading
+import time
+import unicodedata
 from functools import lru_cache
 from urllib.request import Request, urlopen
 from urllib.error import URLError, HTTPError
 
-try:
-    from nba_api.stats.static import players as nba_players
-    NBA_API_AVAILABLE = True
-except ImportError:
-    NBA_API_AVAILABLE = False
+import metrics
+
+# nba_api is only imported when the first NBA headshot is resolved (see _nba_id_index)
+NBA_API_AVAILABLE = importlib.util.find_spec("nba_api") is not None
 
 NBA_CDN = "https://cdn.nba.com/headshots/nba/latest/1040x760"
 ESPN_NCAA_CDN = "https://a.espncdn.com/i/headshots/mens-college-basketball/players/full"
-ESPN_TEAMS_URL = "https://site.api.espn.com/apis/site/v2/sports/basketball/mens-college-basketball/teams"
-ESPN_ROSTER_URL = "https://site.api.espn.com/apis/site/v2/sports/basketball/mens-college-basketball/teams/{team_id}/roster"
+# ESPN_API_BASE lets tests / offline runs point the lookups at a local stand-in server
+ESPN_API_BASE = os.environ.get("ESPN_API_BASE", "https://site.api.espn.com").rstrip("/")
+ESPN_TEAMS_URL = f"{ESPN_API_BASE}/apis/site/v2/sports/basketball/mens-college-basketball/teams"
+ESPN_ROSTER_URL = f"{ESPN_API_BASE}/apis/site/v2/sports/basketball/mens-college-basketball/teams/{{team_id}}/roster"
 UI_AVATARS = "https://ui-avatars.com/api"
 
 _espn_team_cache: dict[str, str] = {}  # normalized_name -> team_id
 
+# Rosters change rarely; one download per team per ROSTER_TTL seconds
+ROSTER_TTL = 6 * 3600
+_espn_roster_cache: dict[str, tuple[float, dict]] = {}  # team_id -> (expires_at, name index)
+_espn_roster_lock = threading.Lock()
+_espn_roster_team_locks: dict[str, threading.Lock] = {}
+
 
 def _normalize_name(name: str) -> str:
     """Normalize for matching: lowercase, strip, collapse spaces."""
@@ -58,14 +70,16 @@ def _normalize_school(school: str) -> str:
     return s
 
 
-def _fetch_json(url: str) -> dict | list | None:
-    """Fetch JSON from URL. Returns None on error."""
-    try:
-        req = Request(url, headers={"User-Agent": "Hacklytics2026/1.0"})
-        with urlopen(req, timeout=8) as resp:
-            return json.loads(resp.read().decode())
-    except (URLError, HTTPError, json.JSONDecodeError, OSError):
-        return None
+def _fetch_json(url: str, target: str = "espn") -> dict | list | None:
+    """Fetch JSON from URL. Returns None on error. Timed under metrics label `target`."""
+    with metrics.OUTBOUND_LATENCY.time(target):
+        try:
+            req = Request(url, headers={"User-Agent": "Hacklytics2026/1.0"})
+            with urlopen(req, timeout=8) as resp:
+                return json.loads(resp.read().decode())
+        except (URLError, HTTPError, json.JSONDecodeError, OSError):
+            metrics.OUTBOUND_ERRORS.inc(target)
+            return None
 
 
 def _get_espn_team_id(school: str) -> str | None:
@@ -79,7 +93,7 @@ def _get_espn_team_id(school: str) -> str | None:
         return None
 
     if not _espn_team_cache:
-        data = _fetch_json(ESPN_TEAMS_URL)
+        data = _fetch_json(ESPN_TEAMS_URL, "espn_teams")
         if not data or "sports" not in data:
             return None
         for sport in data.get("sports", []):
@@ -120,37 +134,131 @@ def _get_espn_team_id(school: str) -> str | None:
     return None
 
 
-def _fetch_espn_headshot_from_roster(team_id: str, player_name: str) -> str | None:
-    """Fetch roster for team, find player by name, return headshot URL."""
-    url = ESPN_ROSTER_URL.format(team_id=team_id)
-    data = _fetch_json(url)
-    if not data or "athletes" not in data:
-        return None
+def _build_roster_index(data: dict) -> dict:
+    """
+    Name -> headshot href for one roster: exact normalized fullName/displayName keys,
+    plus frozenset(name tokens) of fullName so "last first" orderings still match.
+    First athlete with a headshot wins, like the old linear scan.
+    """
+    index: dict = {}
+    for athlete in data.get("athletes", []):
+        h = athlete.get("headshot") or {}
+        href = h.get("href") if isinstance(h, dict) else None
+        if not href:
+            continue
+        norm_full = _normalize_name(athlete.get("fullName") or "")
+        norm_display = _normalize_name(athlete.get("displayName") or "")
+        for key in (norm_full, norm_display):
+            if key:
+                index.setdefault(key, href)
+        if norm_full:
+            index.setdefault(frozenset(norm_full.split()), href)
+    return index
+
+
+def _get_roster_index(team_id: str) -> dict | None:
+    """Cached name index for a team roster; one download per team per ROSTER_TTL."""
+    now = time.monotonic()
+    entry = _espn_roster_cache.get(team_id)
+    if entry and entry[0] > now:
+        return entry[1]
+
+    with _espn_roster_lock:
+        team_lock = _espn_roster_team_locks.setdefault(team_id, threading.Lock())
+    with team_lock:
+        # another thread may have fetched it while we waited
+        entry = _espn_roster_cache.get(team_id)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+        data = _fetch_json(ESPN_ROSTER_URL.format(team_id=team_id), "espn_roster")
+        if not data or "athletes" not in data:
+            return None  # not cached: a failed download is retried next time
+        index = _build_roster_index(data)
+        _espn_roster_cache[team_id] = (time.monotonic() + ROSTER_TTL, index)
+        return index
 
+
+def _fetch_espn_headshot_from_roster(team_id: str, player_name: str) -> str | None:
+    """Find player by name in the team's (cached) roster, return headshot URL."""
     norm_query = _normalize_name(player_name)
     if not norm_query:
         return None
 
-    for athlete in data.get("athletes", []):
-        full = athlete.get("fullName") or ""
-        display = athlete.get("displayName") or ""
-        norm_full = _normalize_name(full)
-        norm_display = _normalize_name(display)
-        if norm_query == norm_full or norm_query == norm_display:
-            h = athlete.get("headshot") or {}
-            href = h.get("href") if isinstance(h, dict) else None
-            if href:
-                return href
-        # Fuzzy: "first last" matches "last, first" or "first last"
-        parts_q = set(norm_query.split())
-        parts_f = set(norm_full.split())
-        if parts_q and parts_q == parts_f:
-            h = athlete.get("headshot") or {}
-            href = h.get("href") if isinstance(h, dict) else None
-            if href:
-                return href
+    index = _get_roster_index(team_id)
+    if not index:
+        return None
+    # Fuzzy fallback: "first last" matches "last first"
+    return index.get(norm_query) or index.get(frozenset(norm_query.split()))
 
-    return None
+
+_NAME_SUFFIXES = {"jr", "sr", "ii", "iii", "iv", "v"}
+_nba_ids: dict[str, int] | None = None
+_nba_ids_lock = threading.Lock()
+
+
+def _fold_name(name: str) -> str:
+    """_normalize_name with accents stripped (Jokić -> jokic), like nba_api's own matching."""
+    decomposed = unicodedata.normalize("NFD", name or "")
+    return _normalize_name("".join(c for c in decomposed if unicodedata.category(c) != "Mn"))
+
+
+def _loose_name(folded: str) -> str:
+    """Drop punctuation and generational suffixes: "a.j. green" -> "aj green", "gg jackson ii" -> "gg jackson"."""
+    tokens = re.sub(r"[^\w\s]", "", folded).split()
+    while len(tokens) > 2 and tokens[-1] in _NAME_SUFFIXES:
+        tokens.pop()
+    return " ".join(tokens)
+
+
+def _last_first(folded: str) -> str:
+    tokens = folded.split()
+    return f"{tokens[-1]} {' '.join(tokens[:-1])}" if len(tokens) > 1 else folded
+
+
+def _nba_id_index() -> dict[str, int]:
+    """
+    Folded name -> NBA person id over nba_api's static player list, built once.
+    Keys: full name, last-first, then loose (no punctuation/suffix) forms of both.
+    Exact forms keep nba_api's list order; loose forms prefer active players.
+    """
+    global _nba_ids
+    if _nba_ids is not None:
+        return _nba_ids
+    with _nba_ids_lock:
+        if _nba_ids is not None:
+            return _nba_ids
+        index: dict[str, int] = {}
+        if NBA_API_AVAILABLE:
+            from nba_api.stats.static import players as nba_players
+
+            with metrics.OUTBOUND_LATENCY.time("nba_api_static"):
+                people = [(p["id"], _fold_name(p["full_name"]), p.get("is_active", False))
+                          for p in nba_players.get_players() if p.get("full_name")]
+            for pid, folded, _ in people:
+                index.setdefault(folded, pid)
+            for pid, folded, _ in people:
+                index.setdefault(_last_first(folded), pid)
+            for pid, folded, _ in sorted(people, key=lambda p: not p[2]):
+                index.setdefault(_loose_name(folded), pid)
+                index.setdefault(_loose_name(_last_first(folded)), pid)
+        _nba_ids = index
+    return _nba_ids
+
+
+def resolve_nba_headshot(player_name: str) -> str | None:
+    """NBA headshot URL from cdn.nba.com, or None if the player can't be resolved."""
+    if not player_name or not player_name.strip() or not NBA_API_AVAILABLE:
+        return None
+
+    name = _fold_name(player_name)
+    if len(name.split()) < 2:
+        return None
+
+    index = _nba_id_index()
+    person_id = index.get(name) or index.get(_loose_name(name))
+    if person_id is None:
+        return None
+    return f"{NBA_CDN}/{person_id}.png"
 
 
 @lru_cache(maxsize=500)
@@ -158,42 +266,10 @@ def get_nba_headshot(player_name: str) -> str:
     """
     Return NBA player headshot URL from cdn.nba.com, or placeholder if not found.
     """
-    if not player_name or not player_name.strip():
-        return _placeholder_headshot(player_name or "?", "NBA")
-
-    if not NBA_API_AVAILABLE:
-        return _placeholder_headshot(player_name, "NBA")
-
-    try:
-        name = _normalize_name(player_name)
-        if not name:
-            return _placeholder_headshot(player_name, "NBA")
-
-        # nba_api expects "First Last" format
-        parts = name.split()
-        if len(parts) < 2:
-            return _placeholder_headshot(player_name, "NBA")
-
-        matches = nba_players.find_players_by_full_name(player_name.strip())
-        if not matches:
-            # Try last-name-first or variations
-            last_first = f"{parts[-1]} {parts[0]}"
-            matches = nba_players.find_players_by_full_name(last_first)
-        if not matches:
-            return _placeholder_headshot(player_name, "NBA")
-
-        # Prefer current/active player (first result is often best match)
-        first = matches[0]
-        person_id = first.get("id") if isinstance(first, dict) else getattr(first, "id", None)
-        if person_id is None:
-            return _placeholder_headshot(player_name, "NBA")
-
-        return f"{NBA_CDN}/{person_id}.png"
-    except Exception:
-        return _placeholder_headshot(player_name, "NBA")
-
-
-def _placeholder_headshot(name: str, context: str = "") -> str:
+    return resolve_nba_headshot(player_name) or placeholder_headshot(player_name or "?", "NBA")
+
+
+def placeholder_headshot(name: str, context: str = "") -> str:
     """Professional-looking fallback when no real headshot is found."""
     clean = (name or "?").strip()
     if not clean:
@@ -201,13 +277,11 @@ def _placeholder_headshot(name: str, context: str = "") -> str:
     return f"{UI_AVATARS}/?name={clean.replace(' ', '+')}&background=1a1a2e&color=ff6b35&bold=true&size=260"
 
 
-@lru_cache(maxsize=1000)
-def get_ncaa_headshot(player_name: str, espn_id: str | None = None, school: str = "") -> str:
+def resolve_ncaa_headshot(player_name: str, espn_id: str | None = None, school: str = "") -> str | None:
     """
-    Return NCAA player headshot URL from ESPN CDN.
+    NCAA player headshot URL from ESPN, or None if it can't be resolved.
     - If espn_id provided: use direct CDN URL.
     - If school provided: fetch ESPN roster and match player by name.
-    - Else: professional placeholder.
     """
     if espn_id and str(espn_id).isdigit():
         return f"{ESPN_NCAA_CDN}/{espn_id}.png"
@@ -215,8 +289,14 @@ def get_ncaa_headshot(player_name: str, espn_id: str | None = None, school: str
     if player_name and school:
         team_id = _get_espn_team_id(school)
         if team_id:
-            url = _fetch_espn_headshot_from_roster(team_id, player_name)
-            if url:
-                return url
+            return _fetch_espn_headshot_from_roster(team_id, player_name)
+
+    return None
 
-    return _placeholder_headshot(player_name or "?", "NCAA")
+
+@lru_cache(maxsize=1000)
+def get_ncaa_headshot(player_name: str, espn_id: str | None = None, school: str = "") -> str:
+    """
+    Return NCAA player headshot URL from ESPN CDN, or a professional placeholder.
+    """
+    return resolve_ncaa_headshot(player_name, espn_id, school) or placeholder_headshot(player_name or "?", "NCAA")
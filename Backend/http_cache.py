@@ -0,0 +1,126 @@
+"""
+Conditional GETs + precompressed bodies for read-only JSON endpoints.
+- Responses are keyed by (data version, path + query): strong ETag, Cache-Control,
+  304 on a matching If-None-Match.
+- The identity / gzip / brotli bodies are built once per version and reused,
+  so repeat requests skip both the view and the compression.
+"""
+import gzip
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+from flask import make_response, request
+
+import metrics
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+# Browsers may reuse a response this long without asking; after that they revalidate (-> 304)
+MAX_AGE = int(os.environ.get("HTTP_CACHE_MAX_AGE", "60"))
+MAX_ENTRIES = 4096
+MIN_COMPRESS_BYTES = 512  # tiny bodies aren't worth a Content-Encoding
+
+
+def _compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=5)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=6, mtime=0)
+    return body
+
+
+def _pick_encoding(size: int) -> str:
+    if size < MIN_COMPRESS_BYTES:
+        return "identity"
+    accepted = request.accept_encodings
+    if BROTLI_AVAILABLE and accepted["br"]:
+        return "br"
+    if accepted["gzip"]:
+        return "gzip"
+    return "identity"
+
+
+class ResponseCache:
+    """LRU of (version, path+query) -> {encoding: body}, for successful responses only."""
+
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            bodies = self._entries.get(key)
+            if bodies is not None:
+                self._entries.move_to_end(key)
+            return bodies
+
+    def put(self, key, bodies: dict):
+        with self._lock:
+            self._entries[key] = bodies
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_cache = ResponseCache()
+
+
+def _finish(resp, tag: str, encoding: str):
+    resp.headers["ETag"] = f'"{tag}"'
+    resp.headers["Cache-Control"] = f"public, max-age={MAX_AGE}"
+    resp.headers["Vary"] = "Accept-Encoding"
+    if encoding != "identity":
+        resp.headers["Content-Encoding"] = encoding
+    return resp
+
+
+def cached(version_fn):
+    """
+    Decorator for JSON GET views whose output depends only on the URL and version_fn().
+    Non-200 responses pass through untouched and are not cached.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            version = version_fn()
+            url = request.full_path
+            etag = hashlib.blake2b(f"{version}|{url}".encode(), digest_size=12).hexdigest()
+
+            # a tag carries the encoding as a suffix; any encoding of this version is a match
+            for tag in request.if_none_match.as_set(include_weak=True):
+                if tag.split("-", 1)[0] == etag:
+                    metrics.CACHE.inc("http", "not_modified")
+                    return _finish(make_response("", 304), tag, "identity")
+
+            key = (version, url)
+            bodies = _cache.get(key)
+            metrics.CACHE.inc("http", "miss" if bodies is None else "hit")
+            if bodies is None:
+                resp = make_response(view(*args, **kwargs))
+                if resp.status_code != 200 or resp.direct_passthrough:
+                    return resp
+                bodies = {"identity": resp.get_data(), "mimetype": resp.mimetype}
+                _cache.put(key, bodies)
+
+            encoding = _pick_encoding(len(bodies["identity"]))
+            if encoding not in bodies:
+                bodies[encoding] = _compress(bodies["identity"], encoding)
+
+            resp = make_response(bodies[encoding])
+            resp.mimetype = bodies["mimetype"]
+            tag = etag if encoding == "identity" else f"{etag}-{encoding}"
+            return _finish(resp, tag, encoding)
+        return wrapper
+    return decorator
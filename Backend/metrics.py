@@ -0,0 +1,154 @@
+"""
+In-process request metrics, exposed in Prometheus text format (see /metrics in app.py).
+- Counters and fixed-bucket histograms, one lock each; recording is a dict lookup + add.
+- Values are per process: under gunicorn each worker reports its own numbers
+  (scrape through the load balancer, or aggregate per instance).
+- Outbound headshot lookups run in the worker that does the prefetch (see
+  app.start_headshot_prefetch), so that worker's /metrics carries their timings;
+  nothing is recorded in the gunicorn master, which never serves a scrape.
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + "}"
+
+
+class Counter:
+    def __init__(self, name, doc, labelnames=()):
+        self.name, self.doc, self.labelnames = name, doc, tuple(labelnames)
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels) -> float:
+        return self._values.get(labels, 0.0)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, v in items:
+            lines.append(f"{self.name}{_labels(self.labelnames, labels)} {v:g}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, doc, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name, self.doc, self.labelnames = name, doc, tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series: dict[tuple, list] = {}  # labels -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, upper in enumerate(self.buckets):
+                if value <= upper:
+                    series[i] += 1
+                    break
+            else:
+                series[len(self.buckets)] += 1
+            series[-1] += value
+
+    def count(self, *labels) -> int:
+        series = self._series.get(labels)
+        return sum(series[:-1]) if series else 0
+
+    @contextmanager
+    def time(self, *labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._series.items())
+        for labels, series in items:
+            cumulative = 0
+            for upper, n in zip((*self.buckets, "+Inf"), series[:-1]):
+                cumulative += n
+                le = upper if upper == "+Inf" else f"{upper:g}"
+                lines.append(
+                    f"{self.name}_bucket{_labels((*self.labelnames, 'le'), (*labels, le))} {cumulative}"
+                )
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {series[-1]:.6f}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+# =========================
+# Metrics recorded by the app
+# =========================
+
+REQUESTS = Counter(
+    "proscout_http_requests_total", "HTTP requests by route, method and status.",
+    ("route", "method", "status"),
+)
+REQUEST_LATENCY = Histogram(
+    "proscout_http_request_duration_seconds", "Time spent handling a request, by route.",
+    ("route",),
+)
+ERRORS = Counter(
+    "proscout_http_errors_total", "Requests answered with a 5xx (including unhandled exceptions).",
+    ("route",),
+)
+CACHE = Counter(
+    "proscout_cache_requests_total", "Cache lookups by cache and result (hit, miss, not_modified).",
+    ("cache", "result"),
+)
+OUTBOUND_LATENCY = Histogram(
+    "proscout_outbound_request_duration_seconds", "Outbound headshot lookups (ESPN API, nba_api list).",
+    ("target",),
+)
+OUTBOUND_ERRORS = Counter(
+    "proscout_outbound_errors_total", "Failed outbound headshot lookups.",
+    ("target",),
+)
+
+ALL = (REQUESTS, REQUEST_LATENCY, ERRORS, CACHE, OUTBOUND_LATENCY, OUTBOUND_ERRORS)
+
+
+def render_all() -> str:
+    lines = []
+    for metric in ALL:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def install(app):
+    """Time every request of a Flask app, labeled by its URL rule (not the raw path)."""
+    from flask import g, request
+
+    @app.before_request
+    def _start_timer():
+        g._metrics_start = time.perf_counter()
+
+    @app.after_request
+    def _record(response):
+        start = g.pop("_metrics_start", None)
+        if start is not None:
+            route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+            REQUEST_LATENCY.observe(time.perf_counter() - start, route)
+            REQUESTS.inc(route, request.method, str(response.status_code))
+            if response.status_code >= 500:
+                ERRORS.inc(route)
+        return response
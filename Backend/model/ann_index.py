@@ -0,0 +1,144 @@
+"""
+Nearest-neighbor indexes for cosine similarity over L2-normalized rows (see CompsIndex).
+- ExactIndex: brute force, one matrix-vector product per query. The reference for
+  recall checks and the default while the pool is small.
+- InvertedFileIndex: k-means cells; a query reads the few cells nearest to it
+  and the caller reranks that shortlist exactly, so scores are exact and only
+  recall is approximate.
+make_index() picks one by name; "auto" stays exact below AUTO_MIN_ROWS rows.
+"""
+
+import math
+import os
+
+import numpy as np
+
+# Brute force is a single BLAS call: below this many rows it beats any index
+AUTO_MIN_ROWS = 20_000
+
+# Recall vs latency for InvertedFileIndex: cells read per query (out of ~2 * sqrt(rows))
+PRESETS = {
+    "fast": dict(n_probe=4),
+    "balanced": dict(n_probe=16),
+    "accurate": dict(n_probe=48),
+}
+
+# Shortlist widening steps (multiples of n_probe) for filtered queries, before brute force
+WIDEN_STEPS = (1, 4, 16)
+
+DEFAULT_KIND = os.environ.get("COMPS_ANN", "auto")  # auto | exact | ivf
+DEFAULT_PRESET = os.environ.get("COMPS_ANN_PRESET", "balanced")
+
+
+def top_k(sims: np.ndarray, k: int) -> np.ndarray:
+    """Positions of the k largest values, best first (stable for ties)."""
+    k = min(k, len(sims))
+    top = np.argpartition(-sims, k - 1)[:k] if 0 < k < len(sims) else np.arange(len(sims))
+    return top[np.argsort(-sims[top], kind="stable")]
+
+
+class ExactIndex:
+    kind = "exact"
+
+    def __init__(self, X):
+        self.X = X
+
+    def candidates(self, x, widen=1):
+        """None = every row (nothing to prune)."""
+        return None
+
+    def search(self, x, k):
+        """(row positions, cosine similarities) of the exact top-k, best first."""
+        sims = self.X @ x
+        top = top_k(sims, k)
+        return top, sims[top]
+
+
+def _nearest_centroid(X, C, block=16384):
+    """Index of the closest row of C (euclidean) for every row of X, in float32 row blocks."""
+    C = C.astype(np.float32)
+    c_sq = np.einsum("ij,ij->i", C, C)
+    out = np.empty(len(X), dtype=np.int64)
+    for start in range(0, len(X), block):
+        out[start:start + block] = np.argmin(c_sq - 2.0 * (X[start:start + block].astype(np.float32) @ C.T), axis=1)
+    return out
+
+
+class InvertedFileIndex:
+    """
+    Inverted file: k-means splits the rows into n_lists cells (the cells follow
+    the data, however skewed the feature scales are) and rows are stored grouped
+    by cell. A query ranks the cell centroids and reads the n_probe closest cells.
+
+    n_lists defaults to ~lists_per_sqrt * sqrt(rows). k-means runs a few Lloyd
+    iterations on a sample of sample_per_list rows per cell, then every row is
+    assigned to its nearest centroid.
+    """
+
+    kind = "ivf"
+
+    def __init__(self, X, n_probe=16, n_lists=None, lists_per_sqrt=2.0, sample_per_list=32,
+                 n_iter=10, seed=0):
+        self.X = X
+        n = len(X)
+        n_lists = max(1, min(n, n_lists or int(lists_per_sqrt * math.sqrt(n))))
+        self.n_probe = min(n_probe, n_lists)
+        rng = np.random.default_rng(seed)
+
+        sample = X[rng.choice(n, min(n, sample_per_list * n_lists), replace=False)] if n else X
+        C = sample[rng.choice(len(sample), n_lists, replace=False)].copy() if n else X[:0]
+        for _ in range(n_iter):
+            labels = _nearest_centroid(sample, C)
+            counts = np.bincount(labels, minlength=n_lists)
+            sums = np.stack([np.bincount(labels, weights=col, minlength=n_lists) for col in sample.T], axis=1)
+            moved = counts > 0  # empty cells keep their old centroid
+            C[moved] = sums[moved] / counts[moved, None]
+        self.centroids = C
+        self._c_sq = np.einsum("ij,ij->i", C, C)
+
+        labels = _nearest_centroid(X, C)
+        order = np.argsort(labels, kind="stable")
+        self.rows = order.astype(np.int32)
+        self.bounds = np.searchsorted(labels[order], np.arange(n_lists + 1))
+
+    def candidates(self, x, widen=1):
+        """Row positions in the widen * n_probe cells whose centroids are closest to x."""
+        d = self._c_sq - 2.0 * (self.centroids @ x)
+        n_probe = self.n_probe * widen
+        cells = np.argpartition(d, n_probe - 1)[:n_probe] if n_probe < len(d) else np.arange(len(d))
+        parts = [self.rows[self.bounds[c]:self.bounds[c + 1]] for c in cells]
+        return np.concatenate(parts) if parts else np.empty(0, dtype=np.int32)
+
+    def search(self, x, k):
+        """(row positions, cosine similarities) of the approximate top-k, best first."""
+        cand = self.candidates(x)
+        sims = self.X[cand] @ x
+        top = top_k(sims, k)
+        return cand[top], sims[top]
+
+
+def make_index(X, kind=None, preset=None, **params):
+    """
+    kind: "exact", "ivf" or "auto" (ivf from AUTO_MIN_ROWS rows up), default COMPS_ANN.
+    preset: a PRESETS name (default COMPS_ANN_PRESET); params override single settings.
+    """
+    kind = kind or DEFAULT_KIND
+    if kind == "auto":
+        kind = "ivf" if len(X) >= AUTO_MIN_ROWS else "exact"
+    if kind == "exact":
+        return ExactIndex(X)
+    if kind == "ivf":
+        settings = dict(PRESETS[preset or DEFAULT_PRESET])
+        settings.update(params)
+        return InvertedFileIndex(X, **settings)
+    raise ValueError(f"Unknown ANN index kind: {kind!r} (expected auto, exact or ivf)")
+
+
+def recall_at_k(index, queries, k=10) -> float:
+    """Mean fraction of the exact top-k that index.search returns, over the query rows."""
+    exact = ExactIndex(index.X)
+    hits = 0
+    for x in queries:
+        truth = set(exact.search(x, k)[0].tolist())
+        hits += len(truth & set(index.search(x, k)[0].tolist()))
+    return hits / (k * len(queries)) if len(queries) else 1.0
@@ -1,12 +1,23 @@
+from __future__ import annotations
+
+import json
+import os
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING
+
 import numpy as np
 import pandas as pd
-from sklearn.cluster import KMeans
-from sklearn.metrics import pairwise_distances
+
+# sklearn / scipy take ~1s to import, so they're imported where they're used:
+# serving only needs them once an archetype is assigned, not at app import.
+if TYPE_CHECKING:
+    from sklearn.cluster import KMeans
 
 # --- Imports from your KNN comps module ---
 # If your project structure is different, change this import to:
 # from model.knn_comps import _ensure_numeric, FEATURE_COLS, apply_feature_weights
-from .knn_comps import _ensure_numeric, FEATURE_COLS
+from .knn_comps import _ensure_numeric, FEATURE_COLS, data_fingerprint
+from . import data_loader
 
 # Optional: only if you actually have it in knn_comps
 try:
@@ -16,6 +27,12 @@ except Exception:
         return X
 
 
+def pairwise_distances(X, Y, metric="euclidean"):
+    """sklearn.metrics.pairwise_distances, imported on first use."""
+    from sklearn.metrics import pairwise_distances as _pairwise_distances
+    return _pairwise_distances(X, Y, metric=metric)
+
+
 def _build_X(df: pd.DataFrame, min_mp: int | None = None):
     """
     Build feature matrix:
@@ -55,6 +72,8 @@ def train_nba_archetypes(df_nba: pd.DataFrame, k: int = 8, min_mp: int = 1500):
     Train KMeans archetypes on NBA.
     Returns: kmeans, df_nba_labeled, centroids_df
     """
+    from sklearn.cluster import KMeans
+
     X, df_clean = _build_X(df_nba, min_mp=min_mp)
 
     kmeans = KMeans(n_clusters=k, random_state=42, n_init=25)
@@ -84,7 +103,141 @@ ARCHETYPE_NAMES = {
 }
 
 
-def assign_ncaa_to_archetype(player_row: pd.Series, kmeans: KMeans):
+# =========================
+# Persisted archetype model
+# =========================
+# KMeans(n_init=25) is only run on demand (`python -m model.archetypes train`).
+# Startup loads the saved centroids; new fits are matched to the saved centroids
+# so cluster ids -- and therefore ARCHETYPE_NAMES -- stay stable across retrains.
+
+ARCHETYPE_ARTIFACT_PATH = os.path.join(data_loader.ARTIFACT_DIR, "nba_archetypes.npz")
+
+
+class ArchetypeModel:
+    """
+    Saved archetype centroids. Exposes cluster_centers_ like a fitted KMeans,
+    so assign_ncaa_to_archetype(s) accept either.
+    """
+
+    def __init__(self, centroids, meta):
+        self.cluster_centers_ = np.asarray(centroids, dtype="float64")
+        self.meta = meta
+
+    @property
+    def version(self):
+        return self.meta.get("version", 0)
+
+
+def _training_hash(X, k, min_mp):
+    return data_fingerprint(X, repr((k, min_mp, FEATURE_COLS)))
+
+
+def save_archetype_artifact(model: ArchetypeModel, labels, dists, path: str = ARCHETYPE_ARTIFACT_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp.npz"
+    np.savez(
+        tmp,
+        centroids=model.cluster_centers_,
+        labels=np.asarray(labels, dtype=np.int16),
+        dist_to_centroid=np.asarray(dists, dtype="float64"),
+        meta=np.array(json.dumps(model.meta)),
+    )
+    os.replace(tmp, path)
+
+
+def load_archetype_artifact(path: str = ARCHETYPE_ARTIFACT_PATH):
+    """(model, labels, dists) from disk, or None if there is no saved model."""
+    if not os.path.exists(path):
+        return None
+    with np.load(path, allow_pickle=False) as z:
+        meta = json.loads(str(z["meta"]))
+        return ArchetypeModel(z["centroids"], meta), z["labels"].astype(int), z["dist_to_centroid"]
+
+
+def _match_to_previous(centroids, previous):
+    """Reorder new centroids so new[i] is the one closest to previous[i] (Hungarian matching)."""
+    from scipy.optimize import linear_sum_assignment
+
+    cost = pairwise_distances(previous, centroids, metric="euclidean")
+    _, cols = linear_sum_assignment(cost)
+    return centroids[cols]
+
+
+def retrain_nba_archetypes(df_nba: pd.DataFrame, k: int = 8, min_mp: int = 1500,
+                           path: str = ARCHETYPE_ARTIFACT_PATH):
+    """
+    Fit KMeans, match centroids to the saved model (if any) so names stay put,
+    and save the result as the next artifact version.
+    Returns: model, df_nba_labeled, centroids_df
+    """
+    import sklearn
+
+    X, df_clean = _build_X(df_nba, min_mp=min_mp)
+    kmeans, _, _ = train_nba_archetypes(df_nba, k=k, min_mp=min_mp)
+    centroids = kmeans.cluster_centers_
+
+    previous = load_archetype_artifact(path)
+    version = 1
+    if previous is not None:
+        prev_model = previous[0]
+        version = prev_model.version + 1
+        if prev_model.cluster_centers_.shape == centroids.shape:
+            centroids = _match_to_previous(centroids, prev_model.cluster_centers_)
+
+    model = ArchetypeModel(centroids, {
+        "version": version,
+        "k": k,
+        "min_mp": min_mp,
+        "data_hash": _training_hash(X, k, min_mp),
+        "n_train": int(len(X)),
+        "sklearn_version": sklearn.__version__,
+        "trained_at": datetime.now(timezone.utc).isoformat(),
+    })
+    labels, dists = _label_rows(X, model)
+    save_archetype_artifact(model, labels, dists, path)
+
+    return model, _labeled(df_clean, labels, dists), pd.DataFrame(centroids, columns=FEATURE_COLS)
+
+
+def load_nba_archetypes(df_nba: pd.DataFrame, k: int = 8, min_mp: int = 1500,
+                        path: str = ARCHETYPE_ARTIFACT_PATH):
+    """
+    Startup path: use the saved archetype model instead of fitting KMeans.
+    - saved model trained on this exact data -> saved labels/distances
+    - data changed since -> keep the saved centroids, label rows by nearest centroid
+      (retrain explicitly with `python -m model.archetypes train`)
+    - nothing saved yet -> train once and save
+    Returns: model, df_nba_labeled, centroids_df
+    """
+    X, df_clean = _build_X(df_nba, min_mp=min_mp)
+    saved = load_archetype_artifact(path)
+
+    if saved is None or saved[0].cluster_centers_.shape != (k, len(FEATURE_COLS)):
+        return retrain_nba_archetypes(df_nba, k=k, min_mp=min_mp, path=path)
+
+    model, labels, dists = saved
+    if model.meta.get("data_hash") != _training_hash(X, k, min_mp) or len(labels) != len(X):
+        print(f"NBA data changed since archetypes v{model.version} were trained; "
+              "labeling with saved centroids (run `python -m model.archetypes train` to refit)")
+        labels, dists = _label_rows(X, model)
+
+    return model, _labeled(df_clean, labels, dists), pd.DataFrame(model.cluster_centers_, columns=FEATURE_COLS)
+
+
+def _label_rows(X, model):
+    dists = pairwise_distances(X, model.cluster_centers_, metric="euclidean")
+    labels = np.argmin(dists, axis=1)
+    return labels, dists[np.arange(len(X)), labels]
+
+
+def _labeled(df_clean, labels, dists):
+    df_clean = df_clean.copy()
+    df_clean["cluster"] = labels
+    df_clean["dist_to_centroid"] = dists
+    return df_clean
+
+
+def assign_ncaa_to_archetype(player_row: pd.Series, kmeans: KMeans | ArchetypeModel):
     """
     Returns: cluster_id, archetype_name, confidence, centroid_distances
     """
@@ -115,6 +268,37 @@ def assign_ncaa_to_archetype(player_row: pd.Series, kmeans: KMeans):
     return cluster_id, ARCHETYPE_NAMES.get(cluster_id, f"Cluster {cluster_id}"), confidence, centroid_dists
 
 
+def assign_ncaa_to_archetypes(df: pd.DataFrame, kmeans: KMeans | ArchetypeModel):
+    """
+    Batch version of assign_ncaa_to_archetype for a whole NCAA frame.
+    Returns: cluster_ids, archetype_names, confidences (arrays aligned with df rows)
+    """
+    X = df.reindex(columns=FEATURE_COLS).apply(pd.to_numeric, errors="coerce").to_numpy(dtype="float64")
+
+    try:
+        X = apply_feature_weights(X, FEATURE_COLS)
+    except Exception:
+        pass
+
+    norms = np.linalg.norm(X, axis=1, keepdims=True)
+    norms = np.where(norms == 0, 1.0, norms)
+    X = X / norms
+
+    centroid_dists = pairwise_distances(X, kmeans.cluster_centers_, metric="euclidean")
+    cluster_ids = np.argmin(centroid_dists, axis=1)
+
+    # same 1st-vs-2nd centroid gap confidence as the single-row version
+    d_sorted = np.sort(centroid_dists, axis=1)
+    if d_sorted.shape[1] >= 2:
+        second = d_sorted[:, 1]
+        confidences = np.where(second > 0, 1.0 - d_sorted[:, 0] / np.where(second > 0, second, 1.0), 0.0)
+    else:
+        confidences = np.zeros(len(X))
+
+    names = np.array([ARCHETYPE_NAMES.get(int(c), f"Cluster {int(c)}") for c in cluster_ids], dtype=object)
+    return cluster_ids, names, confidences
+
+
 def top_nba_examples(df_nba_labeled: pd.DataFrame, cluster_id: int, n: int = 20):
     sub = df_nba_labeled[df_nba_labeled["cluster"] == cluster_id].copy()
     sub = sub.sort_values("dist_to_centroid", ascending=True).head(n)
@@ -125,6 +309,8 @@ def inspect_archetypes_k8(df_nba):
     """
     Fit k=8 and print the 20 closest players to each centroid.
     """
+    from sklearn.cluster import KMeans
+
     df_clean = df_nba.dropna(subset=FEATURE_COLS).copy()
     if "MP" in df_clean.columns:
         df_clean["MP"] = pd.to_numeric(df_clean["MP"], errors="coerce")
@@ -164,9 +350,17 @@ def inspect_archetypes_k8(df_nba):
 
 
 if __name__ == "__main__":
-    from data_loader import load_current_nba_data, make_nba_playstyle_df
-
-    df_nba = load_current_nba_data()
-    df_nba = make_nba_playstyle_df(df_nba)
-
-    inspect_archetypes_k8(df_nba)
\ No newline at end of file
+    # python -m model.archetypes [inspect|train]   (from Backend/)
+    import sys
+    from model.data_loader import load_current_nba_playstyle
+
+    df_nba = load_current_nba_playstyle()
+
+    if sys.argv[1:] == ["train"]:
+        model, df_labeled, _ = retrain_nba_archetypes(df_nba)
+        print(f"Saved archetypes v{model.version} to {ARCHETYPE_ARTIFACT_PATH}")
+        for c in range(len(model.cluster_centers_)):
+            names = top_nba_examples(df_labeled, c, n=5)["Player"].tolist()
+            print(f"{c} {ARCHETYPE_NAMES.get(c, f'Cluster {c}')}: {', '.join(names)}")
+    else:
+        inspect_archetypes_k8(df_nba)
\ No newline at end of file
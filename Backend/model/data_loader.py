@@ -1,10 +1,197 @@
+import glob
+import hashlib
 import os
 import pandas as pd
 import numpy as np
+from pandas.api.types import union_categoricals
+
+try:
+    import pyarrow  # noqa: F401
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
 
 # absolute paths
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # .../Backend
-DATA_DIR = os.path.join(BASE_DIR, "data")                               # .../Backend/data
+# PROSCOUT_DATA_DIR points every loader at another copy of the data (e.g. bench/synth.py output)
+DATA_DIR = os.environ.get("PROSCOUT_DATA_DIR", os.path.join(BASE_DIR, "data"))  # .../Backend/data
+ARTIFACT_DIR = os.path.join(BASE_DIR, "artifacts")                     # trained model artifacts
+CACHE_DIR = os.environ.get("PROSCOUT_CACHE_DIR", os.path.join(BASE_DIR, ".cache"))
+SNAPSHOT_DIR = os.path.join(CACHE_DIR, "snapshots")
+
+# draftability.py's saved model; here so the serving path can stat it without importing
+# sklearn. Bump the version when the artifact layout or the feature pipeline changes.
+DRAFTABILITY_ARTIFACT_VERSION = 2
+DRAFTABILITY_ARTIFACT_PATH = os.path.join(ARTIFACT_DIR, f"draftability_v{DRAFTABILITY_ARTIFACT_VERSION}.joblib")
+
+# Set PROSCOUT_SNAPSHOTS=0 to always parse the source files
+SNAPSHOTS_ENABLED = os.environ.get("PROSCOUT_SNAPSHOTS", "1") != "0"
+SNAPSHOT_VERSION = 1  # bump to invalidate every snapshot
+
+
+# =========================
+# On-disk snapshots of parsed frames
+# =========================
+
+def _snapshot_key(sources: list[str]) -> str:
+    """
+    Key for a snapshot: size + mtime of every source file, plus this module
+    (so editing the parsing code invalidates snapshots too).
+    """
+    h = hashlib.blake2b(digest_size=12)
+    h.update(str(SNAPSHOT_VERSION).encode())
+    for path in [*sources, os.path.abspath(__file__)]:
+        st = os.stat(path)
+        h.update(f"{os.path.abspath(path)}:{st.st_size}:{st.st_mtime_ns}".encode())
+    return h.hexdigest()
+
+
+def _read_snapshot(path: str) -> pd.DataFrame:
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path)
+    return pd.read_pickle(path)
+
+
+def _write_snapshot(df: pd.DataFrame, path: str):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    if path.endswith(".parquet"):
+        df.to_parquet(tmp)
+    else:
+        df.to_pickle(tmp)
+    os.replace(tmp, path)  # atomic: readers never see a half-written snapshot
+
+
+def load_snapshot(name: str, sources: list[str], build):
+    """
+    Return build() for these source files, from a snapshot in SNAPSHOT_DIR when
+    one exists for their current size/mtime; otherwise build it and write one.
+    Older snapshots of the same name are removed.
+    """
+    if not SNAPSHOTS_ENABLED:
+        return build()
+
+    ext = ".parquet" if PARQUET_AVAILABLE else ".pkl"
+    path = os.path.join(SNAPSHOT_DIR, f"{name}-{_snapshot_key(sources)}{ext}")
+
+    if os.path.exists(path):
+        try:
+            return _read_snapshot(path)
+        except Exception:
+            pass  # unreadable / written by another pandas version -> rebuild
+
+    df = build()
+
+    try:
+        os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+        _write_snapshot(df, path)
+        for old in glob.glob(os.path.join(SNAPSHOT_DIR, f"{name}-*")):
+            if old != path and not old.endswith(".tmp"):
+                os.remove(old)
+    except Exception:
+        pass  # read-only disk etc. -> still serve the freshly built frame
+
+    return df
+
+
+# =========================
+# Declared CSV schemas
+# =========================
+# Column -> dtype of every column the pipelines read from a source file;
+# read_schema_csv parses only those columns (usecols) with these dtypes instead of
+# inferring every column. "int64" columns are parsed as float64 (nullable Int64 parses
+# ~3x slower) and stay float64 only when they have blanks, like inference would.
+
+# Files above this size are parsed READ_CHUNK_ROWS rows at a time (bounded parser memory)
+READ_CHUNK_MB = float(os.environ.get("PROSCOUT_READ_CHUNK_MB", "256"))
+READ_CHUNK_ROWS = 200_000
+
+# trank_data.csv (headerless; names from pstatheaders.xlsx). Card stats, the
+# playstyle features and the draftability model inputs.
+TRANK_SCHEMA = {
+    "player_name": "str", "team": "category", "conf": "category",
+    "GP": "int64", "Min_per": "float64", "ORtg": "float64", "usg": "float64",
+    "eFG": "float64", "TS_per": "float64", "ORB_per": "float64", "DRB_per": "float64",
+    "AST_per": "float64", "TO_per": "float64", "FT_per": "float64",
+    "twoPA": "int64", "twoP_per": "float64", "TPA": "int64", "TP_per": "float64",
+    "blk_per": "float64", "stl_per": "float64", "ftr": "float64",
+    "yr": "str", "ht": "str", "year": "int64",
+    "rimmade+rimmiss": "float64", "midmade+midmiss": "float64",
+    "rimmade/(rimmade+rimmiss)": "float64", "midmade/(midmade+midmiss)": "float64",
+    "bpm": "float64", "mp": "float64", "treb": "float64", "ast": "float64",
+    "stl": "float64", "blk": "float64", "pts": "float64",
+}
+
+# NBA_Stats_2009_2026.csv / NBA_Advanced_2009_2026.csv: the history comps pool
+# (nba_history.py) and the draftability training targets (draftability.py)
+NBA_STATS_SCHEMA = {
+    "Player": "str", "Age": "int64", "Team": "category", "Pos": "category",
+    "G": "int64", "MP": "float64", "3P%": "float64", "eFG%": "float64",
+    "TRB": "float64", "AST": "float64", "PTS": "float64",
+    "Player-additional": "str", "Season": "int64",
+}
+NBA_ADV_SCHEMA = {
+    "Player": "str", "Age": "int64", "Team": "category", "Pos": "category",
+    "G": "int64", "MP": "int64", "TS%": "float64", "3PAr": "float64", "FTr": "float64",
+    "ORB%": "float64", "DRB%": "float64", "AST%": "float64", "STL%": "float64",
+    "BLK%": "float64", "TOV%": "float64", "USG%": "float64", "BPM": "float64",
+    "VORP": "float64", "Player-additional": "str", "Season": "int64",
+}
+
+# Some exports use "Tm" instead of "Team"
+COLUMN_ALIASES = {"Team": ["Tm"]}
+
+
+def _schema_columns(raw_names, schema, labels=None):
+    """
+    Raw column (name, or position with labels) -> (stripped name, schema dtype) for
+    every schema column in the file. Aliases keep their own name.
+    """
+    canonical = {name: name for name in schema}
+    for name, aliases in COLUMN_ALIASES.items():
+        if name in schema:
+            canonical.update({a: name for a in aliases})
+    out = {}
+    for raw, label in zip(raw_names, labels if labels is not None else raw_names):
+        name = str(label).strip()
+        if name in canonical:
+            out[raw] = (name, schema[canonical[name]])
+    return out
+
+
+def read_schema_csv(path: str, schema: dict, names: list[str] | None = None,
+                    chunk_rows: int | None = None, **read_kw) -> pd.DataFrame:
+    """
+    pd.read_csv of the schema's columns only, with its dtypes, in file order
+    (column names stripped). names: column names of a headerless file.
+    Files over READ_CHUNK_MB (or any file, given chunk_rows) are read in chunks;
+    categorical columns are unified across chunks.
+    """
+    if names is None:
+        columns = _schema_columns(pd.read_csv(path, nrows=0, **read_kw).columns, schema)
+    else:
+        columns = _schema_columns(range(len(names)), schema, names)
+        read_kw = {"header": None, **read_kw}
+    usecols = list(columns)
+    dtypes = {raw: "float64" if t == "int64" else t for raw, (_, t) in columns.items()}
+
+    if chunk_rows is None and os.path.getsize(path) > READ_CHUNK_MB * 1024 * 1024:
+        chunk_rows = READ_CHUNK_ROWS
+    if chunk_rows:
+        chunks = list(pd.read_csv(path, usecols=usecols, dtype=dtypes, chunksize=chunk_rows, **read_kw))
+        for raw, t in dtypes.items():
+            if t == "category" and len(chunks) > 1:
+                categories = union_categoricals([c[raw] for c in chunks]).categories
+                for c in chunks:
+                    c[raw] = c[raw].cat.set_categories(categories)
+        df = pd.concat(chunks, ignore_index=True)
+    else:
+        df = pd.read_csv(path, usecols=usecols, dtype=dtypes, **read_kw)
+
+    df = df.rename(columns={raw: name for raw, (name, _) in columns.items()})
+    for name, t in columns.values():
+        if t == "int64" and df[name].notna().all():
+            df[name] = df[name].astype("int64")
+    return df
 
 
 def load_current_ncaa_data():
@@ -12,24 +199,19 @@ def load_current_ncaa_data():
     data_path = os.path.join(DATA_DIR, "trank_data.csv")
     header_path = os.path.join(DATA_DIR, "pstatheaders.xlsx")
 
-    # Load header row (column names) from Excel
-    column_names = pd.read_excel(header_path, nrows=0).columns.tolist()
-
-    # Load raw CSV
-    df = pd.read_csv(data_path, header=None)
-
-    # Trim to match the number of headers 
-    df = df.iloc[:, :len(column_names)]
-
-    # Assign headers
-    df.columns = column_names
-
-    df.columns = df.columns.str.strip()
+    return load_snapshot(
+        "current_ncaa", [data_path, header_path],
+        lambda: _parse_current_ncaa_data(data_path, header_path),
+    )
 
-    df = df.iloc[:, :-2]
 
+def _parse_current_ncaa_data(data_path, header_path):
+    # Load header row (column names) from Excel
+    column_names = pd.read_excel(header_path, nrows=0).columns.tolist()
 
-    return df
+    # Only the TRANK_SCHEMA columns; the trailing ones ("role", "3p/100?" and the
+    # unnamed extras) are never read
+    return read_schema_csv(data_path, TRANK_SCHEMA, names=column_names)
 
 
 def load_past_ncaa_data():
@@ -66,6 +248,13 @@ def load_current_nba_data():
     per_path = os.path.join(DATA_DIR, "2025_per_game.csv")
     shoot_path = os.path.join(DATA_DIR, "2025_shooting.csv")
 
+    return load_snapshot(
+        "current_nba", [adv_path, per_path, shoot_path],
+        lambda: _parse_current_nba_data(adv_path, per_path, shoot_path),
+    )
+
+
+def _parse_current_nba_data(adv_path, per_path, shoot_path):
     df_adv = pd.read_csv(adv_path)
     df_per = pd.read_csv(per_path)
 
@@ -206,6 +395,15 @@ def make_nba_playstyle_df(df_nba: pd.DataFrame) -> pd.DataFrame:
 
     return df
 
+# Shooting percentages make_ncaa_playstyle_df always leaves as 0-1 fractions
+# (whatever scale trank_data.csv has them on, see pct_to_decimal_if_needed)
+NCAA_FRACTION_COLS = [
+    "TS_per", "eFG",
+    "rim_fg_pct", "mid_fg_pct", "three_fg_pct",
+    "FT_per", "twoP_per", "TP_per",
+]
+
+
 def make_ncaa_playstyle_df(df_ncaa: pd.DataFrame) -> pd.DataFrame:
     df = df_ncaa.copy()
 
@@ -250,13 +448,7 @@ def make_ncaa_playstyle_df(df_ncaa: pd.DataFrame) -> pd.DataFrame:
     df["mid_fg_pct"] = df["midmade/(midmade+midmiss)"]
     df["three_fg_pct"] = df["TP_per"]
 
-    PCT_COLS = [
-    "TS_per", "eFG",
-    "rim_fg_pct", "mid_fg_pct", "three_fg_pct",
-    "FT_per", "twoP_per", "TP_per"
-    ]
-
-    for c in PCT_COLS:
+    for c in NCAA_FRACTION_COLS:
         if c in df.columns:
             df[c] = pct_to_decimal_if_needed(df[c])
 
@@ -273,12 +465,67 @@ def make_ncaa_playstyle_df(df_ncaa: pd.DataFrame) -> pd.DataFrame:
 
     return df
 
+# Source files of the two playstyle frames (also the feature_store keys)
+NCAA_PLAYSTYLE_SOURCES = [os.path.join(DATA_DIR, "trank_data.csv"), os.path.join(DATA_DIR, "pstatheaders.xlsx")]
+NBA_PLAYSTYLE_SOURCES = [os.path.join(DATA_DIR, f) for f in ("2025_advanced.csv", "2025_per_game.csv", "2025_shooting.csv")]
+
+
+def load_current_ncaa_playstyle():
+    """load_current_ncaa_data + make_ncaa_playstyle_df, snapshotted together."""
+    return load_snapshot(
+        "current_ncaa_playstyle", NCAA_PLAYSTYLE_SOURCES,
+        lambda: make_ncaa_playstyle_df(load_current_ncaa_data()),
+    )
+
+
+def load_current_nba_playstyle():
+    """load_current_nba_data + make_nba_playstyle_df, snapshotted together."""
+    return load_snapshot(
+        "current_nba_playstyle", NBA_PLAYSTYLE_SOURCES,
+        lambda: make_nba_playstyle_df(load_current_nba_data()),
+    )
+
+
 def pct_to_decimal_if_needed(s):
     s = pd.to_numeric(s, errors="coerce")
     med = s.dropna().median()
     # if median is > 1.5, it's almost certainly 0–100 style percent
     return s / 100.0 if med > 1.5 else s
 
+# =========================
+# Serving frames: compaction + memory report
+# =========================
+
+def compact_frame(df: pd.DataFrame, keep: list[str], categorical=(), float32=()) -> pd.DataFrame:
+    """
+    Copy of df with only the `keep` columns that exist (in df's order), `categorical`
+    columns as category and `float32` float columns downcast. Columns whose values
+    are returned verbatim by an endpoint should stay out of `float32`.
+    """
+    keep = set(keep)
+    out = df[[c for c in df.columns if c in keep]].copy()
+    for c in categorical:
+        if c in out.columns:
+            out[c] = out[c].astype("category")
+    for c in float32:
+        if c in out.columns and pd.api.types.is_float_dtype(out[c]):
+            out[c] = out[c].astype("float32")
+    return out
+
+
+def frame_memory(df: pd.DataFrame) -> dict:
+    """Rows, total bytes and bytes/dtype per column of a frame (deep: counts string payloads)."""
+    usage = df.memory_usage(deep=True, index=True)
+    return {
+        "rows": int(len(df)),
+        "bytes": int(usage.sum()),
+        "columns": {
+            str(c): {"dtype": str(df[c].dtype), "bytes": int(usage[c])}
+            for c in df.columns
+        },
+    }
+
+
 if __name__ == "__main__":
     print("---- CURRENT NCAA ----")
     df_current = load_current_ncaa_data()
@@ -2,28 +2,52 @@
 NBA projection model: train on former NCAA players (2009-2021 drafted) and how they
 performed in the NBA. Uses scaled demographics (age, height) and NCAA production stats,
 then predicts how good current college players will be in the NBA.
+
+Training and inference are separate:
+    python draftability.py train     # fit the MLP, save the artifact, write the predictions CSV
+    python draftability.py predict   # re-score current_NCAA_players.csv with the saved artifact
+
+The artifact (ARTIFACT_PATH) holds the fitted pipeline, the target scaler, the clip
+bounds and the draftability normalization constants, so score_players() can score
+any DataFrame of NCAA rows without retraining.
 """
 
+import argparse
 import os
 import re
+from datetime import datetime, timezone
 
+import joblib
 import pandas as pd
 import numpy as np
+import sklearn
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+from sklearn.neural_network import MLPRegressor
+from sklearn.pipeline import Pipeline
+from sklearn.metrics import r2_score
 
-import data_loader
+try:
+    from model import data_loader
+except ImportError:  # run as a script from Backend/model
+    import data_loader
 
 # =========================
 # Paths / Inputs
 # =========================
 
-
-# Historical NCAA pool (former/current nba player college stats)
-df_ncaa = data_loader.load_past_ncaa_data()
-
 # Local B-Ref exports
 NBA_STATS_PATH = os.path.join(data_loader.DATA_DIR, "NBA_Stats_2009_2026.csv")
 NBA_ADV_PATH = os.path.join(data_loader.DATA_DIR, "NBA_Advanced_2009_2026.csv")
 
+# Current NCAA players (inference dataset) and the CSV the UI reads
+CURRENT_PATH = os.path.join(data_loader.DATA_DIR, "current_NCAA_players.csv")
+PREDICTIONS_PATH = os.path.join(data_loader.DATA_DIR, "mlp_current_predictions_with_draftability.csv")
+
+# Bump in data_loader when the artifact layout or the feature pipeline changes
+ARTIFACT_VERSION = data_loader.DRAFTABILITY_ARTIFACT_VERSION
+ARTIFACT_PATH = data_loader.DRAFTABILITY_ARTIFACT_PATH
+
 # =========================
 # Helper functions
 # =========================
@@ -44,7 +68,7 @@ def pick_one_row_per_player_season(df: pd.DataFrame,
                                   player_id_col="Player-additional",
                                   season_col="Season",
                                   team_col="Team") -> pd.DataFrame:
-   
+
     df = df.copy()
 
     # Some exports use "Tm" instead of "Team"
@@ -69,142 +93,6 @@ def pick_one_row_per_player_season(df: pd.DataFrame,
     return df.drop(columns=["_priority"], errors="ignore")
 
 
-# =========================
-# Load NBA regular + advanced
-# =========================
-
-nba_stats = clean_columns(pd.read_csv(NBA_STATS_PATH, encoding="utf-8", encoding_errors="ignore"))
-nba_adv   = clean_columns(pd.read_csv(NBA_ADV_PATH,   encoding="utf-8", encoding_errors="ignore"))
-
-# Make sure keys exist and normalize player names for merging later
-for d in [nba_stats, nba_adv]:
-    # Make sure these exist
-    if "Player-additional" not in d.columns:
-        raise ValueError("Expected 'Player-additional' column in NBA CSV (Basketball-Reference player id).")
-    if "Season" not in d.columns:
-        raise ValueError("Expected 'Season' column in NBA CSV.")
-
-    if "Player" in d.columns:
-        d["Player"] = normalize_player_name(d["Player"])
-
-
-# =========================
-# One row per player-season (fix traded players with multiple rows)
-# =========================
-
-nba_stats_1 = pick_one_row_per_player_season(nba_stats, player_id_col="Player-additional", season_col="Season", team_col="Team")
-nba_adv_1   = pick_one_row_per_player_season(nba_adv,   player_id_col="Player-additional", season_col="Season", team_col="Team")
-
-
-# =========================
-# Merge regular + advanced on (Player-additional, Season)
-# =========================
-
-KEYS = ["Player-additional", "Season"]
-
-# handle dupes in the two datasets
-nba_merged = nba_stats_1.merge(
-    nba_adv_1,
-    on=KEYS,
-    how="inner",
-    suffixes=("_reg", "_adv")
-)
-
-#rename from merging
-nba_merged = nba_merged.rename(columns={
-    "Player_reg": "Player",
-    "Age_reg": "Age",
-    "Team_reg": "Team",
-    "G_reg": "G",
-    "GS_reg": "GS",
-    "MP_reg": "MP",
-    "Rk_reg": "Rk"
-})
-
-# Keep a clean "player_name" column (use whichever Player column exists)
-if "Player_reg" in nba_merged.columns:
-    nba_merged["player_name"] = nba_merged["Player_reg"]
-elif "Player_adv" in nba_merged.columns:
-    nba_merged["player_name"] = nba_merged["Player_adv"]
-elif "Player" in nba_merged.columns:
-    nba_merged["player_name"] = nba_merged["Player"]
-else:
-    nba_merged["player_name"] = None
-
-
-# =========================
-# Filter NBA rows to players present in NCAA training pool
-# =========================
-
-# normalize NCAA player names for formatting
-df_ncaa["player_name"] = normalize_player_name(df_ncaa["player_name"])
-
-# Match NBA players to NCAA drafted players
-nba_for_training = nba_merged[nba_merged["player_name"].isin(df_ncaa["player_name"])].copy()
-
-
-# ----------------------------
-# Clean NCAA data to match NBA data
-# ----------------------------
-
-# Normalize player names
-df_ncaa["player_name"] = (
-    df_ncaa["player_name"]
-    .astype(str)
-    .str.replace("*", "", regex=False)
-    .str.strip()
-    .str.lower()
-)
-
-# Clean column names (remove accidental spaces)
-df_ncaa.columns = df_ncaa.columns.astype(str).str.strip()
-
-# Make sure year is numeric
-df_ncaa["year"] = pd.to_numeric(df_ncaa["year"], errors="coerce")
-
-# lean team/conf text
-for c in ["team", "conf"]:
-    if c in df_ncaa.columns:
-        df_ncaa[c] = df_ncaa[c].astype(str).str.strip()
-
-# Keep ONLY FINAL college season per player (latest year)
-ncaa_train = (
-    df_ncaa
-    .dropna(subset=["player_name", "year"])
-    .sort_values(["player_name", "year"])
-    .drop_duplicates(subset="player_name", keep="last")
-    .reset_index(drop=True)
-)
-
-
-
-# Create Peak values and seasons for past NBA players - BPM, VORP, PTS, MP
-# Used later for model targets and draftability score. We define "peak season" as highest VORP season
-
-for col in ["BPM", "VORP", "PTS", "MP"]:
-    if col in nba_for_training.columns:
-        nba_for_training[col] = pd.to_numeric(nba_for_training[col], errors="coerce")
-
-# drop rows missing the peak selector
-nba_tmp = nba_for_training.dropna(subset=["player_name", "VORP"]).copy()
-
-# PEAK SEASON = max VORP per player
-idx = nba_tmp.groupby("player_name")["VORP"].idxmax()
-nba_peaks = nba_tmp.loc[idx, ["player_name", "Season", "BPM", "VORP", "PTS", "MP"]].copy()
-
-nba_peaks = nba_peaks.rename(columns={
-    "Season": "peak_season",
-    "BPM": "peak_bpm",
-    "VORP": "peak_vorp",
-    "PTS": "peak_pts",
-    "MP": "peak_mp"
-}).reset_index(drop=True)
-
-
-# MERGE PEAK NBA WITH NCAA DATA
-
-train_df = ncaa_train.merge(nba_peaks, on="player_name", how="inner")
-
 # Encode class year to numeric, used for assessing draft model
 year_map = {
     "Fr": 1,
@@ -212,8 +100,6 @@ year_map = {
     "Jr": 3,
     "Sr": 4
 }
-train_df["class_num"] = train_df["yr"].map(year_map)
-
 
 # ----------------------------
 # Fix Excel height column ht -> height_in (inches)
@@ -259,9 +145,11 @@ def parse_height_in(x):
         except:
             return np.nan
 
-    return np.nan
+    # Un-mangled feet-inches like "6-6" (trank_data.csv)
+    if a.isdigit() and b.strip().isdigit():
+        return int(a) * 12 + int(b.strip())
 
-train_df["height_in"] = train_df["ht"].apply(parse_height_in)
+    return np.nan
 
 # =========================
 # Define modeling targets + feature columns
@@ -290,8 +178,8 @@ FEATURE_COLS = [
     "TO_per",
     "blk_per",
     "stl_per",
-    "height_in", 
-    "class_num" 
+    "height_in",
+    "class_num"
 ]
 
 # Columns to don't want as features
@@ -300,53 +188,32 @@ DROP_COLS = [
     "ht"  # you can drop this now since you have height_in
 ]
 
-# Drop draft pick to avoid leakage
-if "pick" in train_df.columns:
-    DROP_COLS.append("pick")
-
-# Keep ONLY numeric columns for features 
-feature_cols = [
-    c for c in train_df.columns
-    if c not in set(DROP_COLS + TARGET_COLS)
-    and pd.api.types.is_numeric_dtype(train_df[c])
-]
-
-# Training table, features + targets
-df_model = train_df[feature_cols + TARGET_COLS].dropna().reset_index(drop=True)
-
-
-# =========================
-# Load current NCAA players (inference dataset)
-# =========================
-
-CURRENT_PATH = os.path.join(data_loader.DATA_DIR, "current_NCAA_players.csv")
-df_current = pd.read_csv(CURRENT_PATH, low_memory=False)
-
-# Strip column names
-df_current.columns = df_current.columns.astype(str).str.strip()
+# Draftability weights (heavier emphasis on class)
+W_CLASS = 0.40
+W_BPM   = 0.20
+W_VORP  = 0.20
+W_PTS   = 0.10
+W_MP    = 0.10
 
-df_current["player_name"] = (
-    df_current["player_name"]
-      .astype(str)
-      .str.replace("*", "", regex=False)
-      .str.strip()
-      .str.lower()
-)
 
-def clean_ncaa_columns(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
-    df.columns = df.columns.astype(str).str.strip()
-    return df
+# Shooting rates the model wants as fractions; some exports have them as 0-100
+PCT_COLS = ["TS_per", "eFG", "TP_per", "twoP_per", "ftr"]
 
-train_df = clean_ncaa_columns(train_df)
-df_current = clean_ncaa_columns(df_current)
 
-df_current["class_num"] = df_current["yr"].map(year_map)
-df_current["height_in"] = df_current["ht"].apply(parse_height_in)
+def percent_scales(df: pd.DataFrame) -> dict[str, float]:
+    """
+    Divisor per PCT_COLS column (100 when it's on a 0-100 scale, else 1).
+    Decided once on the training frame and stored in the artifact, so scoring
+    never guesses from a (possibly single-row) batch.
+    """
+    return {
+        col: 100.0 if pd.to_numeric(df[col], errors="coerce").max() > 1 else 1.0
+        for col in PCT_COLS if col in df.columns
+    }
 
 
 # CREATE DF FOR TRAINING AND CURRENT DATA
-def build_model_df(df: pd.DataFrame) -> pd.DataFrame:
+def build_model_df(df: pd.DataFrame, pct_scale: dict[str, float]) -> pd.DataFrame:
     df = df.copy()
 
     # Ensure numeric
@@ -354,13 +221,10 @@ def build_model_df(df: pd.DataFrame) -> pd.DataFrame:
         if col in df.columns:
             df[col] = pd.to_numeric(df[col], errors="coerce")
 
-    # Fix percentage scaling
-    pct_cols = ["TS_per", "eFG", "TP_per", "twoP_per", "ftr"]
-
-    for col in pct_cols:
-        if col in df.columns:
-            if df[col].max() > 1:
-                df[col] = df[col] / 100
+    # Fix percentage scaling (see percent_scales)
+    for col, divisor in pct_scale.items():
+        if col in df.columns and divisor != 1.0:
+            df[col] = df[col] / divisor
 
     # Ensure all features exist
     for col in FEATURE_COLS:
@@ -372,269 +236,452 @@ def build_model_df(df: pd.DataFrame) -> pd.DataFrame:
 
     return df_model
 
-df_training_model = build_model_df(train_df)
-df_current_model = build_model_df(df_current)
+
+def prepare_ncaa_rows(df: pd.DataFrame) -> pd.DataFrame:
+    """Clean NCAA rows for the model: names, column names, class_num, height_in."""
+    df = clean_columns(df)
+    if "player_name" in df.columns:
+        df["player_name"] = normalize_player_name(df["player_name"])
+    if "class_num" not in df.columns and "yr" in df.columns:
+        df["class_num"] = df["yr"].map(year_map)
+    if "height_in" not in df.columns and "ht" in df.columns:
+        df["height_in"] = df["ht"].apply(parse_height_in)
+    return df
+
 
 # =========================
-# SAVE DEBUG CSVs (VERY IMPORTANT)
+# Training data
 # =========================
 
-# 1. Training dataset
-train_debug = pd.concat(
-    [
-        train_df[["player_name", "team", "conf"]].reset_index(drop=True),
-        df_training_model.reset_index(drop=True),
-        train_df[TARGET_COLS].reset_index(drop=True)
-    ],
-    axis=1
-)
+def load_nba_history() -> pd.DataFrame:
+    """NBA regular + advanced stats merged on (Player-additional, Season), one row per player-season."""
+    # Declared columns/dtypes only (data_loader.NBA_*_SCHEMA), not the whole exports
+    nba_stats = data_loader.read_schema_csv(NBA_STATS_PATH, data_loader.NBA_STATS_SCHEMA,
+                                            encoding="utf-8-sig", encoding_errors="ignore")
+    nba_adv   = data_loader.read_schema_csv(NBA_ADV_PATH, data_loader.NBA_ADV_SCHEMA,
+                                            encoding="utf-8-sig", encoding_errors="ignore")
+
+    # Make sure keys exist and normalize player names for merging later
+    for d in [nba_stats, nba_adv]:
+        # Make sure these exist
+        if "Player-additional" not in d.columns:
+            raise ValueError("Expected 'Player-additional' column in NBA CSV (Basketball-Reference player id).")
+        if "Season" not in d.columns:
+            raise ValueError("Expected 'Season' column in NBA CSV.")
+
+        if "Player" in d.columns:
+            d["Player"] = normalize_player_name(d["Player"])
+
+    # One row per player-season (fix traded players with multiple rows)
+    nba_stats_1 = pick_one_row_per_player_season(nba_stats, player_id_col="Player-additional", season_col="Season", team_col="Team")
+    nba_adv_1   = pick_one_row_per_player_season(nba_adv,   player_id_col="Player-additional", season_col="Season", team_col="Team")
+
+    # Merge regular + advanced on (Player-additional, Season)
+    KEYS = ["Player-additional", "Season"]
+
+    # handle dupes in the two datasets
+    nba_merged = nba_stats_1.merge(
+        nba_adv_1,
+        on=KEYS,
+        how="inner",
+        suffixes=("_reg", "_adv")
+    )
 
-# 2. Current dataset (features only)
-current_debug = pd.concat(
-    [
-        df_current[["player_name", "team", "conf"]].reset_index(drop=True),
-        df_current_model.reset_index(drop=True)
-    ],
-    axis=1
-)
+    #rename from merging
+    nba_merged = nba_merged.rename(columns={
+        "Player_reg": "Player",
+        "Age_reg": "Age",
+        "Team_reg": "Team",
+        "G_reg": "G",
+        "GS_reg": "GS",
+        "MP_reg": "MP",
+        "Rk_reg": "Rk"
+    })
+
+    # Keep a clean "player_name" column (use whichever Player column exists)
+    if "Player_reg" in nba_merged.columns:
+        nba_merged["player_name"] = nba_merged["Player_reg"]
+    elif "Player_adv" in nba_merged.columns:
+        nba_merged["player_name"] = nba_merged["Player_adv"]
+    elif "Player" in nba_merged.columns:
+        nba_merged["player_name"] = nba_merged["Player"]
+    else:
+        nba_merged["player_name"] = None
 
+    return nba_merged
 
 
+def build_training_frame(df_ncaa: pd.DataFrame, nba_merged: pd.DataFrame) -> pd.DataFrame:
+    """Final college season of every drafted player joined with their peak NBA season."""
+    df_ncaa = df_ncaa.copy()
 
+    # normalize NCAA player names for formatting
+    df_ncaa["player_name"] = normalize_player_name(df_ncaa["player_name"])
 
-# =========================
-# Model training + inference (MLP)
-# =========================
+    # Match NBA players to NCAA drafted players
+    nba_for_training = nba_merged[nba_merged["player_name"].isin(df_ncaa["player_name"])].copy()
 
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler
-from sklearn.neural_network import MLPRegressor
-from sklearn.pipeline import Pipeline
-from sklearn.metrics import mean_squared_error, r2_score
-import pandas as pd
-import numpy as np
+    # Clean column names (remove accidental spaces)
+    df_ncaa.columns = df_ncaa.columns.astype(str).str.strip()
+
+    # Make sure year is numeric
+    df_ncaa["year"] = pd.to_numeric(df_ncaa["year"], errors="coerce")
+
+    # lean team/conf text
+    for c in ["team", "conf"]:
+        if c in df_ncaa.columns:
+            df_ncaa[c] = df_ncaa[c].astype(str).str.strip()
+
+    # Keep ONLY FINAL college season per player (latest year)
+    ncaa_train = (
+        df_ncaa
+        .dropna(subset=["player_name", "year"])
+        .sort_values(["player_name", "year"])
+        .drop_duplicates(subset="player_name", keep="last")
+        .reset_index(drop=True)
+    )
+
+    # Create Peak values and seasons for past NBA players - BPM, VORP, PTS, MP
+    # Used later for model targets and draftability score. We define "peak season" as highest VORP season
+    for col in ["BPM", "VORP", "PTS", "MP"]:
+        if col in nba_for_training.columns:
+            nba_for_training[col] = pd.to_numeric(nba_for_training[col], errors="coerce")
+
+    # drop rows missing the peak selector
+    nba_tmp = nba_for_training.dropna(subset=["player_name", "VORP"]).copy()
 
-# -------------------------
-# Build ONE aligned training dataframe
-# -------------------------
-# concatenate features and targets into single dataframe for:
-# - rows stay aligned and safely drop rows with missing targets
-
-X_df = build_model_df(df_model)[FEATURE_COLS].apply(pd.to_numeric, errors="coerce").fillna(0)
-y_df = df_model[TARGET_COLS].apply(pd.to_numeric, errors="coerce")
-
-train_all = pd.concat([X_df, y_df], axis=1)
-
-# Drop any rows with missing targets (features can stay with fillna(0))
-train_all = train_all.dropna(subset=TARGET_COLS).reset_index(drop=True)
-
-X = train_all[FEATURE_COLS]
-y = train_all[TARGET_COLS]
-
-print("X/y shapes:", X.shape, y.shape)
-
-# -------------------------
-# 2) Train/validation split
-# -------------------------
-X_train, X_val, y_train, y_val = train_test_split(
-    X, y, test_size=0.2, random_state=42
-)
-
-# -------------------------
-# Scale targets (fit scaler only on training labels)
-# -------------------------
-y_scaler = StandardScaler()
-y_train_scaled = y_scaler.fit_transform(y_train)
-y_val_scaled   = y_scaler.transform(y_val)
-
-# -------------------------
-# Define and fit MLP
-# -------------------------
-mlp = MLPRegressor(
-    hidden_layer_sizes=(128, 64),
-    activation="relu",
-    solver="adam",
-    alpha=1e-4,
-    learning_rate_init=1e-3,
-    batch_size=64,
-    max_iter=800,
-    early_stopping=True,
-    validation_fraction=0.15,
-    n_iter_no_change=25,
-    random_state=42
-)
-
-mlp_model = Pipeline([
-    ("x_scaler", StandardScaler()),
-    ("mlp", mlp)
-])
-
-mlp_model.fit(X_train, y_train_scaled)
-
-# -------------------------
-# Validation )
-# -------------------------
-# Used for model sanity and not used later
-pred_val_scaled = mlp_model.predict(X_val)
-pred_val = y_scaler.inverse_transform(pred_val_scaled)
-pred_val = pd.DataFrame(pred_val, columns=TARGET_COLS, index=y_val.index)
-
-# -------------------------
-# Predict current players (same FEATURE_COLS!)
-# -------------------------
-X_current = (
-    df_current_model[FEATURE_COLS]
-    .apply(pd.to_numeric, errors="coerce")
-    .fillna(0)
-)
-
-pred_current_scaled = mlp_model.predict(X_current)
-pred_current = y_scaler.inverse_transform(pred_current_scaled)
-pred_current = pd.DataFrame(pred_current, columns=TARGET_COLS)
-
-# Bundle predictions with other identifiers
-pred_out = pd.concat(
-    [
-        df_current[["player_name", "team", "conf", "GP", "Min_per", "mp"]].reset_index(drop=True),
-        pred_current.reset_index(drop=True)
-    ],
-    axis=1
-)
-
-# add class_num for scoring to base off of age/class (younger = better for draftability)
-if "class_num" in df_current_model.columns:
-    pred_out["class_num"] = pd.to_numeric(df_current_model["class_num"], errors="coerce").reset_index(drop=True)
-elif "yr" in df_current.columns:
-    year_map = {"Fr": 1, "So": 2, "Jr": 3, "Sr": 4}
-    pred_out["class_num"] = df_current["yr"].map(year_map).reset_index(drop=True)
-else:
-    pred_out["class_num"] = np.nan
-
-# -------------------------
-# Eligibility filter + dedupe
-# -------------------------
-gp = pd.to_numeric(pred_out["GP"], errors="coerce").fillna(0)
-mpg = pd.to_numeric(pred_out["mp"], errors="coerce").fillna(0)        # minutes per game
-min_per = pd.to_numeric(pred_out["Min_per"], errors="coerce").fillna(0)
-
-elig_mask = (gp >= 10) & (mpg >= 12) & (min_per >= 18)
-pred_out["eligible"] = elig_mask
-
-# keep minutes numeric
-pred_out["mp"] = pd.to_numeric(pred_out["mp"], errors="coerce").fillna(0)
-
-# dedupe players and keep highest mpg if multiple rows per player
-pred_out = (
-    pred_out.sort_values(["player_name", "mp"], ascending=[True, False])
-            .drop_duplicates("player_name", keep="first")
-            .reset_index(drop=True)
-)
-
-# -------------------------
-# Guardrails: clip to training distribution
-# -------------------------
-for col in TARGET_COLS:
-    lo = float(y[col].quantile(0.01))
-    hi = float(y[col].quantile(0.99))
-    pred_out[col] = pred_out[col].clip(lo, hi)
-
-# -------------------------
-# Draftability score (0-100): heavy class emphasis + 4 predicted stats
-# -------------------------
-# Create single composite score using:
-# - Predicted NBA Peak metrics through model
-# - class year (Fr=1 best => score=1.0; Sr=4 => score=0.0)
-
-bounds = {}
-# get rid of outliers
-for col in TARGET_COLS:
-    lo = float(y[col].quantile(0.05))
-    hi = float(y[col].quantile(0.95))
-    bounds[col] = (lo, hi)
+    # PEAK SEASON = max VORP per player
+    idx = nba_tmp.groupby("player_name")["VORP"].idxmax()
+    nba_peaks = nba_tmp.loc[idx, ["player_name", "Season", "BPM", "VORP", "PTS", "MP"]].copy()
+
+    nba_peaks = nba_peaks.rename(columns={
+        "Season": "peak_season",
+        "BPM": "peak_bpm",
+        "VORP": "peak_vorp",
+        "PTS": "peak_pts",
+        "MP": "peak_mp"
+    }).reset_index(drop=True)
+
+    # MERGE PEAK NBA WITH NCAA DATA
+    train_df = ncaa_train.merge(nba_peaks, on="player_name", how="inner")
+    train_df["class_num"] = train_df["yr"].map(year_map)
+    train_df["height_in"] = train_df["ht"].apply(parse_height_in)
+
+    return clean_columns(train_df)
+
+
+def load_current_players() -> pd.DataFrame:
+    df_current = pd.read_csv(CURRENT_PATH, low_memory=False)
+    return prepare_ncaa_rows(df_current)
+
+
+# =========================
+# Inference
+# =========================
 
 def robust_minmax(series, lo, hi):
     s = pd.to_numeric(series, errors="coerce")
     s = s.clip(lo, hi)
     return (s - lo) / (hi - lo + 1e-9)
 
-# scale each predicted stat to 0..1 based on training distribution
-bpm_s  = robust_minmax(pred_out["peak_bpm"],  *bounds["peak_bpm"])
-vorp_s = robust_minmax(pred_out["peak_vorp"], *bounds["peak_vorp"])
-pts_s  = robust_minmax(pred_out["peak_pts"],  *bounds["peak_pts"])
-mp_s   = robust_minmax(pred_out["peak_mp"],   *bounds["peak_mp"])
 
-# class score: younger is better. (Fr=1 best => score=1.0; Sr=4 => score=0.0)
-class_num = pd.to_numeric(pred_out["class_num"], errors="coerce")
-class_s = (1.0 - (class_num - 1.0) / 3.0).clip(0, 1).fillna(0.5)
+def predict_peaks(artifact: dict, df: pd.DataFrame) -> pd.DataFrame:
+    """Predicted (clipped) peak NBA stats for NCAA rows, indexed like df."""
+    X = (
+        build_model_df(prepare_ncaa_rows(df), artifact["pct_scale"])[FEATURE_COLS]
+        .apply(pd.to_numeric, errors="coerce")
+        .fillna(0)
+    )
+    pred_scaled = artifact["model"].predict(X)
+    pred = pd.DataFrame(artifact["y_scaler"].inverse_transform(pred_scaled.reshape(len(X), -1)),
+                        columns=TARGET_COLS, index=df.index)
 
-# weights (heavier emphasis on class)
-W_CLASS = 0.40
-W_BPM   = 0.20
-W_VORP  = 0.20
-W_PTS   = 0.10
-W_MP    = 0.10
+    # Guardrails: clip to training distribution
+    for col in TARGET_COLS:
+        pred[col] = pred[col].clip(*artifact["clip_bounds"][col])
+    return pred
+
+
+def dedupe_players(pred_out: pd.DataFrame) -> pd.DataFrame:
+    """One row per player: keep the highest-mpg row."""
+    pred_out = pred_out.copy()
+    pred_out["mp"] = pd.to_numeric(pred_out["mp"], errors="coerce").fillna(0)
+    return (
+        pred_out.sort_values(["player_name", "mp"], ascending=[True, False])
+                .drop_duplicates("player_name", keep="first")
+                .reset_index(drop=True)
+    )
+
+
+def _eligible_mask(df: pd.DataFrame) -> pd.Series:
+    gp = pd.to_numeric(df["GP"], errors="coerce").fillna(0)
+    mpg = pd.to_numeric(df["mp"], errors="coerce").fillna(0)        # minutes per game
+    min_per = pd.to_numeric(df["Min_per"], errors="coerce").fillna(0)
+    return (gp >= 10) & (mpg >= 12) & (min_per >= 18)
+
+
+def _draftability_raw(pred_out: pd.DataFrame, score_bounds: dict) -> pd.Series:
+    # scale each predicted stat to 0..1 based on training distribution
+    bpm_s  = robust_minmax(pred_out["peak_bpm"],  *score_bounds["peak_bpm"])
+    vorp_s = robust_minmax(pred_out["peak_vorp"], *score_bounds["peak_vorp"])
+    pts_s  = robust_minmax(pred_out["peak_pts"],  *score_bounds["peak_pts"])
+    mp_s   = robust_minmax(pred_out["peak_mp"],   *score_bounds["peak_mp"])
+
+    # class score: younger is better. (Fr=1 best => score=1.0; Sr=4 => score=0.0)
+    class_num = pd.to_numeric(pred_out["class_num"], errors="coerce")
+    class_s = (1.0 - (class_num - 1.0) / 3.0).clip(0, 1).fillna(0.5)
+
+    return W_CLASS*class_s + W_BPM*bpm_s + W_VORP*vorp_s + W_PTS*pts_s + W_MP*mp_s
 
-raw = (W_CLASS*class_s + W_BPM*bpm_s + W_VORP*vorp_s + W_PTS*pts_s + W_MP*mp_s)
 
-# -------------------------
-# Rescale to 0–100 so top player = 100
-# -------------------------
+def score_players(df: pd.DataFrame, artifact: dict | None = None) -> pd.DataFrame:
+    """
+    Score any DataFrame of NCAA rows with the saved model (no retraining).
+    Needs player_name, GP, mp, Min_per and the model FEATURE_COLS (missing ones count as 0).
+    Returns the predictions-CSV columns: peaks, eligible, draftability_raw/score, *_pct.
+    Scores and percentiles are relative to the pool the artifact was calibrated on.
+    """
+    artifact = artifact or load_artifact()
+    if artifact is None:
+        raise FileNotFoundError(f"No draftability artifact at {ARTIFACT_PATH}; run `python draftability.py train`")
 
-pred_out["draftability_raw"] = raw  
+    df = prepare_ncaa_rows(df)
+    id_cols = [c for c in ["player_name", "team", "conf", "GP", "Min_per", "mp"] if c in df.columns]
+    pred_out = pd.concat([df[id_cols], predict_peaks(artifact, df)], axis=1)
 
-# Only rescale among eligible players
-eligible_scores = pred_out.loc[pred_out["eligible"], "draftability_raw"]
+    # add class_num for scoring to base off of age/class (younger = better for draftability)
+    pred_out["class_num"] = build_model_df(df, artifact["pct_scale"])["class_num"]
 
-if len(eligible_scores) > 0:
-    min_score = eligible_scores.min()
-    max_score = eligible_scores.max()
+    pred_out["eligible"] = _eligible_mask(pred_out)
+    pred_out["mp"] = pd.to_numeric(pred_out["mp"], errors="coerce").fillna(0)
 
-    # Avoid divide-by-zero if all values are same
-    if max_score - min_score > 1e-9:
-        scaled = (pred_out["draftability_raw"] - min_score) / (max_score - min_score)
+    # Rescale with the calibration pool's min/max so top player there = 100
+    pred_out["draftability_raw"] = _draftability_raw(pred_out, artifact["score_bounds"])
+    lo, hi = artifact["raw_min"], artifact["raw_max"]
+    if hi - lo > 1e-9:
+        pred_out["draftability_score"] = 100.0 * (pred_out["draftability_raw"] - lo) / (hi - lo)
     else:
-        scaled = np.zeros(len(pred_out))
+        pred_out["draftability_score"] = 0.0
 
-    pred_out["draftability_score"] = 100.0 * scaled
-else:
-    pred_out["draftability_score"] = 0.0
+    # Ineligible players get 0 no matter what
+    pred_out.loc[~pred_out["eligible"], "draftability_score"] = 0.0
+    pred_out["draftability_score"] = pred_out["draftability_score"].clip(0, 100)
 
-# Ineligible players get 0 no matter what
-pred_out.loc[~pred_out["eligible"], "draftability_score"] = 0.0
+    # Percentiles vs the calibration pool (same as rank(pct=True) for its members)
+    for col in TARGET_COLS:
+        ref = artifact["pct_reference"][col]
+        vals = pred_out[col].to_numpy(dtype="float64")
+        left = np.searchsorted(ref, vals, side="left")
+        right = np.searchsorted(ref, vals, side="right")
+        pct = 100.0 * ((left + right) / 2.0 + 0.5) / max(len(ref), 1)
+        pred_out[f"{col}_pct"] = np.where(pred_out["eligible"], np.clip(pct, 0, 100), 0.0)
 
-# Clean up
-pred_out["draftability_score"] = pred_out["draftability_score"].clip(0, 100)
+    return pred_out
 
 
-# -------------------------
-# Percentiles for the four peak stats
-# -------------------------
-eligible_mask = pred_out["eligible"].fillna(False)
-PCT_COLS = ["peak_bpm", "peak_vorp", "peak_pts", "peak_mp"]
-for col in PCT_COLS:
-    pct_name = f"{col}_pct"
+# =========================
+# Model training
+# =========================
+
+def train(df_ncaa: pd.DataFrame | None = None, nba_merged: pd.DataFrame | None = None,
+          df_current: pd.DataFrame | None = None) -> tuple[dict, pd.DataFrame]:
+    """
+    Fit the MLP on drafted players and calibrate draftability on the current pool.
+    Returns (artifact, predictions for df_current) — see save_artifact / score_players.
+    """
+    if df_ncaa is None:
+        # Historical NCAA pool (former/current nba player college stats)
+        df_ncaa = data_loader.load_past_ncaa_data()
+    if nba_merged is None:
+        nba_merged = load_nba_history()
+    if df_current is None:
+        df_current = load_current_players()
+
+    train_df = build_training_frame(df_ncaa, nba_merged)
+
+    # Drop draft pick to avoid leakage
+    drop_cols = DROP_COLS + (["pick"] if "pick" in train_df.columns else [])
+
+    # Keep ONLY numeric columns for features
+    feature_cols = [
+        c for c in train_df.columns
+        if c not in set(drop_cols + TARGET_COLS)
+        and pd.api.types.is_numeric_dtype(train_df[c])
+    ]
+
+    # Training table, features + targets
+    df_model = train_df[feature_cols + TARGET_COLS].dropna().reset_index(drop=True)
+
+    # -------------------------
+    # Build ONE aligned training dataframe
+    # -------------------------
+    # concatenate features and targets into single dataframe for:
+    # - rows stay aligned and safely drop rows with missing targets
+    pct_scale = percent_scales(df_model)
+    X_df = build_model_df(df_model, pct_scale)[FEATURE_COLS].apply(pd.to_numeric, errors="coerce").fillna(0)
+    y_df = df_model[TARGET_COLS].apply(pd.to_numeric, errors="coerce")
+
+    train_all = pd.concat([X_df, y_df], axis=1)
+
+    # Drop any rows with missing targets (features can stay with fillna(0))
+    train_all = train_all.dropna(subset=TARGET_COLS).reset_index(drop=True)
+
+    X = train_all[FEATURE_COLS]
+    y = train_all[TARGET_COLS]
+
+    print("X/y shapes:", X.shape, y.shape)
+
+    # Train/validation split
+    X_train, X_val, y_train, y_val = train_test_split(
+        X, y, test_size=0.2, random_state=42
+    )
+
+    # Scale targets (fit scaler only on training labels)
+    y_scaler = StandardScaler()
+    y_train_scaled = y_scaler.fit_transform(y_train)
+
+    # Define and fit MLP
+    mlp = MLPRegressor(
+        hidden_layer_sizes=(128, 64),
+        activation="relu",
+        solver="adam",
+        alpha=1e-4,
+        learning_rate_init=1e-3,
+        batch_size=64,
+        max_iter=800,
+        early_stopping=True,
+        validation_fraction=0.15,
+        n_iter_no_change=25,
+        random_state=42
+    )
+
+    mlp_model = Pipeline([
+        ("x_scaler", StandardScaler()),
+        ("mlp", mlp)
+    ])
+
+    mlp_model.fit(X_train, y_train_scaled)
+
+    # Validation (model sanity only)
+    pred_val = y_scaler.inverse_transform(mlp_model.predict(X_val))
+    val_r2 = {col: float(r2_score(y_val[col], pred_val[:, i])) for i, col in enumerate(TARGET_COLS)}
+
+    artifact = {
+        "version": ARTIFACT_VERSION,
+        "sklearn_version": sklearn.__version__,
+        "trained_at": datetime.now(timezone.utc).isoformat(),
+        "feature_cols": list(FEATURE_COLS),
+        "target_cols": list(TARGET_COLS),
+        "pct_scale": pct_scale,
+        "model": mlp_model,
+        "y_scaler": y_scaler,
+        # Guardrails: clip predictions to the 1-99% training range
+        "clip_bounds": {col: (float(y[col].quantile(0.01)), float(y[col].quantile(0.99))) for col in TARGET_COLS},
+        # Draftability: 5-95% training range for each stat (gets rid of outliers)
+        "score_bounds": {col: (float(y[col].quantile(0.05)), float(y[col].quantile(0.95))) for col in TARGET_COLS},
+        "val_r2": val_r2,
+    }
+
+    # -------------------------
+    # Calibrate on the current pool: raw-score min/max and percentile reference
+    # -------------------------
+    pred_out = pd.concat(
+        [
+            df_current[["player_name", "mp"]].reset_index(drop=True),
+            predict_peaks(artifact, df_current).reset_index(drop=True),
+        ],
+        axis=1,
+    )
+    pred_out["class_num"] = build_model_df(df_current, pct_scale)["class_num"].reset_index(drop=True)
+    pred_out = dedupe_players(pred_out.assign(
+        GP=df_current["GP"].to_numpy(), Min_per=df_current["Min_per"].to_numpy(),
+    ))
 
-    pred_out[pct_name] = 0.0  # default for ineligible
+    # Only rescale among eligible players
+    eligible = _eligible_mask(pred_out)
+    eligible_raw = _draftability_raw(pred_out, artifact["score_bounds"])[eligible]
 
-    pred_out.loc[eligible_mask, pct_name] = (
-        pred_out.loc[eligible_mask, col]
-        .rank(method="average", pct=True)
-        .mul(100.0)
+    artifact["raw_min"] = float(eligible_raw.min()) if len(eligible_raw) else 0.0
+    artifact["raw_max"] = float(eligible_raw.max()) if len(eligible_raw) else 0.0
+    artifact["pct_reference"] = {
+        col: np.sort(pred_out.loc[eligible, col].to_numpy(dtype="float64")) for col in TARGET_COLS
+    }
+
+    return artifact, dedupe_players(score_players(df_current, artifact))
+
+
+# =========================
+# Artifact persistence
+# =========================
+
+# (mtime_ns, artifact) of ARTIFACT_PATH; reloaded when a retrain replaces the file
+_artifact_cache: tuple[int, dict] | None = None
+
+
+def save_artifact(artifact: dict, path: str = ARTIFACT_PATH):
+    global _artifact_cache
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    joblib.dump(artifact, tmp)
+    os.replace(tmp, path)
+    if path == ARTIFACT_PATH:
+        _artifact_cache = (os.stat(path).st_mtime_ns, artifact)
+
+
+def load_artifact(path: str = ARTIFACT_PATH) -> dict | None:
+    """
+    Saved artifact, or None if it hasn't been trained yet. ARTIFACT_PATH is cached
+    until its mtime changes, the same mtime predictions_version() reports.
+    """
+    global _artifact_cache
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    cached = _artifact_cache
+    if path == ARTIFACT_PATH and cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    artifact = joblib.load(path)
+    if artifact.get("version") != ARTIFACT_VERSION:
+        return None
+    if path == ARTIFACT_PATH:
+        _artifact_cache = (mtime, artifact)
+    return artifact
+
+
+def write_predictions(pred_out: pd.DataFrame, path: str = PREDICTIONS_PATH):
+    # FINAL DATAFRAME - USED IN UI
+    pred_out = pred_out.sort_values("draftability_score", ascending=False).reset_index(drop=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    pred_out.to_csv(tmp, index=False)
+    os.replace(tmp, path)  # atomic: the API's predictions store never reads a half-written file
+
+    # Little profile print
+    stats_cols = TARGET_COLS + ["draftability_score"]
+    profile = pred_out[stats_cols].describe(
+        percentiles=[0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99]
     )
+    print(profile)
 
 
-# ==============================
-# FINAL DATAFRAME - USED IN UI
-# ==============================
-pred_out = pred_out.sort_values("draftability_score", ascending=False).reset_index(drop=True)
-output_path = os.path.join(data_loader.DATA_DIR, "mlp_current_predictions_with_draftability.csv")
-pred_out.to_csv(output_path, index=False)
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train or run the draftability model.")
+    parser.add_argument("command", choices=["train", "predict"])
+    args = parser.parse_args(argv)
+
+    if args.command == "train":
+        artifact, pred_out = train()
+        save_artifact(artifact)
+        print("Saved", ARTIFACT_PATH, "val R^2:", artifact["val_r2"])
+    else:
+        artifact = load_artifact()
+        if artifact is None:
+            raise SystemExit(f"No artifact at {ARTIFACT_PATH}; run `python draftability.py train` first")
+        pred_out = dedupe_players(score_players(load_current_players(), artifact))
 
+    write_predictions(pred_out)
 
-# Little profile print
-stats_cols = TARGET_COLS + ["draftability_score"]
-profile = pred_out[stats_cols].describe(
-    percentiles=[0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99]
-)
 
-print(profile)
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+On-disk feature matrices shared by every worker process.
+
+The L2-normalized comps matrices (NBA pool, NCAA prospects, NBA history seasons)
+are written once as float32 .npy files under CACHE_DIR/features/ and opened with
+np.memmap, so gunicorn workers share one copy through the page cache instead of
+each holding its own float64 matrix.
+
+Each matrix has a row-id map next to it (<name>-<key>.ids.npy): what each row is
+in the frame it was built from (see knn_comps.pool_features / prospect_features).
+Files are keyed like the data_loader snapshots (size/mtime of the source files,
+plus the modules that build the matrices). Set PROSCOUT_FEATURE_STORE=0 to keep
+the matrices in memory instead.
+"""
+
+import glob
+import os
+from typing import NamedTuple
+
+import numpy as np
+
+from model import data_loader, knn_comps
+
+FEATURE_DIR = os.path.join(data_loader.CACHE_DIR, "features")
+FEATURE_STORE_ENABLED = os.environ.get("PROSCOUT_FEATURE_STORE", "1") != "0"
+FEATURE_STORE_VERSION = 1  # bump to invalidate every stored matrix
+
+
+class FeatureMatrix(NamedTuple):
+    X: np.ndarray    # (rows, features) float32, read-only memmap when it came from disk
+    ids: np.ndarray  # row-id map: ids[i] identifies row i of X in its source frame
+
+    def take(self, ids) -> np.ndarray:
+        """Rows of X for the given ids, in that order (KeyError for an unknown id)."""
+        ids = np.asarray(ids)
+        sorter = np.argsort(self.ids, kind="stable")
+        pos = sorter[np.minimum(np.searchsorted(self.ids, ids, sorter=sorter), len(sorter) - 1)]
+        if len(ids) and (not len(self.ids) or not np.array_equal(self.ids[pos], ids)):
+            raise KeyError("ids not in the feature matrix")
+        return np.asarray(self.X[pos])
+
+
+def source_key(sources: list[str], *parts) -> str:
+    """Store key: size/mtime of the source files and of the code building the matrix, plus parts."""
+    builders = [os.path.abspath(knn_comps.__file__), os.path.abspath(__file__)]
+    return knn_comps.data_fingerprint(
+        data_loader._snapshot_key([*sources, *builders]), repr((FEATURE_STORE_VERSION, parts)),
+    )
+
+
+def _paths(name: str, key: str):
+    base = os.path.join(FEATURE_DIR, f"{name}-{key}")
+    return f"{base}.npy", f"{base}.ids.npy"
+
+
+def _save(array: np.ndarray, path: str):
+    tmp = f"{path}.{os.getpid()}.tmp.npy"
+    np.save(tmp, array, allow_pickle=False)
+    os.replace(tmp, path)  # atomic: readers never map a half-written file
+
+
+def _open(x_path: str, ids_path: str) -> FeatureMatrix:
+    return FeatureMatrix(np.load(x_path, mmap_mode="r"), np.load(ids_path, mmap_mode="r"))
+
+
+def load(name: str, key: str, build) -> FeatureMatrix:
+    """
+    Memory-mapped FeatureMatrix for this key; build() -> (X, ids) runs only when
+    it isn't on disk yet (its result is stored as float32 and then mapped).
+    Older keys of the same name are removed. Falls back to the in-memory arrays
+    when the store is disabled or the cache dir isn't writable.
+    """
+    if not FEATURE_STORE_ENABLED:
+        X, ids = build()
+        return FeatureMatrix(np.ascontiguousarray(X, dtype=np.float32), np.asarray(ids))
+
+    x_path, ids_path = _paths(name, key)
+    if os.path.exists(x_path) and os.path.exists(ids_path):
+        try:
+            return _open(x_path, ids_path)
+        except (OSError, ValueError):
+            pass  # truncated / foreign file -> rebuild
+
+    X, ids = build()
+    X, ids = np.ascontiguousarray(X, dtype=np.float32), np.asarray(ids)
+    try:
+        os.makedirs(FEATURE_DIR, exist_ok=True)
+        _save(ids, ids_path)
+        _save(X, x_path)  # written last: a matrix file means its id map is there
+        for old in glob.glob(os.path.join(FEATURE_DIR, f"{name}-*.npy")):
+            if old not in (x_path, ids_path) and not old.endswith(".tmp.npy"):
+                os.remove(old)
+        return _open(x_path, ids_path)
+    except OSError:
+        return FeatureMatrix(X, ids)  # read-only disk -> keep the built matrix in memory
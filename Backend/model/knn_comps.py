@@ -1,6 +1,9 @@
+import hashlib
+
 import numpy as np
-from sklearn.preprocessing import StandardScaler
-from sklearn.neighbors import NearestNeighbors
+import pandas as pd
+
+from model.ann_index import WIDEN_STEPS, make_index, top_k
 
 FEATURE_COLS = [
     # shot selection (where they shoot)
@@ -35,6 +38,10 @@ FEATURE_COLS = [
     "trb_per36",
 ]
 
+# Shot-zone features: only the per-season shooting export has them (not the 2009-2026 history)
+ZONE_COLS = ["rim_share", "mid_share", "rim_fg_pct", "mid_fg_pct"]
+HISTORY_FEATURE_COLS = [c for c in FEATURE_COLS if c not in ZONE_COLS]
+
 
 def _ensure_numeric(df, cols):
     """Coerce specified columns to numeric (float)."""
@@ -46,14 +53,14 @@ def _ensure_numeric(df, cols):
     return out
 
 
-from sklearn.neighbors import NearestNeighbors
-
 def build_knn_model(df_nba, metric="cosine"):
     """
     Fit KNN on NBA players (reference dataset).
     Since we're using cosine distance on mostly normalized features (shares/percentages),
     we do NOT standardize. This avoids cross-league scaling distortion.
     """
+    from sklearn.neighbors import NearestNeighbors  # only this legacy helper needs sklearn
+
     df_nba_clean = df_nba.dropna(subset=FEATURE_COLS).copy()
     df_nba_clean = _ensure_numeric(df_nba_clean, FEATURE_COLS)
 
@@ -78,4 +85,297 @@ def find_similar_players(player_row, df_nba_clean, knn, scaler, k=5):
     comps = df_nba_clean.iloc[indices[0]].copy()
     comps["similarity_score"] = 1 - distances[0]
 
-    return comps.sort_values("similarity_score", ascending=False)
\ No newline at end of file
+    return comps.sort_values("similarity_score", ascending=False)
+
+def _l2_normalize(X):
+    norms = np.linalg.norm(X, axis=1, keepdims=True)
+    return X / np.where(norms == 0, 1.0, norms)
+
+
+def _feature_matrix(df, cols=FEATURE_COLS):
+    """cols (default FEATURE_COLS) as float64, NaN where a value is missing or non-numeric."""
+    return df.reindex(columns=cols).apply(pd.to_numeric, errors="coerce").to_numpy(dtype="float64")
+
+
+def pool_features(df_nba, feature_cols=FEATURE_COLS):
+    """
+    (X, ids) of a CompsIndex over df_nba: L2-normalized float32 rows of every player
+    with all feature_cols present, sorted by usage (stable); ids = their row
+    positions in df_nba. Stored as-is by feature_store.
+    """
+    F = _feature_matrix(df_nba, feature_cols)
+    ids = np.flatnonzero(~np.isnan(F).any(axis=1))
+    usg = pd.to_numeric(df_nba["usg"], errors="coerce").to_numpy(dtype="float64")[ids]
+    ids = ids[np.argsort(usg, kind="stable")]
+    return _l2_normalize(F[ids]).astype(np.float32), ids
+
+
+def prospect_features(df_ncaa, feature_cols=FEATURE_COLS):
+    """
+    (X, ids) of query_batch over df_ncaa: every row L2-normalized as float32 (all
+    NaN where a feature is missing); ids = df_ncaa.index.
+    """
+    X = _l2_normalize(_feature_matrix(df_ncaa, feature_cols)).astype(np.float32)
+    return X, df_ncaa.index.to_numpy()
+
+
+def data_fingerprint(*parts) -> str:
+    """Content hash of numpy arrays / strings (used to tell when materialized results are stale)."""
+    h = hashlib.blake2b(digest_size=16)
+    for p in parts:
+        if isinstance(p, str):
+            h.update(p.encode())
+            continue
+        a = np.ascontiguousarray(p)
+        h.update(str((a.dtype.str, a.shape)).encode())
+        h.update(a.tobytes())
+    return h.hexdigest()
+
+
+def widening_tiers(target_usg=None, usg_band=None, min_mp=None):
+    """Predicate sets tried in order until enough rows match: usage band + minutes, minutes only, none."""
+    return [
+        dict(target_usg=target_usg, usg_band=usg_band, min_mp=min_mp),
+        dict(min_mp=min_mp),
+        dict(),
+    ]
+
+
+class CompsIndex:
+    """
+    Filtered cosine KNN over the NBA pool without refitting per query.
+
+    Keeps one L2-normalized feature matrix plus MP/usage/position/team columns.
+    Rows are sorted by usage, so a usage band is a contiguous slice found with
+    searchsorted; the other predicates are boolean masks over that slice.
+
+    Single queries go through a nearest-neighbor index (ann_index.make_index):
+    exact below AUTO_MIN_ROWS rows, an inverted-file shortlist above it, in which
+    case the widening tier is still picked over the whole pool, its predicates are
+    applied to the shortlist and it is reranked exactly.
+    query_batch is always exact (one matrix multiply per block).
+
+    feature_cols defaults to FEATURE_COLS; pools without shot-zone splits (the
+    NBA history, see nba_history.py) use HISTORY_FEATURE_COLS on both sides.
+    features: a precomputed (X, ids) from pool_features (e.g. memory-mapped by
+    feature_store); built in memory when omitted. X is float32 either way.
+    display_cols: columns of df_nba kept on self.df for results (default all, with
+    the features as float64); similarity only ever reads X.
+    """
+
+    # same thresholds /comps always used
+    USG_BAND = 5.0     # +/- usage points (0-100 scale)
+    MIN_MP = 2000      # minimum total minutes in season
+    MIN_POOL = 50      # widen the filters when fewer players than this match
+
+    def __init__(self, df_nba, ann=None, feature_cols=FEATURE_COLS, features=None, display_cols=None,
+                 **ann_params):
+        self.feature_cols = list(feature_cols)
+        X, ids = features if features is not None else pool_features(df_nba, self.feature_cols)
+
+        rows = df_nba.iloc[ids]
+        self.usg = pd.to_numeric(rows["usg"], errors="coerce").to_numpy(dtype="float64")
+        self.mp = pd.to_numeric(rows["MP"], errors="coerce").to_numpy(dtype="float64")
+        self.pos = rows["Pos"].astype(str).str.upper().to_numpy() if "Pos" in rows.columns else None
+        self.team = rows["Team"].astype(str).str.upper().to_numpy() if "Team" in rows.columns else None
+        if display_cols is None:
+            self.df = _ensure_numeric(rows, self.feature_cols)
+        else:
+            self.df = rows[[c for c in rows.columns if c in set(display_cols)]]
+
+        self.X = X
+        # ann: "auto" / "exact" / "ivf" (default COMPS_ANN); ann_params: preset=..., n_probe=...
+        self.ann = make_index(self.X, ann, **ann_params)
+
+    def __len__(self):
+        return len(self.df)
+
+    def _candidates(self, target_usg=None, usg_band=None, min_mp=None, pos=None, team=None, rows=None):
+        """Row positions (among all rows, or among `rows`) matching every given predicate (None = not applied)."""
+        use_band = target_usg is not None and usg_band is not None
+        if rows is None:
+            lo, hi = 0, len(self.df)
+            if use_band:
+                lo = int(np.searchsorted(self.usg, target_usg - usg_band, side="left"))
+                hi = int(np.searchsorted(self.usg, target_usg + usg_band, side="right"))
+            rows = np.arange(lo, hi)
+        elif use_band:
+            usg = self.usg[rows]
+            rows = rows[(usg >= target_usg - usg_band) & (usg <= target_usg + usg_band)]
+
+        mask = np.ones(len(rows), dtype=bool)
+        if min_mp is not None:
+            mask &= self.mp[rows] >= min_mp
+        if pos is not None and self.pos is not None:
+            mask &= self.pos[rows] == str(pos).upper()
+        if team is not None and self.team is not None:
+            mask &= self.team[rows] == str(team).upper()
+
+        return rows[mask]
+
+    def _tier_candidates(self, tiers, pos, team, min_pool):
+        """(tier, rows) for the first tier matching >= min_pool rows of the whole pool (else the last)."""
+        for tier in tiers:
+            cand = self._candidates(pos=pos, team=team, **tier)
+            if len(cand) >= min_pool:
+                break
+        return tier, cand
+
+    def _shortlist_candidates(self, x, k, tier, pos, team):
+        """
+        Rows of the index shortlist matching `tier`, from the first shortlist size
+        (WIDEN_STEPS) with >= k of them. None = no size got k matches (or the index
+        is exact): brute force over the tier.
+        """
+        for widen in WIDEN_STEPS:
+            shortlist = self.ann.candidates(x, widen)
+            if shortlist is None:
+                return None
+            cand = self._candidates(pos=pos, team=team, rows=shortlist, **tier)
+            if len(cand) >= k:
+                return cand
+        return None
+
+    def query(self, player_row, k=5, target_usg=None, usg_band=None, min_mp=None,
+              pos=None, team=None, min_pool=0, exact=False):
+        """
+        Top-k cosine neighbors of player_row among rows matching the predicates.
+        If fewer than min_pool rows match, drop the usage band, then the minutes
+        floor (same widening order /comps always had); pos/team stay hard filters.
+        The tier is always picked by counting matches over the whole pool, so an
+        approximate index only changes which rows are scored, never the filters:
+        its shortlist is filtered with that tier, widened until it holds k matching
+        rows, and the query falls back to brute force over the tier otherwise.
+        exact=True skips the index (brute force over every matching row).
+        Returns the matching NBA rows with a similarity_score column, best first.
+        """
+        x = pd.to_numeric(player_row[self.feature_cols], errors="coerce").to_numpy(dtype="float64")
+        x = _l2_normalize(x.reshape(1, -1))[0].astype(self.X.dtype)
+
+        tier, cand = self._tier_candidates(widening_tiers(target_usg, usg_band, min_mp), pos, team, min_pool)
+        if not exact:
+            shortlisted = self._shortlist_candidates(x, k, tier, pos, team)
+            if shortlisted is not None:
+                cand = shortlisted
+
+        sims = self.X[cand] @ x
+        top = top_k(sims, k)
+
+        comps = self.df.iloc[cand[top]].copy()
+        comps["similarity_score"] = sims[top].astype("float64")
+        return comps
+
+    def query_batch(self, df_ncaa, k=10, target_usg=None, usg_band=None, min_mp=None,
+                    min_pool=0, block_size=1024, features=None):
+        """
+        query() for every row of df_ncaa at once: block-wise cosine similarity
+        (one matrix multiply per block) and argpartition top-k per row.
+        Same predicates and widening as query(); no pos/team filters.
+        features: prospect_features rows aligned with df_ncaa (built when omitted).
+        Returns (neighbors, scores): int32 positions into self.df (-1 = none)
+        and float32 similarities, both shaped (len(df_ncaa), k), best first.
+        """
+        Q = features if features is not None else prospect_features(df_ncaa, self.feature_cols)[0]
+        valid = ~np.isnan(Q).any(axis=1)
+        Q = np.nan_to_num(Q).astype(self.X.dtype)
+        n, m = len(Q), len(self.df)
+        k = min(k, m)
+
+        neighbors = np.full((n, k), -1, dtype=np.int32)
+        scores = np.full((n, k), np.nan, dtype=np.float32)
+        if n == 0 or k == 0:
+            return neighbors, scores
+
+        mp_ok = self.mp >= min_mp if min_mp is not None else np.ones(m, dtype=bool)
+        use_mp = mp_ok.sum() >= min_pool
+        tier1 = mp_ok if use_mp else np.ones(m, dtype=bool)
+        if target_usg is not None:
+            target_usg = np.asarray(target_usg, dtype="float64")
+
+        for start in range(0, n, block_size):
+            stop = min(start + block_size, n)
+            S = Q[start:stop] @ self.X.T
+
+            if target_usg is not None and usg_band is not None:
+                t = target_usg[start:stop, None]
+                tier0 = (self.usg >= t - usg_band) & (self.usg <= t + usg_band) & mp_ok
+                use0 = tier0.sum(axis=1) >= min_pool
+                mask = np.where(use0[:, None], tier0, tier1)
+            else:
+                mask = np.broadcast_to(tier1, S.shape)
+            S = np.where(mask, S, -np.inf)
+
+            top = np.argpartition(-S, k - 1, axis=1)[:, :k] if k < m else np.tile(np.arange(m), (len(S), 1))
+            top_s = np.take_along_axis(S, top, axis=1)
+            order = np.argsort(-top_s, axis=1, kind="stable")
+            top = np.take_along_axis(top, order, axis=1)
+            top_s = np.take_along_axis(top_s, order, axis=1)
+
+            found = np.isfinite(top_s) & valid[start:stop, None]
+            neighbors[start:stop] = np.where(found, top, -1)
+            scores[start:stop] = np.where(found, top_s, np.nan)
+
+        return neighbors, scores
+
+
+class CompsTable:
+    """
+    Materialized top-k comps for every prospect, rows aligned with df_ncaa.
+    Built in one batch by CompsIndex.query_batch; lookups are a row slice.
+    `fingerprint` identifies the inputs so callers can tell when to rebuild.
+    features: prospect_features rows aligned with df_ncaa, as for query_batch.
+    """
+
+    def __init__(self, comps_index, df_ncaa, k=10, features=None, **filters):
+        self.index = comps_index
+        self.k = k
+        self.filters = filters
+        if features is None:
+            features = prospect_features(df_ncaa, comps_index.feature_cols)[0]
+        self.fingerprint = self.fingerprint_for(comps_index, df_ncaa, k, features, **filters)
+        self.neighbors, self.scores = self._query(df_ncaa, features)
+
+    def _query(self, df_ncaa, features):
+        target_usg = pd.to_numeric(df_ncaa["usg"], errors="coerce").to_numpy(dtype="float64") \
+            if self.filters.get("usg_band") is not None else None
+        return self.index.query_batch(
+            df_ncaa, k=self.k, target_usg=target_usg, features=features, **self.filters
+        )
+
+    def updated(self, df_ncaa, features, reuse) -> "CompsTable":
+        """
+        Table for a new df_ncaa against the same index and filters. reuse[i] is the
+        row of this table's df_ncaa identical to new row i (-1 = new or changed):
+        those rows are copied, only the others are queried.
+        """
+        table = object.__new__(CompsTable)
+        table.index, table.k, table.filters = self.index, self.k, self.filters
+        table.fingerprint = self.fingerprint_for(self.index, df_ncaa, self.k, features, **self.filters)
+
+        reuse = np.asarray(reuse)
+        kept = reuse >= 0
+        table.neighbors = np.empty((len(reuse), self.neighbors.shape[1]), dtype=self.neighbors.dtype)
+        table.scores = np.empty((len(reuse), self.scores.shape[1]), dtype=self.scores.dtype)
+        table.neighbors[kept] = self.neighbors[reuse[kept]]
+        table.scores[kept] = self.scores[reuse[kept]]
+        fresh = np.flatnonzero(~kept)
+        if len(fresh):
+            table.neighbors[fresh], table.scores[fresh] = self._query(df_ncaa.iloc[fresh], features[fresh])
+        return table
+
+    @staticmethod
+    def fingerprint_for(comps_index, df_ncaa, k=10, features=None, **filters):
+        if features is None:
+            features = prospect_features(df_ncaa, comps_index.feature_cols)[0]
+        return data_fingerprint(comps_index.X, features, repr((k, sorted(filters.items()))))
+
+    def is_current(self, comps_index, df_ncaa, features=None) -> bool:
+        return self.fingerprint == self.fingerprint_for(comps_index, df_ncaa, self.k, features, **self.filters)
+
+    def comps(self, row_pos, k=5):
+        """Top-k NBA rows for the prospect at row_pos, with similarity_score (best first)."""
+        nbrs = self.neighbors[row_pos, :k]
+        keep = nbrs >= 0
+        comps = self.index.df.iloc[nbrs[keep]].copy()
+        comps["similarity_score"] = self.scores[row_pos, :k][keep].astype("float64")
+        return comps
@@ -0,0 +1,146 @@
+"""
+Typeahead search over player names.
+- Prefix index over full names and each name token ("boo" -> Cameron Boozer):
+  a shallow trie for short prefixes plus binary search over sorted keys for longer ones.
+- Trigram index for typo tolerance ("cameron bozer" -> Cameron Boozer).
+Both are built once; a query touches one trie node or a narrow key range, plus the
+query's trigram postings. The prefix indexes are kept per entry kind as well, so a
+kind-filtered search is capped among that kind's names only.
+"""
+
+import bisect
+import re
+import unicodedata
+
+import numpy as np
+
+# Trie depth: prefixes up to this length are answered from a node's precomputed top list.
+# Longer prefixes binary-search the sorted keys, where the matching range is already narrow.
+TRIE_DEPTH = 3
+TRIE_NODE_CAP = 32      # entry ids kept per trie node (shortest names first)
+PREFIX_SCAN_CAP = 256   # keys ranked per long-prefix range
+
+# Match tiers (higher wins), then similarity, then shorter names
+EXACT, PREFIX, TOKEN_PREFIX, FUZZY = 3, 2, 1, 0
+MIN_TRIGRAM_SIMILARITY = 0.3
+
+
+def normalize(name) -> str:
+    """Lowercase, accent-folded, punctuation-free, single-spaced."""
+    decomposed = unicodedata.normalize("NFD", str(name))
+    folded = "".join(c for c in decomposed if unicodedata.category(c) != "Mn").lower()
+    return " ".join(re.sub(r"[^\w\s]", "", folded).split())
+
+
+def trigrams(text: str) -> set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class _PrefixIndex:
+    """(text, entry id) pairs searchable by prefix; results shortest text first."""
+
+    def __init__(self, pairs):
+        pairs = sorted(pairs)
+        self.texts = [t for t, _ in pairs]
+        self.ids = [i for _, i in pairs]
+        shortest_first = sorted(range(len(pairs)), key=lambda p: (len(self.texts[p]), self.texts[p]))
+        nodes: dict[str, list] = {}
+        for p in shortest_first:
+            text, entry_id = self.texts[p], self.ids[p]
+            for depth in range(1, min(TRIE_DEPTH, len(text)) + 1):
+                ids = nodes.setdefault(text[:depth], [])
+                if len(ids) < TRIE_NODE_CAP and entry_id not in ids:
+                    ids.append(entry_id)
+        self.trie = {prefix: tuple(ids) for prefix, ids in nodes.items()}
+
+    def search(self, prefix: str) -> list[int]:
+        if len(prefix) <= TRIE_DEPTH:
+            return list(self.trie.get(prefix, ()))
+        lo = bisect.bisect_left(self.texts, prefix)
+        hi = bisect.bisect_left(self.texts, prefix + "\uffff", lo)
+        hits = sorted(range(lo, min(hi, lo + PREFIX_SCAN_CAP)), key=lambda p: len(self.texts[p]))
+        return list(dict.fromkeys(self.ids[p] for p in hits))
+
+
+class NameSearchIndex:
+    """
+    entries: iterable of dicts with at least "name" (display name); any other keys
+    (kind, id, team, ...) are returned as-is with each match.
+    """
+
+    def __init__(self, entries):
+        self.entries = [dict(e) for e in entries]
+        self.keys = [normalize(e["name"]) for e in self.entries]
+        self._key_lengths = [len(k) for k in self.keys]
+
+        self._exact: dict[str, list[int]] = {}
+        for i, key in enumerate(self.keys):
+            self._exact.setdefault(key, []).append(i)
+        # kind -> prefix indexes over that kind's entries; None -> over all of them
+        by_kind: dict = {}
+        for i, e in enumerate(self.entries):
+            if e.get("kind") is not None:
+                by_kind.setdefault(e["kind"], []).append(i)
+        by_kind[None] = range(len(self.entries))
+        self._names = {
+            kind: _PrefixIndex((self.keys[i], i) for i in ids) for kind, ids in by_kind.items()
+        }
+        self._tokens = {
+            kind: _PrefixIndex((token, i) for i in ids for token in self.keys[i].split()[1:])
+            for kind, ids in by_kind.items()
+        }
+        self._kinds = np.array([e.get("kind") for e in self.entries], dtype=object)
+
+        postings: dict[str, list[int]] = {}
+        gram_counts = []
+        for i, key in enumerate(self.keys):
+            grams = trigrams(key)
+            gram_counts.append(len(grams))
+            for g in grams:
+                postings.setdefault(g, []).append(i)
+        self._grams = {g: np.array(ids, dtype=np.int32) for g, ids in postings.items()}
+        self._gram_counts = np.array(gram_counts, dtype=np.float32)
+
+    def search(self, query: str, limit: int = 10, kind: str | None = None) -> list[dict]:
+        """Best matches for query (exact > prefix > token prefix > trigram), with "score" 0-1."""
+        q = normalize(query)
+        if not q or limit < 1 or kind not in self._names:
+            return []
+
+        found: dict[int, tuple] = {}
+
+        def add(entry_id, tier, similarity):
+            if kind is not None and self.entries[entry_id].get("kind") != kind:
+                return
+            rank = (tier, similarity, -self._key_lengths[entry_id])
+            if entry_id not in found or rank > found[entry_id]:
+                found[entry_id] = rank
+
+        for i in self._exact.get(q, []):
+            add(i, EXACT, 1.0)
+        for i in self._names[kind].search(q):
+            add(i, PREFIX, len(q) / self._key_lengths[i])
+        for i in self._tokens[kind].search(q):
+            add(i, TOKEN_PREFIX, len(q) / self._key_lengths[i])
+
+        # Typo tolerance: Dice similarity on trigrams, only when prefixes didn't fill the page
+        if len(found) < limit:
+            q_grams = [self._grams[g] for g in trigrams(q) if g in self._grams]
+            if q_grams:
+                shared = np.bincount(np.concatenate(q_grams), minlength=len(self.keys))
+                similarity = 2.0 * shared / (len(trigrams(q)) + self._gram_counts)
+                if kind is not None:
+                    similarity[self._kinds != kind] = 0.0
+                candidates = np.flatnonzero(similarity >= MIN_TRIGRAM_SIMILARITY)
+                if len(candidates) > 4 * limit:
+                    top = np.argpartition(-similarity[candidates], 4 * limit)[:4 * limit]
+                    candidates = candidates[top]
+                for i in candidates:
+                    add(int(i), FUZZY, float(similarity[i]))
+
+        best = sorted(found.items(), key=lambda kv: kv[1], reverse=True)[:limit]
+        return [
+            {**self.entries[i], "score": round(1.0 if tier == EXACT else float(similarity), 3)}
+            for i, (tier, similarity, _) in best
+        ]
@@ -0,0 +1,277 @@
+"""
+Historical NBA comps pool: every player-season of NBA_{Stats,Advanced}_2009_2026.csv,
+partitioned by season (Season = the year a season ends, so 2025 is 2024-25).
+- The exports are parsed once into one file per season under CACHE_DIR/history/<key>/,
+  keyed on the source files' size/mtime like the data_loader snapshots.
+- A season's CompsIndex is built on first use and kept in an LRU bounded by
+  HISTORY_CACHE_MB (least recently queried seasons are evicted first). Its
+  feature matrix is memory-mapped from feature_store, so only the frame counts
+  against the cap.
+- If the cache dir isn't writable the parsed partitions stay in memory instead,
+  under the same cap; an evicted one is parsed again from the exports.
+The exports have no shot-zone splits, so comps against history use
+HISTORY_FEATURE_COLS on both sides (FEATURE_COLS minus the four zone columns).
+"""
+
+import glob
+import json
+import os
+import shutil
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from model import data_loader, feature_store
+from model.knn_comps import HISTORY_FEATURE_COLS, ZONE_COLS, CompsIndex, pool_features, widening_tiers
+
+NBA_STATS_PATH = os.path.join(data_loader.DATA_DIR, "NBA_Stats_2009_2026.csv")
+NBA_ADV_PATH = os.path.join(data_loader.DATA_DIR, "NBA_Advanced_2009_2026.csv")
+HISTORY_DIR = os.path.join(data_loader.CACHE_DIR, "history")
+
+# Memory cap for loaded season partitions (frames + in-memory feature matrices)
+HISTORY_CACHE_MB = float(os.environ.get("HISTORY_CACHE_MB", "64"))
+
+# Identity + display columns of a partition (every other column is a feature)
+DISPLAY_COLS = ["Player", "Team", "Pos", "Age", "G", "MP", "PTS", "AST", "TRB", "Season", "player_id"]
+
+
+def _read_export(path: str, schema: dict) -> pd.DataFrame:
+    df = data_loader.read_schema_csv(path, schema, encoding="utf-8-sig")
+    df["Player"] = df["Player"].astype(str).str.replace("*", "", regex=False).str.strip()
+    return df[df["Player"] != "League Average"]
+
+
+def _one_row_per_season(df: pd.DataFrame) -> pd.DataFrame:
+    """Traded players: keep the combined row (TOT / 2TM, 3TM, ...) over the per-team rows."""
+    team = df["Team"].astype(str).str.strip()
+    priority = np.where(team.eq("TOT"), 0, np.where(team.str.match(r"^\d+TM$"), 1, 2))
+    df = df.assign(_priority=priority).sort_values(["Player-additional", "Season", "_priority"], kind="stable")
+    return df.drop_duplicates(["Player-additional", "Season"]).drop(columns="_priority")
+
+
+def make_history_playstyle_df(df_stats: pd.DataFrame, df_adv: pd.DataFrame) -> pd.DataFrame:
+    """
+    Per-game + advanced exports -> one row per player-season with the comps features.
+    Same definitions as make_nba_playstyle_df where the exports allow it (MP is
+    season minutes, per-36 uses per-game counting stats over it), so a season
+    partition and the current pool are on one scale.
+    """
+    stats = _one_row_per_season(df_stats)
+    adv = _one_row_per_season(df_adv)
+    df = stats.merge(adv, on=["Player-additional", "Season"], how="inner", suffixes=("_per", ""))
+
+    def to_num(col):
+        return pd.to_numeric(df[col], errors="coerce")
+
+    out = pd.DataFrame({
+        "Player": df["Player"],
+        "Team": df["Team"],
+        "Pos": df["Pos"],
+        "Age": to_num("Age"),
+        "G": to_num("G"),
+        "MP": to_num("MP"),  # season total (advanced export)
+        "PTS": to_num("PTS"),
+        "AST": to_num("AST"),
+        "TRB": to_num("TRB"),
+        "Season": to_num("Season").astype("int64"),
+        "player_id": df["Player-additional"],
+        "three_share": to_num("3PAr"),
+        "three_fg_pct": to_num("3P%"),
+        "usg": to_num("USG%"),
+        "TS_per": to_num("TS%"),
+        "eFG": to_num("eFG%"),
+        "ftr": to_num("FTr"),
+        "AST_per": to_num("AST%"),
+        "TO_per": to_num("TOV%"),
+        "ORB_per": to_num("ORB%"),
+        "DRB_per": to_num("DRB%"),
+        "stl_per": to_num("STL%"),
+        "blk_per": to_num("BLK%"),
+    })
+    out = out[out["MP"] > 0]
+    for c in ["pts", "ast", "trb"]:
+        out[f"{c}_per36"] = 36.0 * out[c.upper()] / out["MP"]
+    for c in ZONE_COLS:
+        out[c] = np.nan
+    return out.reset_index(drop=True)
+
+
+class HistoryStore:
+    """Season partitions on disk, CompsIndex per season loaded lazily under a memory cap."""
+
+    def __init__(self, stats_path=NBA_STATS_PATH, adv_path=NBA_ADV_PATH,
+                 root=HISTORY_DIR, max_bytes=HISTORY_CACHE_MB * 1024 * 1024):
+        self.sources = [stats_path, adv_path]
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._key = None
+        self._dir = None
+        self._manifest = None       # {season: rows}
+        # in-memory partitions when the cache dir isn't writable: season -> (frame, bytes), LRU
+        self._frames: OrderedDict[int, tuple[pd.DataFrame, int]] | None = None
+        self._loaded: OrderedDict[int, tuple[CompsIndex, int]] = OrderedDict()
+        self.loads = self.evictions = 0
+
+    # ---- partitions ----
+    def version(self) -> str:
+        """Key of the source files (size/mtime) the partitions are built from; doesn't parse anything."""
+        if self._key is None:
+            self._key = data_loader._snapshot_key([*self.sources, os.path.abspath(__file__)])
+        return self._key
+
+    def _ensure_partitions(self):
+        if self._manifest is not None:
+            return
+        part_dir = os.path.join(self.root, self.version())
+        manifest_path = os.path.join(part_dir, "manifest.json")
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as f:
+                self._dir, self._manifest = part_dir, {int(s): n for s, n in json.load(f).items()}
+            return
+
+        seasons = self._parse()
+        try:
+            os.makedirs(part_dir, exist_ok=True)
+            for season, part in seasons.items():
+                data_loader._write_snapshot(part, self._partition_path(part_dir, season))
+            tmp = f"{manifest_path}.{os.getpid()}.tmp"
+            with open(tmp, "w") as f:
+                json.dump({str(s): len(p) for s, p in seasons.items()}, f)
+            os.replace(tmp, manifest_path)  # written last: a manifest means every partition is there
+            for old in glob.glob(os.path.join(self.root, "*")):
+                if old != part_dir:
+                    shutil.rmtree(old, ignore_errors=True)
+            self._dir = part_dir
+        except OSError:
+            self._frames = OrderedDict()  # read-only disk: keep the parsed partitions in memory
+            self._keep_frames(seasons)
+        self._manifest = {s: len(p) for s, p in seasons.items()}
+
+    def _parse(self) -> dict[int, pd.DataFrame]:
+        schemas = [data_loader.NBA_STATS_SCHEMA, data_loader.NBA_ADV_SCHEMA]
+        df = make_history_playstyle_df(*(_read_export(p, s) for p, s in zip(self.sources, schemas)))
+        return {int(s): g.reset_index(drop=True) for s, g in df.groupby("Season", sort=True)}
+
+    def _keep_frames(self, seasons: dict, used=None):
+        """Cache parsed partitions (`used` most recent), then evict past the cap."""
+        for season, part in seasons.items():
+            if season not in self._frames:
+                self._frames[season] = (part, int(part.memory_usage(deep=True).sum()))
+        if used is not None:
+            self._frames.move_to_end(used)
+        self._evict()
+
+    @staticmethod
+    def _partition_path(part_dir, season):
+        ext = ".parquet" if data_loader.PARQUET_AVAILABLE else ".pkl"
+        return os.path.join(part_dir, f"season={season}{ext}")
+
+    def seasons(self) -> list[int]:
+        with self._lock:
+            self._ensure_partitions()
+            return sorted(self._manifest)
+
+    def _load(self, season) -> CompsIndex:
+        if self._frames is not None:
+            hit = self._frames.get(season)
+            if hit is None:  # evicted earlier: parse it again
+                parsed = self._parse()
+                df = parsed[season]
+                self._keep_frames(parsed, used=season)
+            else:
+                self._frames.move_to_end(season)
+                df = hit[0]
+        else:
+            df = data_loader._read_snapshot(self._partition_path(self._dir, season))
+        key = feature_store.source_key([*self.sources, os.path.abspath(__file__)], HISTORY_FEATURE_COLS, season)
+        features = feature_store.load(f"history-{season}", key, lambda: pool_features(df, HISTORY_FEATURE_COLS))
+        return CompsIndex(df, feature_cols=HISTORY_FEATURE_COLS, features=features, display_cols=DISPLAY_COLS)
+
+    def index(self, season: int) -> CompsIndex:
+        """CompsIndex of one season, loading it (and evicting others past the cap) on a miss."""
+        with self._lock:
+            self._ensure_partitions()
+            if season not in self._manifest:
+                raise KeyError(season)
+            hit = self._loaded.get(season)
+            if hit is not None:
+                self._loaded.move_to_end(season)
+                return hit[0]
+
+            index = self._load(season)
+            nbytes = int(index.df.memory_usage(deep=True).sum())
+            if not isinstance(index.X, np.memmap):
+                nbytes += index.X.nbytes
+            self._loaded[season] = (index, nbytes)
+            self.loads += 1
+            self._evict()
+            return index
+
+    def _evict(self):
+        """Least recently used first: in-memory partitions (only needed to rebuild an index), then indexes."""
+        while self._frames and self.loaded_bytes() > self.max_bytes:
+            self._frames.popitem(last=False)
+            self.evictions += 1
+        while len(self._loaded) > 1 and self.loaded_bytes() > self.max_bytes:
+            self._loaded.popitem(last=False)
+            self.evictions += 1
+
+    def loaded_bytes(self) -> int:
+        frames = sum(n for _, n in self._frames.values()) if self._frames else 0
+        return frames + sum(n for _, n in self._loaded.values())
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "loadedSeasons": sorted(self._loaded),
+                "inMemoryPartitions": sorted(self._frames or ()),
+                "loadedBytes": self.loaded_bytes(),
+                "maxBytes": int(self.max_bytes),
+                "loads": self.loads,
+                "evictions": self.evictions,
+            }
+
+    # ---- queries ----
+    def query(self, player_row, seasons, k=5, target_usg=None, usg_band=None, min_mp=None,
+              pos=None, team=None, min_pool=0) -> pd.DataFrame:
+        """
+        Top-k comps for player_row over the given seasons, same predicates as
+        CompsIndex.query. The widening tier is picked once for the whole selection
+        (first tier matching >= min_pool rows across all its seasons), then every
+        season partition returns its top-k under that tier and they're merged.
+        """
+        indexes = [self.index(s) for s in seasons]
+        tiers = widening_tiers(target_usg, usg_band, min_mp)
+        for tier in tiers:
+            if sum(len(ix._candidates(pos=pos, team=team, **tier)) for ix in indexes) >= min_pool:
+                break
+
+        parts = [ix.query(player_row, k=k, pos=pos, team=team, **tier) for ix in indexes]
+        parts = [p for p in parts if len(p)]
+        if not parts:
+            return pd.DataFrame(columns=[*DISPLAY_COLS, "similarity_score"])
+        comps = pd.concat(parts, ignore_index=True)
+        return comps.sort_values("similarity_score", ascending=False, kind="stable").head(k)
+
+
+def parse_seasons(value: str, available: list[int]) -> list[int]:
+    """
+    "2019" -> [2019]; "2015-2019" -> 2015..2019; "2015-" / "-2012" are open ranges;
+    "all" -> every season. Raises ValueError for malformed or out-of-range input.
+    """
+    value = str(value).strip().lower()
+    if value == "all":
+        return list(available)
+    lo, sep, hi = value.partition("-")
+    try:
+        first = int(lo) if lo else min(available)
+        last = int(hi) if hi else (max(available) if sep else first)
+    except ValueError:
+        raise ValueError(f"season must be a year, a range like 2015-2019, or 'all' (got {value!r})")
+    seasons = [s for s in available if first <= s <= last]
+    if first > last or not seasons:
+        raise ValueError(f"no NBA seasons in {value!r} (available: {min(available)}-{max(available)})")
+    return seasons
@@ -0,0 +1,35 @@
+"""
+Name/slug -> row-position index for player lookups.
+Replaces df[df["player_name"] == key] scans with a dict hit.
+"""
+
+import pandas as pd
+
+
+def player_key(name) -> str:
+    """Normalize a player name the same way df["player_name"] is normalized."""
+    return str(name).strip().lower()
+
+
+def build_player_index(names: pd.Series | list) -> dict[str, int]:
+    """
+    Map every accepted form of a player name to its row position (for .iloc).
+    Forms: plain name ("marcus williams"), slug ("marcus-williams") and the
+    old slug-to-name form where every "-" became a space.
+    First row wins on duplicates (same as match.iloc[0]), and an exact name
+    always beats another player's slug form.
+    """
+    keys = [player_key(n) for n in names]
+
+    index: dict[str, int] = {}
+    for pos, key in enumerate(keys):
+        index.setdefault(key, pos)
+    for pos, key in enumerate(keys):
+        index.setdefault(key.replace(" ", "-"), pos)
+        index.setdefault(key.replace("-", " "), pos)
+    return index
+
+
+def lookup_player(index: dict[str, int], name) -> int | None:
+    """Row position for a plain name or slug, or None."""
+    return index.get(player_key(name))
@@ -1,23 +1,97 @@
 """
 View/access MLP predictions produced by draftability.py.
-Loads the predictions CSV and provides lookup by player name.
+Loads the served columns of the predictions CSV and provides lookup by player name;
+reloads by itself when draftability.py rewrites the file.
 """
 
 import os
+import threading
+import time
 import pandas as pd
 from model import data_loader
+from model.player_index import build_player_index, lookup_player
 
 PREDICTIONS_PATH = os.path.join(data_loader.DATA_DIR, "mlp_current_predictions_with_draftability.csv")
-_pred_df: pd.DataFrame | None = None
 
+# Only what _projection_dict / the summaries serve; everything else in the CSV is skipped
+SERVED_COLS = [
+    "peak_bpm", "peak_vorp", "peak_pts", "peak_mp",
+    "peak_bpm_pct", "peak_vorp_pct", "peak_pts_pct", "peak_mp_pct",
+    "draftability_score",
+]
 
-def _load_predictions() -> pd.DataFrame:
-    """Load predictions CSV (cached)."""
-    global _pred_df
-    if _pred_df is None:
-        _pred_df = pd.read_csv(PREDICTIONS_PATH)
-        _pred_df["player_name"] = _pred_df["player_name"].astype(str).str.strip().str.lower()
-    return _pred_df
+
+class PredictionsSnapshot:
+    """One immutable load of the predictions file: frame + name -> row index."""
+
+    def __init__(self, df: pd.DataFrame, index: dict[str, int], file_key: tuple):
+        self.df = df
+        self.index = index
+        self.file_key = file_key
+
+
+class PredictionsStore:
+    """
+    Lazily loaded, hot-reloadable predictions.
+    - At most one stat() per CHECK_INTERVAL seconds to notice a rewritten file.
+    - A reload builds a new snapshot off to the side and swaps the reference,
+      so readers always get a complete frame; while one thread reloads, the
+      others keep serving the previous snapshot instead of waiting.
+    """
+
+    CHECK_INTERVAL = 2.0
+
+    def __init__(self, path: str = PREDICTIONS_PATH):
+        self.path = path
+        self._snapshot: PredictionsSnapshot | None = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _file_key(self) -> tuple:
+        st = os.stat(self.path)  # FileNotFoundError if predictions were never generated
+        return (st.st_mtime_ns, st.st_size)
+
+    def _load(self, file_key: tuple) -> PredictionsSnapshot:
+        df = pd.read_csv(
+            self.path,
+            usecols=lambda c: c == "player_name" or c in SERVED_COLS,
+            dtype={c: "float32" for c in SERVED_COLS},
+        )
+        df["player_name"] = df["player_name"].astype(str).str.strip().str.lower()
+        return PredictionsSnapshot(df, build_player_index(df["player_name"]), file_key)
+
+    def snapshot(self) -> PredictionsSnapshot:
+        """Current snapshot; raises FileNotFoundError if the file has never existed."""
+        snap = self._snapshot
+        now = time.monotonic()
+        if snap is not None and now - self._checked_at < self.CHECK_INTERVAL:
+            return snap
+
+        # first load blocks; later reloads are skipped if another thread is already on it
+        if not self._lock.acquire(blocking=snap is None):
+            return snap
+        try:
+            snap = self._snapshot
+            try:
+                file_key = self._file_key()
+            except FileNotFoundError:
+                if snap is None:
+                    raise
+                return snap  # file removed: keep serving what we have
+            if snap is None or snap.file_key != file_key:
+                try:
+                    self._snapshot = snap = self._load(file_key)
+                except Exception:
+                    if snap is None:
+                        raise
+                    # unreadable rewrite: keep the old snapshot, retry after CHECK_INTERVAL
+            self._checked_at = now
+            return snap
+        finally:
+            self._lock.release()
+
+
+_store = PredictionsStore()
 
 
 def get_player_projections(player_name: str) -> dict | None:
@@ -27,16 +101,18 @@ def get_player_projections(player_name: str) -> dict | None:
     and peak_bpm_pct, peak_vorp_pct, peak_pts_pct, peak_mp_pct (0-100 percentile vs peers).
     """
     try:
-        df = _load_predictions()
+        snap = _store.snapshot()
     except FileNotFoundError:
         return None
 
-    name_key = str(player_name).strip().lower()
-    match = df[df["player_name"] == name_key]
-    if match.empty:
+    pos = lookup_player(snap.index, player_name)
+    if pos is None:
         return None
 
-    row = match.iloc[0]
+    return _projection_dict(snap.df.iloc[pos])
+
+
+def _projection_dict(row) -> dict:
     return {
         "peak_bpm": float(row.get("peak_bpm", 0)),
         "peak_vorp": float(row.get("peak_vorp", 0)),
@@ -47,4 +123,71 @@ def get_player_projections(player_name: str) -> dict | None:
         "peak_pts_pct": float(row.get("peak_pts_pct", 50)),
         "peak_mp_pct": float(row.get("peak_mp_pct", 50)),
         "draftability_score": float(row.get("draftability_score", 0)),
-    }
\ No newline at end of file
+    }
+
+
+def get_projections_frame(player_names) -> pd.DataFrame:
+    """
+    Bulk version of get_player_projections: one row per requested name (same order),
+    NaN where the player is not in the predictions CSV.
+    """
+    names = pd.Index([str(n).strip().lower() for n in player_names])
+    try:
+        snap = _store.snapshot()
+    except FileNotFoundError:
+        return pd.DataFrame(index=names, columns=["draftability_score"], dtype="float64")
+
+    positions = {n: lookup_player(snap.index, n) for n in names}
+    found = [n for n, pos in positions.items() if pos is not None]
+    rows = snap.df.iloc[[positions[n] for n in found]].set_index(pd.Index(found))
+    return rows.reindex(names)
+
+
+def predictions_version() -> tuple:
+    """Identifies the served predictions + draftability model (for HTTP caching)."""
+    try:
+        file_key = _store.snapshot().file_key
+    except FileNotFoundError:
+        file_key = None
+    try:
+        artifact_mtime = os.stat(data_loader.DRAFTABILITY_ARTIFACT_PATH).st_mtime_ns
+    except FileNotFoundError:
+        artifact_mtime = None
+    return (file_key, artifact_mtime)
+
+
+def get_model_projections(player_row: pd.Series) -> dict | None:
+    """
+    Projections for a player that isn't in the predictions CSV, scored on the fly
+    with the saved draftability model. None if the model hasn't been trained.
+    player_row: a serving-frame row (make_ncaa_playstyle_df output).
+    """
+    scored = get_model_projections_frame(player_row.to_frame().T)
+    if scored is None or scored.empty:
+        return None
+    return _projection_dict(scored.iloc[0])
+
+
+def get_model_projections_frame(df: pd.DataFrame) -> pd.DataFrame | None:
+    """Bulk version of get_model_projections (rows aligned with df), or None."""
+    from model import draftability  # sklearn/joblib only when actually needed
+
+    artifact = draftability.load_artifact()
+    if artifact is None:
+        return None
+    return draftability.score_players(_to_source_scale(df, artifact["pct_scale"]), artifact)
+
+
+def _to_source_scale(df: pd.DataFrame, pct_scale: dict) -> pd.DataFrame:
+    """
+    Serving rows have NCAA_FRACTION_COLS as fractions already; put those back on the
+    scale of the rows the artifact was trained on, which pct_scale then divides.
+    """
+    cols = [c for c, divisor in pct_scale.items()
+            if divisor != 1.0 and c in data_loader.NCAA_FRACTION_COLS and c in df.columns]
+    if not cols:
+        return df
+    df = df.copy()
+    for c in cols:
+        df[c] = pd.to_numeric(df[c], errors="coerce").astype("float64") * pct_scale[c]
+    return df
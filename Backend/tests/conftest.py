@@ -0,0 +1,74 @@
+"""
+Test setup. Data and cache locations are read from the environment at import
+time, so they point at a scratch copy of Backend/data before anything imports
+app or model.*; tests may rewrite those files freely. ESPN lookups go to a
+stand-in http.server on localhost (see EspnStandIn), never to the network.
+
+    cd Backend && python -m pytest -q
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+SCRATCH_DIR = tempfile.mkdtemp(prefix="proscout-tests-")
+DATA_DIR = os.path.join(SCRATCH_DIR, "data")
+shutil.copytree(os.path.join(BACKEND_DIR, "data"), DATA_DIR)
+
+os.environ["PROSCOUT_DATA_DIR"] = DATA_DIR
+os.environ["PROSCOUT_CACHE_DIR"] = os.path.join(SCRATCH_DIR, "cache")
+os.environ["HEADSHOT_PREFETCH"] = "0"  # no network from tests
+
+
+class EspnStandIn(BaseHTTPRequestHandler):
+    """Serves `routes` (path -> JSON) and records every requested path."""
+
+    routes: dict[str, object] = {}
+    requests: list[str] = []
+
+    def do_GET(self):
+        EspnStandIn.requests.append(self.path)
+        body = EspnStandIn.routes.get(self.path)
+        if body is None:
+            self.send_error(404)
+            return
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+ESPN_SERVER = ThreadingHTTPServer(("127.0.0.1", 0), EspnStandIn)
+threading.Thread(target=ESPN_SERVER.serve_forever, name="espn-stand-in", daemon=True).start()
+os.environ["ESPN_API_BASE"] = f"http://127.0.0.1:{ESPN_SERVER.server_port}"
+
+
+def pytest_sessionfinish(session, exitstatus):
+    ESPN_SERVER.shutdown()
+    shutil.rmtree(SCRATCH_DIR, ignore_errors=True)
+
+
+@pytest.fixture(scope="session")
+def app_module():
+    import app
+
+    return app
+
+
+@pytest.fixture
+def client(app_module):
+    return app_module.app.test_client()
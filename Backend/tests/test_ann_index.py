@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from model import ann_index
+
+
+def _unit_rows(n, d=12, seed=0):
+    # clustered rows, like the skewed playstyle features
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(40, d))
+    X = centers[rng.integers(0, 40, n)] + rng.normal(scale=0.3, size=(n, d))
+    return (X / np.linalg.norm(X, axis=1, keepdims=True)).astype(np.float32)
+
+
+def test_exact_search_is_brute_force():
+    X = _unit_rows(500)
+    ids, sims = ann_index.ExactIndex(X).search(X[7], 10)
+    expected = np.argsort(-(X @ X[7]), kind="stable")[:10]
+    assert ids.tolist() == expected.tolist()
+    assert ids[0] == 7 and np.all(np.diff(sims) <= 0)
+
+
+def test_ivf_recall_and_exact_scores():
+    X = _unit_rows(20_000)
+    index = ann_index.make_index(X, "ivf", "balanced")
+    queries = X[:200]
+    assert ann_index.recall_at_k(index, queries, k=10) >= 0.9
+
+    ids, sims = index.search(queries[0], 10)
+    np.testing.assert_allclose(sims, X[ids] @ queries[0], rtol=1e-6)
+
+
+def test_widening_reads_more_cells():
+    X = _unit_rows(5_000)
+    index = ann_index.InvertedFileIndex(X, n_probe=2)
+    sizes = [len(index.candidates(X[0], widen)) for widen in ann_index.WIDEN_STEPS]
+    assert sizes == sorted(sizes) and sizes[0] < sizes[-1] <= len(X)
+    assert len(index.candidates(X[0], widen=10_000)) == len(X)
+
+
+def test_make_index_kinds(monkeypatch):
+    monkeypatch.setattr(ann_index, "AUTO_MIN_ROWS", 1000)
+    assert ann_index.make_index(_unit_rows(999), "auto").kind == "exact"
+    assert ann_index.make_index(_unit_rows(1000), "auto").kind == "ivf"
+    assert ann_index.make_index(_unit_rows(1000), "ivf", "fast", n_probe=3).n_probe == 3
+    with pytest.raises(ValueError, match="Unknown ANN index kind"):
+        ann_index.make_index(_unit_rows(10), "hnsw")
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from model import archetypes, data_loader
+
+
+@pytest.fixture(scope="module")
+def nba():
+    return data_loader.load_current_nba_playstyle()
+
+
+@pytest.fixture
+def artifact(tmp_path):
+    return str(tmp_path / "nba_archetypes.npz")
+
+
+def _no_kmeans(*args, **kwargs):
+    raise AssertionError("KMeans was refit")
+
+
+def test_first_load_trains_once_then_reuses_the_saved_model(nba, artifact, monkeypatch):
+    model, labeled, _ = archetypes.load_nba_archetypes(nba, path=artifact)
+    assert model.version == 1
+
+    monkeypatch.setattr(archetypes, "train_nba_archetypes", _no_kmeans)
+    again, relabeled, centroids = archetypes.load_nba_archetypes(nba, path=artifact)
+    np.testing.assert_array_equal(again.cluster_centers_, model.cluster_centers_)
+    np.testing.assert_array_equal(relabeled["cluster"], labeled["cluster"])
+    assert list(centroids.columns) == archetypes.FEATURE_COLS
+
+
+def test_retrain_keeps_cluster_ids_stable(nba, artifact):
+    first, labeled, _ = archetypes.retrain_nba_archetypes(nba, path=artifact)
+    second, relabeled, _ = archetypes.retrain_nba_archetypes(nba, path=artifact)
+    assert second.version == first.version + 1
+    np.testing.assert_allclose(second.cluster_centers_, first.cluster_centers_)
+    np.testing.assert_array_equal(relabeled["cluster"], labeled["cluster"])
+
+
+def test_changed_data_is_labeled_with_saved_centroids(nba, artifact, monkeypatch):
+    model, _, _ = archetypes.load_nba_archetypes(nba, path=artifact)
+    monkeypatch.setattr(archetypes, "train_nba_archetypes", _no_kmeans)
+
+    fewer = nba.iloc[: len(nba) // 2]
+    again, labeled, _ = archetypes.load_nba_archetypes(fewer, path=artifact)
+    assert again.version == model.version
+    assert labeled["cluster"].between(0, len(model.cluster_centers_) - 1).all()
@@ -0,0 +1,29 @@
+import os
+import shutil
+
+import joblib
+
+from model import draftability
+
+
+def test_load_artifact_reloads_when_the_file_changes(tmp_path):
+    path = draftability.ARTIFACT_PATH
+    backup = tmp_path / "artifact.joblib"
+    had_artifact = os.path.exists(path)
+    if had_artifact:
+        shutil.copy2(path, backup)
+    try:
+        draftability.save_artifact({"version": draftability.ARTIFACT_VERSION, "tag": "old"})
+        assert draftability.load_artifact()["tag"] == "old"
+
+        # retrained by another process: only the file changes
+        joblib.dump({"version": draftability.ARTIFACT_VERSION, "tag": "new"}, path)
+        st = os.stat(path)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        assert draftability.load_artifact()["tag"] == "new"
+    finally:
+        if had_artifact:
+            shutil.copy2(backup, path)
+        else:
+            os.remove(path)
+        draftability._artifact_cache = None
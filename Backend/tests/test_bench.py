@@ -0,0 +1,74 @@
+import json
+
+import pytest
+
+from bench import run
+
+
+@pytest.fixture
+def stages(monkeypatch):
+    """Two tiny stages plus one that skips; `slow` makes the first stage cost that many ms."""
+    state = {"slow": 0.0}
+
+    def work():
+        def fn():
+            if state["slow"]:
+                import time
+                time.sleep(state["slow"] / 1000.0)
+        return fn
+
+    def missing():
+        raise run.Skip("no inputs")
+
+    monkeypatch.setattr(run, "STAGE_GROUPS", [lambda: [
+        ("work", work, 3),
+        ("noop", lambda: (lambda: None), 3),
+        ("missing", missing, 1),
+    ]])
+    return state
+
+
+def test_compare_needs_both_ratio_and_delta():
+    baseline = {"stages": {"a": {"median_ms": 10.0}, "b": {"median_ms": 100.0}, "c": {"median_ms": 1.0}}}
+    results = {
+        "a": {"median_ms": 14.0, "min_ms": 14.0},    # x1.4 but only 4 ms slower
+        "b": {"median_ms": 130.0, "min_ms": 130.0},  # x1.3 and 30 ms slower
+        "c": {"skipped": "no inputs"},
+        "new": {"median_ms": 50.0, "min_ms": 50.0},  # not in the baseline
+    }
+    assert run.compare(results, baseline, threshold=1.25, min_delta_ms=5.0) == ["b"]
+
+
+def test_save_then_gate(stages, tmp_path):
+    baseline = str(tmp_path / "baseline.json")
+    assert run.main(["--save", "--baseline", baseline]) == 0
+    saved = json.load(open(baseline))
+    assert saved["stages"]["missing"] == {"skipped": "no inputs"}
+    assert saved["data"] == run.data_signature()
+
+    assert run.main(["--baseline", baseline]) == 0
+
+    stages["slow"] = 50.0
+    assert run.main(["--baseline", baseline]) == 1
+    assert run.main(["--no-gate", "--baseline", baseline]) == 0
+
+
+def test_gate_fails_without_a_matching_baseline(stages, tmp_path):
+    baseline = tmp_path / "baseline.json"
+    assert run.main(["--baseline", str(baseline)]) == 1
+
+    run.main(["--save", "--baseline", str(baseline)])
+    report = json.loads(baseline.read_text())
+    report["data"]["trank_data.csv"] = 1
+    baseline.write_text(json.dumps(report))
+    assert run.main(["--baseline", str(baseline)]) == 1
+
+
+def test_partial_save_updates_only_those_stages(stages, tmp_path):
+    baseline = tmp_path / "baseline.json"
+    run.main(["--save", "--baseline", str(baseline)])
+    before = json.loads(baseline.read_text())["stages"]
+
+    run.main(["--save", "--only", "noop", "--baseline", str(baseline)])
+    after = json.loads(baseline.read_text())["stages"]
+    assert set(after) == set(before) and after["work"] == before["work"]
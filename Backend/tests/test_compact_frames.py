@@ -0,0 +1,51 @@
+import pandas as pd
+
+from model import data_loader
+
+
+def _frame():
+    return pd.DataFrame({
+        "name": ["A", "B", "C", "D"],
+        "team": ["Duke", "Duke", "UNC", "Duke"],
+        "ppg": [10.5, 12.25, 3.0, 8.0],
+        "games": [30, 31, 29, 28],
+        "unused": [1, 2, 3, 4],
+    })
+
+
+def test_compact_frame_prunes_and_downcasts():
+    df = _frame()
+    out = data_loader.compact_frame(df, ["ppg", "team", "name", "games", "missing"],
+                                    categorical=["team", "missing"], float32=["ppg", "games"])
+
+    assert list(out.columns) == ["name", "team", "ppg", "games"]  # df's order, absent names ignored
+    assert out["team"].dtype == "category" and out["ppg"].dtype == "float32"
+    assert out["games"].dtype == "int64"  # only float columns are downcast
+    assert out["team"].tolist() == df["team"].tolist()
+    assert df["ppg"].dtype == "float64"  # the input is left alone
+
+
+def test_frame_memory_reports_columns():
+    df = _frame()
+    report = data_loader.frame_memory(df)
+    assert report["rows"] == 4
+    assert set(report["columns"]) == set(df.columns)
+    assert report["columns"]["ppg"] == {"dtype": "float64", "bytes": 32}
+    assert report["bytes"] == int(df.memory_usage(deep=True, index=True).sum())
+
+
+def test_serving_frames_are_smaller_than_the_playstyle_frames(app_module):
+    raw = data_loader.load_current_ncaa_playstyle()
+    served = app_module.serving.df
+    assert len(served) <= len(raw)
+    assert served["team"].dtype == "category"
+    assert served.memory_usage(deep=True).sum() < raw.memory_usage(deep=True).sum()
+
+
+def test_debug_memory_report(client):
+    report = client.get("/debug/memory").get_json()
+    frames = report["frames"]
+    assert {"serving.df", "df_nba", "df_nba_labeled", "comps_index.df"} <= set(frames)
+    assert report["totalFrameBytes"] == sum(f["bytes"] for f in frames.values())
+    assert frames["serving.df"]["columns"]["team"]["dtype"] == "category"
+    assert "loadedBytes" in report["history"]
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+
+from model.data_loader import load_current_nba_playstyle
+from model.knn_comps import FEATURE_COLS, CompsIndex
+
+
+def _brute_force(df_nba, row, k, mask):
+    """The old per-request path: cosine similarity over the filtered pool, refitted each time."""
+    pool = df_nba[mask].dropna(subset=FEATURE_COLS)
+    X = pool[FEATURE_COLS].to_numpy(dtype="float64")
+    x = pd.to_numeric(row[FEATURE_COLS]).to_numpy(dtype="float64")
+    sims = (X / np.linalg.norm(X, axis=1, keepdims=True)) @ (x / np.linalg.norm(x))
+    return pool["Player"].to_numpy()[np.argsort(-sims, kind="stable")[:k]].tolist()
+
+
+def test_filtered_query_matches_brute_force(app_module):
+    df_nba = load_current_nba_playstyle()
+    index = CompsIndex(df_nba, ann="exact")
+    usg = pd.to_numeric(df_nba["usg"])
+    mp = pd.to_numeric(df_nba["MP"])
+    for _, row in app_module.serving.df.head(15).iterrows():
+        target = float(row["usg"])
+        mask = (usg >= target - 5) & (usg <= target + 5) & (mp >= 1000)
+        got = index.query(row, k=5, target_usg=target, usg_band=5.0, min_mp=1000, exact=True)
+        assert got["Player"].tolist() == _brute_force(df_nba, row, 5, mask)
+
+
+def test_position_filter_is_a_hard_filter(client, app_module):
+    name = app_module.serving.df["player_name"].iloc[0]
+    comps = client.get(f"/comps/{name}?pos=C").get_json()
+    assert comps and all(c["Pos"] == "C" for c in comps)
+    scores = [c["similarity_score"] for c in comps]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_widens_when_the_band_is_too_narrow(app_module):
+    index = app_module.comps_index
+    row = app_module.serving.df.iloc[0]
+    band = index._candidates(target_usg=float(row["usg"]), usg_band=0.01, min_mp=CompsIndex.MIN_MP)
+    got = index.query(row, k=5, target_usg=float(row["usg"]), usg_band=0.01,
+                      min_mp=CompsIndex.MIN_MP, min_pool=len(band) + 1)
+    assert len(got) == 5
+    assert (pd.to_numeric(got["MP"]) >= CompsIndex.MIN_MP).all()
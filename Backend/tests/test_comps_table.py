@@ -0,0 +1,25 @@
+import pytest
+
+from model.knn_comps import CompsIndex
+
+
+def test_materialized_comps_match_per_prospect_queries(app_module):
+    st, index = app_module.serving, app_module.comps_index
+    for pos in range(0, len(st.df), 7):
+        row = st.df.iloc[pos]
+        plain = index.query(row, k=5, exact=True)
+        assert st.comps_table.comps(pos, k=5)["Player"].tolist() == plain["Player"].tolist()
+
+        role = index.query(row, k=5, target_usg=float(row["usg"]), usg_band=CompsIndex.USG_BAND,
+                           min_mp=CompsIndex.MIN_MP, min_pool=CompsIndex.MIN_POOL, exact=True)
+        table = st.role_comps_table.comps(pos, k=5)
+        assert table["Player"].tolist() == role["Player"].tolist()
+        assert table["similarity_score"].to_numpy() == pytest.approx(
+            role["similarity_score"].to_numpy(), abs=1e-5)
+
+
+def test_comps_endpoint_serves_the_table(client, app_module):
+    st = app_module.serving
+    name = st.df["player_name"].iloc[3]
+    comps = client.get(f"/comps/{name}").get_json()
+    assert [c["Player"] for c in comps] == st.role_comps_table.comps(3, k=5)["Player"].tolist()
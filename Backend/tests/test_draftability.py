@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LinearRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from model import data_loader, draftability, view_predictions
+
+
+def test_percent_scaling_is_decided_at_train_time_not_per_batch():
+    training = pd.DataFrame({"TS_per": [55.0, 61.2], "ftr": [30.0, 0.5], "eFG": [0.51, 0.48]})
+    scale = draftability.percent_scales(training)
+    assert scale == {"TS_per": 100.0, "ftr": 100.0, "eFG": 1.0}
+
+    # one player whose rates all happen to be <= 1 on the 0-100 scale
+    batch = pd.DataFrame({"TS_per": [0.9], "ftr": [0.8], "eFG": [0.4]})
+    X = draftability.build_model_df(batch, scale)
+    assert X.loc[0, "TS_per"] == pytest.approx(0.009)
+    assert X.loc[0, "ftr"] == pytest.approx(0.008)
+    assert X.loc[0, "eFG"] == 0.4
+
+
+def _artifact_fitted_on(raw: pd.DataFrame) -> dict:
+    """A small linear stand-in for train(): fitted and calibrated on raw trank rows."""
+    raw = draftability.prepare_ncaa_rows(raw)
+    pct_scale = draftability.percent_scales(raw)
+    X = draftability.build_model_df(raw, pct_scale)[draftability.FEATURE_COLS]
+    rng = np.random.default_rng(0)
+    y = pd.DataFrame(X.to_numpy() @ rng.normal(size=(X.shape[1], 4)), columns=draftability.TARGET_COLS)
+    y_scaler = StandardScaler().fit(y)
+    model = Pipeline([("x_scaler", StandardScaler()), ("lr", LinearRegression())]).fit(X, y_scaler.transform(y))
+    artifact = {
+        "version": draftability.ARTIFACT_VERSION,
+        "pct_scale": pct_scale,
+        "model": model,
+        "y_scaler": y_scaler,
+        "clip_bounds": {c: (float(y[c].min()), float(y[c].max())) for c in draftability.TARGET_COLS},
+        "score_bounds": {c: (float(y[c].quantile(0.05)), float(y[c].quantile(0.95))) for c in draftability.TARGET_COLS},
+    }
+    raw_scores = draftability._draftability_raw(
+        pd.concat([draftability.predict_peaks(artifact, raw), X[["class_num"]]], axis=1), artifact["score_bounds"],
+    )
+    artifact["raw_min"], artifact["raw_max"] = float(raw_scores.min()), float(raw_scores.max())
+    artifact["pct_reference"] = {c: np.sort(y[c].to_numpy()) for c in draftability.TARGET_COLS}
+    return artifact
+
+
+def test_serving_rows_score_like_their_raw_rows(app_module, monkeypatch):
+    raw = data_loader.load_current_ncaa_data()
+    artifact = _artifact_fitted_on(raw)
+    assert artifact["pct_scale"]["TS_per"] == 100.0  # trank_data.csv has TS% / eFG on 0-100
+    monkeypatch.setattr(draftability, "load_artifact", lambda path=None: artifact)
+
+    serving = app_module.serving.df.head(20)
+    names = draftability.normalize_player_name(raw["player_name"])
+    raw_rows = raw[names.isin(serving["player_name"])]
+    raw_rows = raw_rows[~draftability.normalize_player_name(raw_rows["player_name"]).duplicated(keep=False)]
+    assert len(raw_rows) >= 10
+
+    expected = draftability.score_players(raw_rows, artifact).set_index("player_name")
+    got = view_predictions.get_model_projections_frame(serving).set_index("player_name")
+    got = got.loc[expected.index]
+    for col in ["peak_bpm", "peak_vorp", "draftability_score"]:
+        np.testing.assert_allclose(got[col], expected[col], rtol=1e-3, atol=1e-3)
+
+    one = serving[serving["player_name"] == expected.index[0]].iloc[0]
+    assert view_predictions.get_model_projections(one)["draftability_score"] == pytest.approx(
+        expected["draftability_score"].iloc[0], rel=1e-3, abs=1e-3)
@@ -0,0 +1,72 @@
+import glob
+import os
+
+import numpy as np
+import pytest
+
+from model import feature_store
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(feature_store, "FEATURE_DIR", str(tmp_path / "features"))
+    monkeypatch.setattr(feature_store, "FEATURE_STORE_ENABLED", True)
+    return tmp_path / "features"
+
+
+def _build(calls, rows=5):
+    def build():
+        calls.append(1)
+        return np.arange(rows * 3, dtype=np.float64).reshape(rows, 3), np.arange(100, 100 + rows)
+    return build
+
+
+def test_matrix_is_built_once_and_mapped_as_float32(store):
+    calls = []
+    first = feature_store.load("pool", "k1", _build(calls))
+    second = feature_store.load("pool", "k1", _build(calls))
+
+    assert len(calls) == 1
+    assert isinstance(second.X, np.memmap) and second.X.dtype == np.float32
+    assert not second.X.flags.writeable
+    np.testing.assert_array_equal(first.X, second.X)
+
+
+def test_new_key_replaces_the_old_files(store):
+    calls = []
+    feature_store.load("pool", "k1", _build(calls))
+    feature_store.load("other", "k1", _build(calls))
+    feature_store.load("pool", "k2", _build(calls, rows=7))
+
+    assert len(calls) == 3
+    names = sorted(os.path.basename(p) for p in glob.glob(str(store / "*.npy")))
+    assert names == ["other-k1.ids.npy", "other-k1.npy", "pool-k2.ids.npy", "pool-k2.npy"]
+
+
+def test_truncated_file_is_rebuilt(store):
+    calls = []
+    feature_store.load("pool", "k1", _build(calls))
+    (store / "pool-k1.npy").write_bytes(b"\x93NUMPY")
+    matrix = feature_store.load("pool", "k1", _build(calls))
+    assert len(calls) == 2 and matrix.X.shape == (5, 3)
+
+
+def test_disabled_store_keeps_the_matrix_in_memory(store, monkeypatch):
+    monkeypatch.setattr(feature_store, "FEATURE_STORE_ENABLED", False)
+    matrix = feature_store.load("pool", "k1", _build([]))
+    assert not isinstance(matrix.X, np.memmap) and matrix.X.dtype == np.float32
+    assert not store.exists()
+
+
+def test_take_maps_ids_to_rows(store):
+    matrix = feature_store.load("pool", "k1", _build([]))
+    np.testing.assert_array_equal(matrix.take([103, 100]), matrix.X[[3, 0]])
+    assert matrix.take([]).shape == (0, 3)
+    with pytest.raises(KeyError):
+        matrix.take([100, 999])
+
+
+def test_app_comps_matrices_are_mapped(client):
+    arrays = client.get("/debug/memory").get_json()["arrays"]
+    assert arrays["nba_features.X"]["mapped"] and arrays["nba_features.X"]["dtype"] == "float32"
+    assert arrays["serving.features.X"]["mapped"]
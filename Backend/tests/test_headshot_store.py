@@ -0,0 +1,117 @@
+import types
+
+import pytest
+
+import headshot_store
+import headshots
+from conftest import EspnStandIn
+
+TEAMS_PATH = "/apis/site/v2/sports/basketball/mens-college-basketball/teams"
+ROSTER_PATH = f"{TEAMS_PATH}/66/roster"
+HEADSHOT = "https://a.espncdn.com/i/headshots/mens-college-basketball/players/full/1.png"
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def espn(monkeypatch, tmp_path):
+    """A fresh store, a controllable clock and the stand-in serving one team roster."""
+    EspnStandIn.routes = {
+        TEAMS_PATH: {"sports": [{"leagues": [{"teams": [
+            {"team": {"id": "66", "location": "Iowa State", "displayName": "Iowa State Cyclones"}},
+        ]}]}]},
+        ROSTER_PATH: {"athletes": [{"fullName": "Tamin Lipsey", "headshot": {"href": HEADSHOT}}]},
+    }
+    EspnStandIn.requests = []
+    monkeypatch.setattr(headshots, "_espn_team_cache", {})
+    monkeypatch.setattr(headshots, "_espn_roster_cache", {})
+    clock = Clock()
+    monkeypatch.setattr(headshot_store, "time", types.SimpleNamespace(time=clock.time))
+    store = headshot_store.HeadshotStore(str(tmp_path / "headshots.sqlite3"))
+    monkeypatch.setattr(headshot_store, "_store", store)
+    return types.SimpleNamespace(store=store, clock=clock)
+
+
+def _roster_downloads() -> int:
+    return EspnStandIn.requests.count(ROSTER_PATH)
+
+
+def test_hit_is_served_from_the_store(espn):
+    headshot_store.prefetch([("Tamin Lipsey", "Iowa State")], [])
+
+    assert espn.store.get(headshot_store.NCAA, headshot_store.ncaa_key("Tamin Lipsey", "Iowa State")) == (True, HEADSHOT)
+    assert headshot_store.ncaa_headshot("Tamin Lipsey", "Iowa State") == HEADSHOT
+    assert headshot_store.ncaa_headshots([("tamin  lipsey", "iowa state")]) == [HEADSHOT]
+    assert _roster_downloads() == 1
+
+
+def test_miss_is_cached_for_missing_ttl(espn):
+    players = [("Nobody Here", "Iowa State")]
+    headshot_store.prefetch(players, [])
+    assert espn.store.get(headshot_store.NCAA, headshot_store.ncaa_key(*players[0])) == (True, None)
+    assert "ui-avatars.com" in headshot_store.ncaa_headshot(*players[0])
+
+    headshots._espn_roster_cache.clear()  # only the store's negative entry can skip the lookup now
+    espn.clock.now += headshot_store.MISSING_TTL - 1
+    headshot_store.prefetch(players, [])
+    assert _roster_downloads() == 1
+
+    espn.clock.now += 2
+    headshot_store.prefetch(players, [])
+    assert _roster_downloads() == 2
+
+
+def test_found_url_expires_after_found_ttl(espn):
+    players = [("Tamin Lipsey", "Iowa State")]
+    key = headshot_store.ncaa_key(*players[0])
+    headshot_store.prefetch(players, [])
+
+    espn.clock.now += headshot_store.FOUND_TTL + 1
+    assert espn.store.get(headshot_store.NCAA, key) == (False, None)
+    assert "ui-avatars.com" in headshot_store.ncaa_headshot(*players[0])
+
+    headshots._espn_roster_cache.clear()
+    new_headshot = HEADSHOT.replace("1.png", "2.png")
+    EspnStandIn.routes[ROSTER_PATH] = {"athletes": [{"fullName": "Tamin Lipsey", "headshot": {"href": new_headshot}}]}
+    headshot_store.prefetch(players, [])
+    assert espn.store.get(headshot_store.NCAA, key) == (True, new_headshot)
+    assert _roster_downloads() == 2
+
+
+def test_start_prefetch_resolves_in_the_background(espn, monkeypatch):
+    monkeypatch.setattr(headshot_store, "PREFETCH_ENABLED", True)
+    players = [("Tamin Lipsey", "Iowa State"), ("Nobody Here", "Iowa State"), ("Tamin Lipsey", "Iowa State")]
+
+    thread = headshot_store.start_prefetch(iter(players), [])
+    thread.join(timeout=10)
+
+    assert not thread.is_alive()
+    assert headshot_store.ncaa_headshot("Tamin Lipsey", "Iowa State") == HEADSHOT
+    assert espn.store.get(headshot_store.NCAA, headshot_store.ncaa_key("Nobody Here", "Iowa State")) == (True, None)
+    assert EspnStandIn.requests.count(TEAMS_PATH) == 1
+    assert _roster_downloads() == 1  # one roster download serves every player of the team
+
+
+def test_prefetch_is_disabled_by_the_environment(espn, monkeypatch):
+    monkeypatch.setattr(headshot_store, "PREFETCH_ENABLED", False)
+    assert headshot_store.start_prefetch([("Tamin Lipsey", "Iowa State")], []) is None
+    assert EspnStandIn.requests == []
+
+
+def test_prefetch_timings_show_up_in_this_process_metrics(espn, monkeypatch, client):
+    import metrics
+
+    monkeypatch.setattr(headshot_store, "PREFETCH_ENABLED", True)
+    before = metrics.OUTBOUND_LATENCY.count("espn_roster")
+
+    headshot_store.start_prefetch([("Tamin Lipsey", "Iowa State")], []).join(timeout=10)
+
+    assert metrics.OUTBOUND_LATENCY.count("espn_roster") == before + 1
+    body = client.get("/metrics").get_data(as_text=True)
+    assert f'proscout_outbound_request_duration_seconds_count{{target="espn_roster"}} {before + 1}' in body
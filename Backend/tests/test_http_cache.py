@@ -0,0 +1,88 @@
+import gzip
+
+import pytest
+from flask import Flask, jsonify
+
+import http_cache
+
+
+@pytest.fixture
+def site(monkeypatch):
+    monkeypatch.setattr(http_cache, "_cache", http_cache.ResponseCache())
+    state = {"version": 1, "calls": 0}
+    app = Flask(__name__)
+
+    @app.route("/rows")
+    @http_cache.cached(lambda: state["version"])
+    def rows():
+        state["calls"] += 1
+        return jsonify([{"name": f"Player {i}", "score": i} for i in range(100)])
+
+    @app.route("/tiny")
+    @http_cache.cached(lambda: state["version"])
+    def tiny():
+        return jsonify(ok=True)
+
+    @app.route("/missing")
+    @http_cache.cached(lambda: state["version"])
+    def missing():
+        state["calls"] += 1
+        return jsonify(error="not found"), 404
+
+    state["client"] = app.test_client()
+    return state
+
+
+def test_matching_etag_gets_304(site):
+    first = site["client"].get("/rows")
+    assert first.status_code == 200
+    assert first.headers["Cache-Control"] == f"public, max-age={http_cache.MAX_AGE}"
+
+    again = site["client"].get("/rows", headers={"If-None-Match": first.headers["ETag"]})
+    assert again.status_code == 304 and again.data == b""
+    assert again.headers["ETag"] == first.headers["ETag"]
+    assert site["calls"] == 1
+
+
+def test_body_is_built_once_per_version(site):
+    client = site["client"]
+    first = client.get("/rows")
+    assert client.get("/rows").data == first.data
+    assert site["calls"] == 1
+
+    site["version"] = 2
+    changed = client.get("/rows", headers={"If-None-Match": first.headers["ETag"]})
+    assert changed.status_code == 200 and changed.headers["ETag"] != first.headers["ETag"]
+    assert site["calls"] == 2
+
+
+def test_gzip_body_matches_identity(site):
+    plain = site["client"].get("/rows")
+    zipped = site["client"].get("/rows", headers={"Accept-Encoding": "gzip"})
+    assert zipped.headers["Content-Encoding"] == "gzip"
+    assert zipped.headers["Vary"] == "Accept-Encoding"
+    assert gzip.decompress(zipped.data) == plain.data
+
+    # the encoded tag still revalidates against the same version
+    again = site["client"].get("/rows", headers={"Accept-Encoding": "gzip", "If-None-Match": zipped.headers["ETag"]})
+    assert again.status_code == 304
+
+
+def test_small_bodies_are_not_compressed(site):
+    resp = site["client"].get("/tiny", headers={"Accept-Encoding": "gzip, br"})
+    assert "Content-Encoding" not in resp.headers
+    assert resp.get_json() == {"ok": True}
+
+
+def test_errors_are_not_cached(site):
+    for _ in range(2):
+        resp = site["client"].get("/missing")
+        assert resp.status_code == 404 and "ETag" not in resp.headers
+    assert site["calls"] == 2
+
+
+def test_player_endpoints_revalidate(client):
+    first = client.get("/players/summary")
+    assert first.status_code == 200
+    again = client.get("/players/summary", headers={"If-None-Match": first.headers["ETag"]})
+    assert again.status_code == 304
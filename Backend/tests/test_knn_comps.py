@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+
+from model.knn_comps import FEATURE_COLS, CompsIndex
+
+
+def _pool(n=4000, seed=0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(rng.random((n, len(FEATURE_COLS))), columns=FEATURE_COLS)
+    df["usg"] = rng.uniform(10, 35, n)
+    df["MP"] = rng.uniform(500, 3000, n)
+    return df
+
+
+def _query(index, row, **kwargs):
+    comps = index.query(row, k=5, target_usg=20.0, usg_band=0.5, min_mp=1000, **kwargs)
+    return comps.index.tolist(), comps["usg"].to_numpy()
+
+
+def test_ann_picks_the_same_widening_tier_as_the_exact_search():
+    df = _pool()
+    exact = CompsIndex(df, ann="exact")
+    ann = CompsIndex(df, ann="ivf", n_probe=4)
+    row = df.loc[df["usg"].where(df["MP"] >= 1000).idxmax()]  # far outside the usage band
+
+    band = exact._candidates(target_usg=20.0, usg_band=0.5, min_mp=1000)
+    assert 5 <= len(band) < 200  # the shortlist alone holds k band rows; the whole pool not min_pool
+
+    # too few band rows in the whole pool: both drop the band
+    exact_ids, exact_usg = _query(exact, row, min_pool=200)
+    ann_ids, ann_usg = _query(ann, row, min_pool=200)
+    assert ann_ids[0] == exact_ids[0] == row.name
+    assert (np.abs(ann_usg - 20.0) > 0.5).any()
+
+    # enough of them: both keep it
+    _, exact_usg = _query(exact, row, min_pool=5)
+    _, ann_usg = _query(ann, row, min_pool=5)
+    assert (np.abs(exact_usg - 20.0) <= 0.5).all()
+    assert (np.abs(ann_usg - 20.0) <= 0.5).all()
@@ -0,0 +1,68 @@
+import pytest
+from flask import Flask
+
+import metrics
+
+
+def test_histogram_renders_cumulative_buckets():
+    h = metrics.Histogram("t_seconds", "Test.", ("route",), buckets=(0.1, 1.0))
+    for v in (0.05, 0.5, 0.5, 3.0):
+        h.observe(v, "/x")
+
+    assert h.count("/x") == 4 and h.count("/y") == 0
+    lines = h.render()
+    assert 't_seconds_bucket{route="/x",le="0.1"} 1' in lines
+    assert 't_seconds_bucket{route="/x",le="1"} 3' in lines
+    assert 't_seconds_bucket{route="/x",le="+Inf"} 4' in lines
+    assert 't_seconds_sum{route="/x"} 4.050000' in lines
+    assert 't_seconds_count{route="/x"} 4' in lines
+
+
+def test_counter_escapes_label_values():
+    c = metrics.Counter("t_total", "Test.", ("name",))
+    c.inc('a"b\\c')
+    c.inc('a"b\\c', amount=2)
+    assert c.value('a"b\\c') == 3
+    assert 't_total{name="a\\"b\\\\c"} 3' in c.render()
+
+
+@pytest.fixture
+def site(monkeypatch):
+    monkeypatch.setattr(metrics, "REQUESTS", metrics.Counter("r", "", ("route", "method", "status")))
+    monkeypatch.setattr(metrics, "REQUEST_LATENCY", metrics.Histogram("l", "", ("route",)))
+    monkeypatch.setattr(metrics, "ERRORS", metrics.Counter("e", "", ("route",)))
+    app = Flask(__name__)
+    metrics.install(app)
+
+    @app.get("/player/<name>")
+    def player(name):
+        return name
+
+    @app.get("/boom")
+    def boom():
+        raise RuntimeError("boom")
+
+    return app.test_client()
+
+
+def test_requests_are_labeled_by_url_rule(site):
+    site.get("/player/A")
+    site.get("/player/B")
+    site.get("/nowhere")
+
+    assert metrics.REQUESTS.value("/player/<name>", "GET", "200") == 2
+    assert metrics.REQUEST_LATENCY.count("/player/<name>") == 2
+    assert metrics.REQUESTS.value("unmatched", "GET", "404") == 1
+
+
+def test_unhandled_exceptions_count_as_errors(site):
+    assert site.get("/boom").status_code == 500
+    assert metrics.REQUESTS.value("/boom", "GET", "500") == 1
+    assert metrics.ERRORS.value("/boom") == 1
+
+
+def test_app_exposes_its_routes(client):
+    client.get("/players/summary")
+    body = client.get("/metrics").get_data(as_text=True)
+    assert 'proscout_http_requests_total{route="/players/summary",method="GET",status="200"}' in body
+    assert 'proscout_http_request_duration_seconds_count{route="/players/summary"}' in body
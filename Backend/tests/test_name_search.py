@@ -0,0 +1,19 @@
+from model.name_search import TRIE_NODE_CAP, NameSearchIndex
+
+
+def _index():
+    # more short NBA names under "jo" than a trie node keeps, and one longer NCAA name
+    nba = [{"kind": "nba", "id": i, "name": f"Jo {chr(97 + i % 26)}{i}"} for i in range(2 * TRIE_NODE_CAP)]
+    return NameSearchIndex([*nba, {"kind": "ncaa", "id": "x", "name": "Johnathan Longername"}])
+
+
+def test_kind_filter_is_applied_before_the_trie_cap():
+    index = _index()
+    assert [m["id"] for m in index.search("jo", kind="ncaa")] == ["x"]
+    assert [m["id"] for m in index.search("joh", kind="ncaa")] == ["x"]
+    assert all(m["kind"] == "nba" for m in index.search("jo", kind="nba", limit=50))
+    assert len(index.search("jo", limit=50)) == 50
+
+
+def test_unknown_kind_matches_nothing():
+    assert _index().search("jo", kind="g-league") == []
@@ -0,0 +1,71 @@
+import glob
+
+import pytest
+
+from model import data_loader
+from model.knn_comps import HISTORY_FEATURE_COLS
+from model.nba_history import HistoryStore, parse_seasons
+
+
+def test_in_memory_partitions_respect_the_cache_cap(tmp_path):
+    blocker = tmp_path / "not-a-dir"
+    blocker.write_text("")
+    store = HistoryStore(root=str(blocker / "history"), max_bytes=400_000)  # makedirs fails: read-only fallback
+
+    seasons = store.seasons()
+    assert store._frames is not None and len(seasons) > 3
+    assert store.loaded_bytes() <= store.max_bytes
+    assert len(store._frames) < len(seasons)
+
+    for season in seasons:  # evicted partitions are parsed again on demand
+        store.index(season)
+        assert store.loaded_bytes() <= store.max_bytes or len(store._loaded) == 1
+    assert store.index(seasons[0]).df["Season"].eq(seasons[0]).all()
+    assert store.stats()["evictions"] > 0
+
+
+def test_parse_seasons():
+    available = list(range(2009, 2027))
+    assert parse_seasons("2019", available) == [2019]
+    assert parse_seasons(" 2015-2017 ", available) == [2015, 2016, 2017]
+    assert parse_seasons("2024-", available) == [2024, 2025, 2026]
+    assert parse_seasons("-2010", available) == [2009, 2010]
+    assert parse_seasons("ALL", available) == available
+    for bad in ("nineteen", "2019-2015", "1990", "2030-"):
+        with pytest.raises(ValueError):
+            parse_seasons(bad, available)
+
+
+def test_partitions_are_written_once_and_reused(tmp_path, monkeypatch):
+    store = HistoryStore(root=str(tmp_path))
+    seasons = store.seasons()
+    assert len(glob.glob(str(tmp_path / "*" / "season=*"))) == len(seasons)
+
+    monkeypatch.setattr(HistoryStore, "_parse", lambda self: pytest.fail("exports parsed again"))
+    again = HistoryStore(root=str(tmp_path))
+    assert again.seasons() == seasons
+    assert again.index(seasons[-1]).df["Season"].eq(seasons[-1]).all()
+
+
+def test_query_merges_the_selected_seasons(tmp_path):
+    store = HistoryStore(root=str(tmp_path))
+    first, last = store.seasons()[0], store.seasons()[-1]
+    row = data_loader.load_current_ncaa_playstyle().dropna(subset=HISTORY_FEATURE_COLS).iloc[0]
+
+    merged = store.query(row, [first, last], k=5)
+    assert set(merged["Season"]) <= {first, last}
+    best = max(store.query(row, [s], k=1)["similarity_score"].iloc[0] for s in (first, last))
+    assert merged["similarity_score"].iloc[0] == pytest.approx(best)
+    assert merged["similarity_score"].is_monotonic_decreasing
+
+
+def test_comps_season_parameter(client, app_module):
+    name = app_module.serving.df["player_name"].iloc[0]
+    season = app_module.history_store.seasons()[-2]
+
+    resp = client.get(f"/comps/{name}?season={season}")
+    assert resp.status_code == 200
+    assert {c["Season"] for c in resp.get_json()} == {season}
+
+    resp = client.get(f"/comps/{name}?season=1990")
+    assert resp.status_code == 400 and resp.get_json()["error"].startswith("Invalid query: ")
@@ -0,0 +1,57 @@
+import pytest
+
+import headshots
+
+pytest.importorskip("nba_api")
+from nba_api.stats.static import players as nba_players  # noqa: E402
+
+PEOPLE = [
+    {"id": 1, "full_name": "Nikola Jokić", "is_active": True},
+    {"id": 2, "full_name": "A.J. Green", "is_active": True},
+    {"id": 3, "full_name": "GG Jackson II", "is_active": True},
+    {"id": 4, "full_name": "Gerald Green", "is_active": False},
+    {"id": 5, "full_name": "Gerald Green", "is_active": False},
+    {"id": 6, "full_name": "Marcus Morris Sr.", "is_active": False},
+    {"id": 7, "full_name": "Marcus Morris", "is_active": True},
+]
+
+
+@pytest.fixture
+def people(monkeypatch):
+    calls = []
+
+    def get_players():
+        calls.append(1)
+        return PEOPLE
+
+    monkeypatch.setattr(nba_players, "get_players", get_players)
+    monkeypatch.setattr(headshots, "_nba_ids", None)
+    return calls
+
+
+def _id(name):
+    url = headshots.resolve_nba_headshot(name)
+    return url and int(url.rsplit("/", 1)[1].removesuffix(".png"))
+
+
+def test_names_resolve_through_the_folded_index(people):
+    assert _id("Nikola Jokic") == 1
+    assert _id("jokić  nikola") == 1
+    assert _id("AJ Green") == 2
+    assert _id("GG Jackson") == 3
+    assert _id("Gerald Green") == 4  # exact forms keep nba_api's list order
+    assert _id("Marcus Morris") == 7
+    assert _id("Nobody Here") is None
+    assert _id("Jokic") is None  # single names never resolve
+
+
+def test_loose_forms_prefer_active_players(people):
+    index = headshots._nba_id_index()
+    assert index[headshots._loose_name(headshots._fold_name("Marcus Morris Sr."))] == 7
+    assert index["morris marcus"] == 7
+
+
+def test_player_list_is_read_once(people):
+    for name in ("Nikola Jokic", "AJ Green", "Nobody Here"):
+        headshots.resolve_nba_headshot(name)
+    assert len(people) == 1
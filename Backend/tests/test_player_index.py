@@ -0,0 +1,20 @@
+from model.player_index import build_player_index, lookup_player
+
+
+def test_names_and_slugs_resolve_to_the_first_row():
+    index = build_player_index(["Marcus Williams", " jean-paul smith ", "marcus williams", "marcus-williams"])
+    assert lookup_player(index, "MARCUS WILLIAMS") == 0        # duplicates: first row wins
+    assert lookup_player(index, "marcus-williams") == 3        # an exact name beats another row's slug
+    assert lookup_player(index, "jean-paul smith") == 1
+    assert lookup_player(index, "jean-paul-smith") == 1        # slug
+    assert lookup_player(index, "jean paul smith") == 1        # old slug -> name form
+    assert lookup_player(index, "nobody") is None
+
+
+def test_player_endpoint_accepts_name_and_slug(client, app_module):
+    name = app_module.serving.df["player_name"].iloc[0]
+    by_name = client.get(f"/player/{name}").get_json()
+    by_slug = client.get(f"/player/{name.replace(' ', '-')}").get_json()
+    assert by_name["name"].lower() == name
+    assert by_slug == by_name
+    assert client.get("/player/no-such-player").status_code == 404
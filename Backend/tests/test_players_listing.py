@@ -0,0 +1,47 @@
+import base64
+
+
+def _cursor(offset, signature):
+    return base64.urlsafe_b64encode(f"{offset}:{signature}".encode()).decode().rstrip("=")
+
+
+def test_unrelated_params_keep_the_bare_name_list(client):
+    bare = client.get("/players").get_json()
+    assert isinstance(bare, list)
+    assert client.get("/players?_=1").get_json() == bare
+
+
+def test_listing_params_switch_to_pages(client):
+    for query in ("limit=5", "sort=name", "conf=ACC", "minScore=0", "fields=name"):
+        body = client.get(f"/players?{query}").get_json()
+        assert set(body) == {"items", "total", "nextCursor"}, query
+
+
+def test_negative_cursor_offset_is_rejected(client):
+    first = client.get("/players?limit=2").get_json()
+    signature = base64.urlsafe_b64decode(first["nextCursor"] + "==").decode().split(":", 1)[1]
+
+    response = client.get(f"/players?limit=2&cursor={_cursor(-2, signature)}")
+    assert response.status_code == 400
+    assert response.get_json()["error"] == "Invalid query: cursor is not a nextCursor of this query"
+    assert client.get(f"/players?limit=2&cursor={_cursor(2, signature)}").status_code == 200
+
+
+def test_bad_params_get_a_fixed_message_per_param(client):
+    cases = {
+        "sort=height": "sort must be one of: ",
+        "order=up": "order must be asc or desc",
+        "fields=name,secret": "fields must be a comma-separated subset of: ",
+        "limit=abc": "limit must be a positive integer",
+        "limit=0": "limit must be a positive integer",
+        "limit=-3": "limit must be a positive integer",
+        "minScore=high": "minScore must be a number",
+        "maxScore=nan": "maxScore must be a number",
+        "cursor=x": "cursor is not a nextCursor of this query",
+        "cursor=" + base64.urlsafe_b64encode(b"nocolon").decode(): "cursor is not a nextCursor of this query",
+        "cursor=" + base64.urlsafe_b64encode(b"\xff\xfe").decode(): "cursor is not a nextCursor of this query",
+    }
+    for query, message in cases.items():
+        response = client.get(f"/players?{query}")
+        assert response.status_code == 400, query
+        assert response.get_json()["error"].startswith(f"Invalid query: {message}"), query
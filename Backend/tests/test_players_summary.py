@@ -0,0 +1,17 @@
+CARD_FIELDS = ["id", "name", "school", "year", "position", "archetype", "archetypeConfidence",
+               "nbaComp", "draftabilityScore", "headshotUrl"]
+
+
+def test_summary_has_one_card_per_prospect(client, app_module):
+    summary = client.get("/players/summary").get_json()
+    assert len(summary) == len(app_module.serving.df)
+    assert len({s["id"] for s in summary}) == len(summary)
+    assert all(set(CARD_FIELDS) <= set(s) for s in summary)
+
+
+def test_summary_cards_match_the_player_endpoint(client):
+    for card in client.get("/players/summary").get_json()[:25]:
+        player = client.get(f"/player/{card['id']}").get_json()
+        assert {k: player[k] for k in CARD_FIELDS} == {k: card[k] for k in CARD_FIELDS}
+        for stat, value in card["stats"].items():
+            assert player["stats"].get(stat) == value, (card["id"], stat)
@@ -0,0 +1,33 @@
+import os
+
+import pandas as pd
+
+from model import view_predictions
+
+
+def _rewrite_score(name: str, score: float):
+    path = view_predictions.PREDICTIONS_PATH
+    df = pd.read_csv(path)
+    df.loc[df["player_name"].str.strip().str.lower() == name, "draftability_score"] = score
+    tmp = f"{path}.tmp"
+    df.to_csv(tmp, index=False)
+    os.replace(tmp, path)
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))  # a distinct mtime
+    view_predictions._store._checked_at = 0.0  # skip CHECK_INTERVAL
+
+
+def test_summary_and_listing_follow_rewritten_predictions(client):
+    first = client.get("/players?sort=draftability&limit=1").get_json()["items"][0]
+    name = first["name"].lower()
+    assert client.get("/players/summary").status_code == 200
+
+    _rewrite_score(name, 12.0)
+
+    assert client.get(f"/player/{first['id']}").get_json()["draftabilityScore"] == 12.0
+    summary = {s["id"]: s for s in client.get("/players/summary").get_json()}
+    assert summary[first["id"]]["draftabilityScore"] == 12.0
+    top = client.get("/players?sort=draftability&limit=1").get_json()["items"][0]
+    assert top["id"] != first["id"]
+    low = client.get("/players?maxScore=12&limit=200").get_json()["items"]
+    assert first["id"] in [s["id"] for s in low]
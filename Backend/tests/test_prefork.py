@@ -0,0 +1,66 @@
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from urllib.error import URLError
+from urllib.request import urlopen
+
+import pytest
+
+from conftest import BACKEND_DIR
+
+pytest.importorskip("gunicorn")
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _get(url: str):
+    with urlopen(url, timeout=5) as resp:
+        return resp.status, json.loads(resp.read())
+
+
+@pytest.fixture
+def server(tmp_path):
+    port = _free_port()
+    log = tmp_path / "gunicorn.log"
+    with open(log, "w") as out:
+        proc = subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app:app"],
+            cwd=BACKEND_DIR, stdout=out, stderr=subprocess.STDOUT,
+            env={**os.environ, "PORT": str(port), "WEB_CONCURRENCY": "2", "PYTHONUNBUFFERED": "1"},
+        )
+    base = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 120
+    while True:
+        try:
+            if _get(f"{base}/readyz")[0] == 200:
+                break
+        except (URLError, OSError):
+            pass
+        assert proc.poll() is None and time.monotonic() < deadline, log.read_text()
+        time.sleep(0.5)
+    yield base, log
+    proc.terminate()
+    proc.wait(timeout=30)
+
+
+def test_workers_serve_the_data_loaded_once_in_the_master(server):
+    base, log = server
+    for _ in range(6):
+        status, health = _get(f"{base}/healthz")
+        assert status == 200 and health["warmedUp"] and health["modelsReady"]
+    assert _get(f"{base}/players/summary")[0] == 200
+
+    deadline = time.monotonic() + 30
+    while log.read_text().count("Booting worker with pid") < 2 and time.monotonic() < deadline:
+        time.sleep(0.2)
+    text = log.read_text()
+    assert text.count("Booting worker with pid") == 2, text
+    assert text.count("Startup (eager): ") == 1, text
+    assert "Data loaded (eager startup); forking 2 workers" in text
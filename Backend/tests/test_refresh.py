@@ -0,0 +1,82 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+from conftest import BACKEND_DIR, DATA_DIR
+
+# Runs in its own process (and data dir): a refresh swaps the module-level serving state.
+SCRIPT = r"""
+import csv, json, os
+import pandas as pd
+import app
+
+client = app.app.test_client()
+data_dir = os.environ["PROSCOUT_DATA_DIR"]
+trank = os.path.join(data_dir, "trank_data.csv")
+cols = [str(c).strip() for c in pd.read_excel(os.path.join(data_dir, "pstatheaders.xlsx"), nrows=0).columns]
+pts = cols.index("pts")
+changed, removed, kept = (str(n) for n in app.serving.df["player_name"].iloc[:3])
+
+out = {"unchanged": app.refresh_ncaa_data(), "kept_comps": client.get(f"/comps/{kept}").get_json()}
+old = app.serving
+
+with open(trank, newline="") as f:
+    rows = list(csv.reader(f))
+new_rows = []
+for row in rows:
+    name = row[0].strip().lower()
+    if name == removed:
+        continue
+    if name == changed:
+        row[pts] = str(float(row[pts]) + 5.0)
+    new_rows.append(row)
+    if name == kept:
+        new_rows.append(["Zed Newcomer", *row[1:]])
+with open(trank + ".tmp", "w", newline="") as f:
+    csv.writer(f).writerows(new_rows)
+os.replace(trank + ".tmp", trank)
+st = os.stat(trank)
+os.utime(trank, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+out["refresh"] = app.refresh_ncaa_data()
+out["old_still_has_removed"] = old.find_player(removed)[0] is not None
+out["removed_status"] = client.get(f"/player/{removed}").status_code
+out["added_status"] = client.get("/player/zed newcomer").status_code
+out["kept_comps_after"] = client.get(f"/comps/{kept}").get_json()
+summary = {s["name"].lower(): s for s in client.get("/players/summary").get_json()}
+out["ppg_delta"] = summary[changed]["stats"]["ppg"] - float(old.df.loc[old.df["player_name"] == changed, "pts"].iloc[0])
+out["admin"] = [
+    client.post("/admin/refresh").status_code,
+    client.post("/admin/refresh", headers={"Authorization": "Bearer nope"}).status_code,
+    client.post("/admin/refresh", headers={"Authorization": "Bearer s3cret"}).get_json(),
+]
+print(json.dumps(out))
+"""
+
+
+def test_refresh_recomputes_only_changed_rows(tmp_path):
+    data_dir = tmp_path / "data"
+    shutil.copytree(DATA_DIR, data_dir)
+    result = subprocess.run(
+        [sys.executable, "-c", SCRIPT], cwd=BACKEND_DIR, capture_output=True, text=True, timeout=180,
+        env={**os.environ, "PROSCOUT_DATA_DIR": str(data_dir), "PROSCOUT_CACHE_DIR": str(tmp_path / "cache"),
+             "PROSCOUT_ADMIN_TOKEN": "s3cret"},
+    )
+    assert result.returncode == 0, result.stderr
+    out = json.loads(result.stdout.strip().splitlines()[-1])
+
+    assert out["unchanged"]["refreshed"] is False
+    report = out["refresh"]
+    assert report["refreshed"] is True
+    assert (report["changed"], report["added"], report["removed"]) == (1, 1, 1)
+    assert report["reused"] == report["players"] - 2
+
+    assert out["old_still_has_removed"]  # requests holding the old state keep working
+    assert out["removed_status"] == 404 and out["added_status"] == 200
+    assert out["kept_comps_after"] == out["kept_comps"]
+    assert abs(out["ppg_delta"] - 5.0) < 0.05
+
+    assert out["admin"][:2] == [401, 401]
+    assert out["admin"][2]["refreshed"] is False
@@ -0,0 +1,82 @@
+import threading
+import types
+
+import pytest
+
+import headshots
+from conftest import EspnStandIn
+
+ROSTER_PATH = "/apis/site/v2/sports/basketball/mens-college-basketball/teams/66/roster"
+CDN = "https://a.espncdn.com/i/headshots/mens-college-basketball/players/full"
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def roster(monkeypatch):
+    EspnStandIn.routes = {ROSTER_PATH: {"athletes": [
+        {"fullName": "Tamin Lipsey", "headshot": {"href": f"{CDN}/1.png"}},
+        {"fullName": "Keshon Gilbert", "displayName": "K. Gilbert", "headshot": {"href": f"{CDN}/2.png"}},
+        {"fullName": "No Picture"},
+        {"fullName": "Tamin Lipsey", "headshot": {"href": f"{CDN}/3.png"}},
+    ]}}
+    EspnStandIn.requests = []
+    monkeypatch.setattr(headshots, "_espn_roster_cache", {})
+    clock = Clock()
+    monkeypatch.setattr(headshots, "time", types.SimpleNamespace(monotonic=clock.monotonic))
+    return clock
+
+
+def _downloads() -> int:
+    return EspnStandIn.requests.count(ROSTER_PATH)
+
+
+def test_index_matches_full_display_and_reordered_names(roster):
+    def lookup(name):
+        return headshots._fetch_espn_headshot_from_roster("66", name)
+
+    assert lookup("Tamin Lipsey") == f"{CDN}/1.png"  # first athlete with a headshot wins
+    assert lookup("  LIPSEY   tamin ") == f"{CDN}/1.png"
+    assert lookup("k. gilbert") == f"{CDN}/2.png"
+    assert lookup("No Picture") is None
+    assert lookup("Somebody Else") is None
+    assert _downloads() == 1
+
+
+def test_roster_is_downloaded_once_per_ttl(roster):
+    headshots._get_roster_index("66")
+    roster.now += headshots.ROSTER_TTL - 1
+    headshots._get_roster_index("66")
+    assert _downloads() == 1
+
+    roster.now += 2
+    headshots._get_roster_index("66")
+    assert _downloads() == 2
+
+
+def test_failed_download_is_not_cached(roster):
+    routes, EspnStandIn.routes = EspnStandIn.routes, {}
+    assert headshots._get_roster_index("66") is None
+
+    EspnStandIn.routes = routes
+    assert headshots._get_roster_index("66") is not None
+    assert _downloads() == 2
+
+
+def test_concurrent_lookups_share_one_download(roster):
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(headshots._get_roster_index("66")))
+               for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=10)
+
+    assert len(results) == 8 and all(r is results[0] for r in results)
+    assert _downloads() == 1
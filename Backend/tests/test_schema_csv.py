@@ -0,0 +1,54 @@
+import os
+
+import pandas as pd
+
+from model import data_loader
+
+SCHEMA = {"Player": "string", "Team": "category", "G": "int64", "PTS": "float32"}
+
+
+def _write(tmp_path, text, name="stats.csv"):
+    path = tmp_path / name
+    path.write_text(text)
+    return str(path)
+
+
+def test_only_schema_columns_with_their_dtypes(tmp_path):
+    path = _write(tmp_path, " Player ,Tm,Extra,G,PTS\nA,BOS,x,10,5.5\nB,LAL,y,12,7.25\n")
+    df = data_loader.read_schema_csv(path, SCHEMA)
+
+    assert list(df.columns) == ["Player", "Tm", "G", "PTS"]  # file order; aliases keep their name
+    assert df.dtypes.astype(str).tolist() == ["string", "category", "int64", "float32"]
+    assert df["G"].tolist() == [10, 12]
+
+
+def test_int_column_with_gaps_stays_float(tmp_path):
+    path = _write(tmp_path, "Player,G\nA,10\nB,\n")
+    df = data_loader.read_schema_csv(path, SCHEMA)
+    assert df["G"].dtype == "float64" and df["G"].isna().tolist() == [False, True]
+
+
+def test_headerless_file_uses_names(tmp_path):
+    path = _write(tmp_path, "A,BOS,3\nB,LAL,4\n")
+    df = data_loader.read_schema_csv(path, SCHEMA, names=["Player", "Team", "Skip"])
+    assert list(df.columns) == ["Player", "Team"]
+    assert df["Team"].tolist() == ["BOS", "LAL"]
+
+
+def test_chunked_read_matches_a_single_read(tmp_path):
+    rows = "".join(f"P{i},{['BOS', 'LAL', 'NYK'][i % 3] if i < 7 else 'MIA'},{i},{i / 2}\n" for i in range(10))
+    path = _write(tmp_path, "Player,Team,G,PTS\n" + rows)
+
+    whole = data_loader.read_schema_csv(path, SCHEMA)
+    chunked = data_loader.read_schema_csv(path, SCHEMA, chunk_rows=3)
+    pd.testing.assert_frame_equal(chunked, whole, check_categorical=False)
+    assert set(chunked["Team"].cat.categories) == {"BOS", "LAL", "NYK", "MIA"}
+
+
+def test_bundled_exports_load_typed():
+    df = data_loader.read_schema_csv(
+        os.path.join(data_loader.DATA_DIR, "NBA_Stats_2009_2026.csv"),
+        data_loader.NBA_STATS_SCHEMA, chunk_rows=500,
+    )
+    assert set(df.columns) <= set(data_loader.NBA_STATS_SCHEMA) | {"Tm"}
+    assert len(df) > 500
@@ -0,0 +1,65 @@
+import glob
+import os
+
+import pandas as pd
+import pytest
+
+from model import data_loader
+
+
+@pytest.fixture
+def source(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_loader, "SNAPSHOT_DIR", str(tmp_path / "snapshots"))
+    monkeypatch.setattr(data_loader, "SNAPSHOTS_ENABLED", True)
+    path = tmp_path / "source.csv"
+    path.write_text("a,b\n1,2\n")
+    return str(path)
+
+
+def _counting_build(calls):
+    def build():
+        calls.append(1)
+        return pd.DataFrame({"a": [1, 2], "b": ["x", "y"]})
+    return build
+
+
+def _snapshots():
+    return glob.glob(os.path.join(data_loader.SNAPSHOT_DIR, "frame-*"))
+
+
+def test_second_load_reads_the_snapshot(source):
+    calls = []
+    first = data_loader.load_snapshot("frame", [source], _counting_build(calls))
+    second = data_loader.load_snapshot("frame", [source], _counting_build(calls))
+    assert len(calls) == 1
+    pd.testing.assert_frame_equal(first, second)
+    assert len(_snapshots()) == 1
+
+
+def test_changed_source_rebuilds_and_drops_the_old_snapshot(source):
+    calls = []
+    data_loader.load_snapshot("frame", [source], _counting_build(calls))
+    old = _snapshots()
+    st = os.stat(source)
+    os.utime(source, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+    data_loader.load_snapshot("frame", [source], _counting_build(calls))
+    assert len(calls) == 2
+    assert len(_snapshots()) == 1 and _snapshots() != old
+
+
+def test_unreadable_snapshot_is_rebuilt(source):
+    calls = []
+    data_loader.load_snapshot("frame", [source], _counting_build(calls))
+    with open(_snapshots()[0], "wb") as f:
+        f.write(b"not a frame")
+    df = data_loader.load_snapshot("frame", [source], _counting_build(calls))
+    assert len(calls) == 2 and list(df["a"]) == [1, 2]
+
+
+def test_disabled_snapshots_always_build(source, monkeypatch):
+    monkeypatch.setattr(data_loader, "SNAPSHOTS_ENABLED", False)
+    calls = []
+    for _ in range(2):
+        data_loader.load_snapshot("frame", [source], _counting_build(calls))
+    assert len(calls) == 2 and not _snapshots()
@@ -0,0 +1,50 @@
+import os
+import subprocess
+import sys
+
+from conftest import BACKEND_DIR
+
+
+def _run(code: str, **env) -> str:
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=BACKEND_DIR, env={**os.environ, **env},
+        capture_output=True, text=True, timeout=120,
+    )
+    assert out.returncode == 0, out.stderr
+    return out.stdout
+
+
+def test_background_startup_serves_without_sklearn():
+    out = _run(
+        "import sys, app\n"
+        "client = app.app.test_client()\n"
+        "assert client.get('/players').status_code == 200\n"
+        "assert client.get('/healthz').status_code in (200, 503)\n"
+        "print(sorted(m for m in sys.modules if m.split('.')[0] in ('sklearn', 'joblib') or m == 'model.draftability'))\n",
+        PROSCOUT_STARTUP="background",
+    )
+    assert out.strip().splitlines()[-1] == "[]"
+
+
+def test_startup_logs_one_structured_line():
+    out = _run("import app")
+    lines = out.strip().splitlines()
+    assert len(lines) == 1, lines
+    assert lines[0].startswith("Startup (eager): ") and " prospects, " in lines[0]
+
+
+def test_background_startup_defers_model_routes_until_built():
+    out = _run(
+        "import app\n"
+        "client = app.app.test_client()\n"
+        "assert client.get('/healthz').get_json()['modelsReady'] is False\n"
+        "name = app.serving.df['player_name'].iloc[0]\n"
+        "busy = client.get(f'/comps/{name}')\n"
+        "print(busy.status_code, busy.headers.get('Retry-After'), busy.get_json()['status'])\n"
+        "app._models_ready.wait(60)\n"
+        "print(client.get(f'/comps/{name}').status_code, client.get('/healthz').get_json()['modelsReady'])\n",
+        PROSCOUT_STARTUP="background", PROSCOUT_MODELS_WAIT="0",
+    )
+    busy, ready = out.strip().splitlines()[-2:]
+    assert busy == "503 5 warming up"
+    assert ready == "200 True"
@@ -0,0 +1,71 @@
+import csv
+import filecmp
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from bench import synth
+from conftest import BACKEND_DIR
+
+
+def test_jitter_keeps_each_fields_format():
+    rows = [["Ann", ".585", "3036", "-0.627717", "12"], ["Bo", ".412", "17", "1.5"]]
+    out = synth._jitter_rows(rows, np.array([0, 1, 0, 0]), {0, 4}, np.random.default_rng(0), 0.5)
+
+    assert [len(r) for r in out] == [5, 4, 5, 5]  # ragged rows keep their length
+    for row in out:
+        assert row[1].startswith(".") and len(row[1]) == 4 and 0.0 <= float(row[1]) <= 1.0
+        assert row[2].lstrip("-").isdigit()
+        assert len(row[3].split(".")[1]) == (6 if row[0] == "Ann" else 1)
+    assert [r[0] for r in out] == ["Ann", "Bo", "Ann", "Ann"]
+    assert [r[4] for r in out if len(r) > 4] == ["12", "12", "12"]  # fixed columns verbatim
+
+
+@pytest.fixture(scope="module")
+def tree(tmp_path_factory):
+    out = tmp_path_factory.mktemp("synth")
+    counts = synth.generate(str(out), ncaa_rows=300, nba_players=40, history_players=30, seed=1)
+    return out, counts
+
+
+def _ids(path, header_lines):
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        rows = list(csv.reader(f))
+    cols = rows[header_lines - 1]
+    idx = cols.index("Player-additional") if "Player-additional" in cols else len(cols) - 1
+    return {r[idx] for r in rows[header_lines:] if len(r) > idx and r[idx]}
+
+
+def test_generate_writes_every_input_file(tree):
+    out, counts = tree
+    assert counts["trank_data.csv"] == 300
+    for fname in (*synth.NBA_CURRENT_FILES, *synth.NBA_HISTORY_FILES, *synth.COPIED_FILES):
+        assert os.path.exists(out / fname), fname
+
+    # every clone appears under the same id in each file joined on Player-additional
+    assert _ids(out / "2025_per_game.csv", 1) == _ids(out / "2025_advanced.csv", 1) == _ids(out / "2025_shooting.csv", 2)
+    assert len(_ids(out / "2025_advanced.csv", 1)) == 40
+
+
+def test_same_seed_same_files(tree, tmp_path):
+    out, _ = tree
+    synth.generate(str(tmp_path), ncaa_rows=300, nba_players=40, history_players=30, seed=1)
+    for fname in ("trank_data.csv", *synth.NBA_CURRENT_FILES):
+        assert filecmp.cmp(out / fname, tmp_path / fname, shallow=False), fname
+
+
+def test_generated_tree_loads(tree):
+    out, _ = tree
+    code = (
+        "from model import data_loader as d\n"
+        "print(len(d.load_current_ncaa_data()), d.load_current_nba_playstyle()['Player'].nunique())\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=BACKEND_DIR, capture_output=True, text=True, timeout=120,
+        env={**os.environ, "PROSCOUT_DATA_DIR": str(out), "PROSCOUT_CACHE_DIR": str(out / ".cache")},
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split() == ["300", "40"]
@@ -10,12 +10,11 @@ export function usePlayer(id: string | undefined) {
     queryKey: ["player", id],
     queryFn: async (): Promise<Player | null> => {
       if (!id) return null;
-      // Prefer player from cached list if available
-      const cached = queryClient.getQueryData<Player[]>(["players"]);
-      const fromList = cached?.find((p) => p.id === id);
-      if (fromList) return fromList;
       return fetchPlayerById(id);
     },
+    // Show the card summary from the cached list while the full profile loads
+    placeholderData: () =>
+      queryClient.getQueryData<Player[]>(["players"])?.find((p) => p.id === id),
     enabled: !!id,
     staleTime: 60 * 1000,
   });
@@ -62,7 +62,9 @@ function normalizePlayer(p: Record<string, unknown>): Player {
 }
 
 /**
- * Fetch all players from backend. Falls back to mock data on error.
+ * Fetch all players from backend (card-level summaries from /players/summary,
+ * one request for the whole pool). Falls back to mock data on error.
+ * Summaries have no comps/outcomes — the profile page fetches the full player.
  */
 export async function fetchPlayers(): Promise<Player[]> {
   if (USE_MOCK) return playerDatabase;
@@ -70,23 +72,8 @@ export async function fetchPlayers(): Promise<Player[]> {
   if (cachedPlayers) return cachedPlayers;
 
   try {
-    const names = await apiGet<string[]>("players");
-    if (!names?.length) return playerDatabase;
-
-    const players: Player[] = [];
-    const toFetch = names;
-
-    for (const name of toFetch) {
-      try {
-        const nameForApi = typeof name === "string" ? name : String(name);
-        const res = await apiGet<Record<string, unknown>>(
-          `player/${encodeURIComponent(nameForApi.replace(/\s+/g, "-"))}`
-        );
-        if (res && res.id) players.push(normalizePlayer(res));
-      } catch {
-        // Skip player if fetch fails
-      }
-    }
+    const summaries = await apiGet<Record<string, unknown>[]>("players/summary");
+    const players = (summaries ?? []).filter((p) => p && p.id).map(normalizePlayer);
 
     if (players.length > 0) {
       cachedPlayers = players;